@@ -3,7 +3,7 @@ Issue admin configuration.
 """
 from django.contrib import admin
 
-from apps.issues.models import Attachment, Comment, Event, Issue, Watcher
+from apps.issues.models import Attachment, AttachmentBlob, Comment, Event, Issue, SavedFilter, Watcher
 
 
 @admin.register(Issue)
@@ -54,7 +54,14 @@ class AttachmentAdmin(admin.ModelAdmin):
     list_filter = ["content_type", "created_at"]
     search_fields = ["filename", "issue__key"]
     autocomplete_fields = ["issue", "uploaded_by"]
-    readonly_fields = ["created_at"]
+    readonly_fields = ["blob", "created_at"]
+
+
+@admin.register(AttachmentBlob)
+class AttachmentBlobAdmin(admin.ModelAdmin):
+    list_display = ["sha256", "size", "ref_count", "created_at"]
+    search_fields = ["sha256"]
+    readonly_fields = ["sha256", "file", "size", "ref_count", "created_at"]
 
 
 @admin.register(Watcher)
@@ -73,3 +80,12 @@ class EventAdmin(admin.ModelAdmin):
     search_fields = ["issue__key", "actor__username"]
     autocomplete_fields = ["project", "issue", "actor"]
     readonly_fields = ["created_at"]
+
+
+@admin.register(SavedFilter)
+class SavedFilterAdmin(admin.ModelAdmin):
+    list_display = ["name", "project", "owner", "is_shared", "updated_at"]
+    list_filter = ["is_shared", "updated_at"]
+    search_fields = ["name", "query", "owner__username"]
+    autocomplete_fields = ["project", "owner"]
+    readonly_fields = ["compiled", "created_at", "updated_at"]
@@ -0,0 +1,182 @@
+"""
+Issue import readers and row validation.
+"""
+import csv
+import io
+import json
+from datetime import date
+from typing import BinaryIO, Iterator, Optional
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from apps.issues.models import Issue
+from apps.projects.models import Epic, Project, Sprint
+
+User = get_user_model()
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+IMPORT_FORMATS = [FORMAT_CSV, FORMAT_JSONL]
+
+
+def import_format_from_filename(filename: str) -> Optional[str]:
+    """Guess the import format from a file name."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return FORMAT_CSV
+    if name.endswith((".jsonl", ".ndjson")):
+        return FORMAT_JSONL
+    return None
+
+
+def iter_import_rows(stream: BinaryIO, *, fmt: str) -> Iterator[tuple[int, Optional[dict]]]:
+    """
+    Yield `(row_number, row)` pairs from a binary stream, one row at a time.
+
+    Row numbers are 1-based and count data rows only. A row that cannot be
+    decoded is yielded as `None` so the importer can report it and move on.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == FORMAT_CSV:
+        yield from _iter_csv_rows(text)
+    elif fmt == FORMAT_JSONL:
+        yield from _iter_jsonl_rows(text)
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _iter_csv_rows(text: io.TextIOBase) -> Iterator[tuple[int, Optional[dict]]]:
+    reader = csv.DictReader(text)
+    for row_number, row in enumerate(reader, start=1):
+        yield row_number, row
+
+
+def _iter_jsonl_rows(text: io.TextIOBase) -> Iterator[tuple[int, Optional[dict]]]:
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield row_number, row if isinstance(row, dict) else None
+
+
+def resolve_import_references(*, project: Project, batch: list) -> dict:
+    """Load every member, epic and sprint referenced by a batch in one query each."""
+    user_refs, epic_refs, sprint_refs = set(), set(), set()
+    for _, row in batch:
+        if not row:
+            continue
+        for field in ("reporter", "assignee"):
+            if _clean(row.get(field)):
+                user_refs.add(str(_clean(row.get(field))))
+        if _clean(row.get("epic")):
+            epic_refs.add(str(_clean(row.get("epic"))))
+        if _clean(row.get("sprint")):
+            sprint_refs.add(str(_clean(row.get("sprint"))))
+
+    # Only project members can be referenced; anyone else reads as unknown so
+    # imports cannot probe which accounts exist
+    users = {}
+    if user_refs:
+        members = User.objects.filter(project_memberships__project=project)
+        for user in members.filter(Q(username__in=user_refs) | Q(email__in=user_refs)):
+            users[user.username] = user
+            users[user.email] = user
+
+    def _by_name_or_id(qs, refs):
+        ids = [int(ref) for ref in refs if ref.isdigit()]
+        found = {}
+        if refs:
+            for obj in qs.filter(Q(name__in=refs) | Q(id__in=ids)):
+                found.setdefault(obj.name, obj)
+                found[str(obj.id)] = obj
+        return found
+
+    return {
+        "users": users,
+        "epics": _by_name_or_id(Epic.objects.filter(project=project), epic_refs),
+        "sprints": _by_name_or_id(Sprint.objects.filter(board__project=project), sprint_refs),
+    }
+
+
+def import_row_to_fields(row: Optional[dict], *, lookups: dict, default_reporter: User) -> tuple:
+    """Validate an import row and map it onto Issue fields."""
+    if row is None:
+        return None, {"row": "Row could not be parsed."}
+
+    errors = {}
+    fields = {}
+
+    title = _clean(row.get("title"))
+    if not title:
+        errors["title"] = "This field is required."
+    elif len(str(title)) > Issue._meta.get_field("title").max_length:
+        errors["title"] = "Ensure this field has no more than 500 characters."
+    fields["title"] = str(title or "")
+    fields["description"] = str(_clean(row.get("description")) or "")
+
+    for field, choices, default in (
+        ("issue_type", Issue.Type, Issue.Type.TASK),
+        ("priority", Issue.Priority, Issue.Priority.MEDIUM),
+    ):
+        value = _clean(row.get(field))
+        if value is None:
+            fields[field] = default
+        elif str(value).lower() in choices.values:
+            fields[field] = str(value).lower()
+        else:
+            errors[field] = f'"{value}" is not a valid choice.'
+
+    for field, lookup in (
+        ("reporter", "users"),
+        ("assignee", "users"),
+        ("epic", "epics"),
+        ("sprint", "sprints"),
+    ):
+        ref = _clean(row.get(field))
+        if ref is None:
+            fields[field] = default_reporter if field == "reporter" else None
+        elif str(ref) in lookups[lookup]:
+            fields[field] = lookups[lookup][str(ref)]
+        else:
+            errors[field] = f'"{ref}" does not exist.'
+
+    for field in ("story_points", "time_estimate"):
+        value = _clean(row.get(field))
+        if value is None:
+            fields[field] = None
+            continue
+        try:
+            fields[field] = int(value)
+        except (TypeError, ValueError):
+            errors[field] = "A valid integer is required."
+            continue
+        if fields[field] < 0:
+            errors[field] = "Ensure this value is greater than or equal to 0."
+
+    due_date = _clean(row.get("due_date"))
+    if due_date is None:
+        fields["due_date"] = None
+    else:
+        try:
+            fields["due_date"] = parse_date(str(due_date))
+        except ValueError:
+            fields["due_date"] = None
+        if not isinstance(fields["due_date"], date):
+            errors["due_date"] = "Date has wrong format. Use YYYY-MM-DD."
+
+    return fields, errors
+
+
+def _clean(value):
+    """Normalise blank CSV/JSON values to None."""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
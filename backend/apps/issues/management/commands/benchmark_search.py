@@ -0,0 +1,89 @@
+"""
+Issue search benchmark command.
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.issues.selectors import issue_search
+from apps.issues.services import issue_bulk_import
+
+VOCABULARY = (
+    "login signup password token session cache redis postgres index query "
+    "timeout retry crash error exception stacktrace memory leak cpu latency "
+    "button modal dialog sidebar header footer layout responsive mobile dark "
+    "theme upload download attachment preview thumbnail export import csv "
+    "report dashboard chart filter search sort pagination cursor board sprint "
+    "epic story bug task release deploy rollback migration schema webhook "
+    "email notification digest watcher comment mention permission role admin "
+    "billing invoice payment refund currency locale translation timezone "
+    "calendar reminder schedule worker queue celery outbox event stream socket"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Benchmark issue search against a synthetic corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_key", help="Project to fill and search (use a throwaway project)")
+        parser.add_argument("--issues", type=int, default=1_000_000, help="Corpus size to reach before timing")
+        parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        from apps.projects.selectors import project_get_by_key
+
+        try:
+            project = project_get_by_key(key=options["project_key"].upper())
+        except Exception:
+            raise CommandError(f"Project {options['project_key']} does not exist.")
+
+        rng = random.Random(options["seed"])
+        missing = options["issues"] - project.issues.count()
+        if missing > 0:
+            self.stdout.write(f"Generating {missing} synthetic issues...")
+            started = time.monotonic()
+            issue_bulk_import(
+                project=project,
+                rows=self._synthetic_rows(rng, missing),
+                default_reporter=project.owner,
+                batch_size=options["batch_size"],
+            )
+            self.stdout.write(f"Generated in {time.monotonic() - started:.1f}s")
+
+        words = rng.sample(VOCABULARY, 3)
+        queries = [
+            ("key exact", f"{project.key}-{options['issues'] // 2}"),
+            ("key prefix", f"{project.key}-12"),
+            ("single word", words[0]),
+            ("typeahead", words[1][:3]),
+            ("two words", f"{words[0]} {words[2]}"),
+            ("websearch", f'"{words[1]} {words[2]}" -{words[0]}'),
+            ("fuzzy typo", words[2][:-1] + "x"),
+        ]
+
+        self.stdout.write(f"{'query':<14}{'text':<36}{'p50 ms':>10}{'p95 ms':>10}{'hits':>6}")
+        for label, query in queries:
+            timings = []
+            hits = 0
+            for _ in range(options["runs"]):
+                started = time.monotonic()
+                hits = len(list(issue_search(project=project, query=query, highlight=True)[:20]))
+                timings.append((time.monotonic() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f"{label:<14}{query[:34]:<36}{statistics.median(timings):>10.1f}{p95:>10.1f}{hits:>6}"
+            )
+
+    def _synthetic_rows(self, rng, count):
+        for row_number in range(1, count + 1):
+            yield row_number, {
+                "title": " ".join(rng.choices(VOCABULARY, k=rng.randint(4, 8))).capitalize(),
+                "description": " ".join(rng.choices(VOCABULARY, k=rng.randint(20, 60))),
+                "priority": rng.choice(["lowest", "low", "medium", "high", "highest"]),
+                "issue_type": rng.choice(["task", "bug", "story"]),
+            }
@@ -0,0 +1,77 @@
+"""
+Attachment blob garbage collection command.
+"""
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.issues.models import AttachmentBlob
+from apps.issues.services import attachment_blobs_collect, attachment_blobs_recount
+from apps.issues.uploads import attachment_storage, blob_names, blob_sha256
+
+
+class Command(BaseCommand):
+    help = "Delete attachment blobs no attachment refers to, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompute reference counts from the attachments table first",
+        )
+        parser.add_argument(
+            "--scan-storage",
+            action="store_true",
+            help="Also delete blob files in storage that have no blob row",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=24,
+            help="Leave unrecorded files younger than this; their upload may still be committing",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["recount"]:
+            corrected = attachment_blobs_recount()
+            self.stdout.write(f"Corrected {corrected} reference counts")
+
+        collected = 0
+        while True:
+            deleted = attachment_blobs_collect(batch_size=batch_size)
+            collected += deleted
+            if deleted < batch_size:
+                break
+        self.stdout.write(f"Deleted {collected} unreferenced blobs")
+
+        if options["scan_storage"]:
+            removed = self._remove_unrecorded_files(
+                batch_size=batch_size,
+                older_than=timezone.now() - timedelta(hours=options["grace_hours"]),
+            )
+            self.stdout.write(f"Removed {removed} blob files without a blob row")
+
+        self.stdout.write(self.style.SUCCESS("Attachment blobs are collected"))
+
+    def _remove_unrecorded_files(self, *, batch_size, older_than) -> int:
+        storage = attachment_storage()
+        names = blob_names()
+        removed = 0
+        while True:
+            batch = list(islice(names, batch_size))
+            if not batch:
+                return removed
+            digests = {blob_sha256(name) for name in batch}
+            recorded = set(
+                AttachmentBlob.objects.filter(sha256__in=digests).values_list("file", flat=True)
+            )
+            for name in batch:
+                if name in recorded or storage.get_modified_time(name) >= older_than:
+                    continue
+                storage.delete(name)
+                removed += 1
@@ -0,0 +1,69 @@
+"""
+Event partition maintenance command.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.issues.partitions import (
+    event_partition_archive,
+    event_partitions,
+    event_partitions_detach,
+    event_partitions_detached,
+    event_partitions_ensure,
+)
+
+
+class Command(BaseCommand):
+    help = "Create upcoming event partitions and detach or archive expired ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=settings.EVENT_PARTITION_MONTHS_AHEAD)
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=settings.EVENT_RETENTION_MONTHS,
+            help="Detach partitions older than this many months (0 keeps everything)",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.EVENT_ARCHIVE_DIR,
+            help="Durable directory for archives; required unless --no-archive is given",
+        )
+        parser.add_argument(
+            "--no-archive",
+            action="store_true",
+            help="Only detach expired partitions; leave them in the database",
+        )
+        parser.add_argument("--list", action="store_true", help="List partitions and exit")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name, upper, detach_pending in event_partitions():
+                state = " (detach pending)" if detach_pending else ""
+                self.stdout.write(f"{name:<20} until {upper.isoformat() if upper else '-'}{state}")
+            for name in event_partitions_detached():
+                self.stdout.write(f"{name:<20} detached")
+            return
+
+        for name in event_partitions_ensure(months_ahead=options["months_ahead"]):
+            self.stdout.write(f"Created {name}")
+
+        archive = not options["no_archive"]
+        if archive and not options["archive_dir"] and (
+            options["retain_months"] > 0 or event_partitions_detached()
+        ):
+            raise CommandError(
+                "Expired partitions are archived before they are dropped; set "
+                "EVENT_ARCHIVE_DIR, pass --archive-dir, or pass --no-archive."
+            )
+
+        if options["retain_months"] > 0:
+            for name in event_partitions_detach(retain_months=options["retain_months"]):
+                self.stdout.write(f"Detached {name}")
+
+        if archive:
+            for name in event_partitions_detached():
+                path = event_partition_archive(name=name, directory=options["archive_dir"])
+                self.stdout.write(f"Archived {name} to {path}")
+
+        self.stdout.write(self.style.SUCCESS("Event partitions are up to date"))
@@ -0,0 +1,54 @@
+"""
+Search index rebuild command.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.issues.models import Issue
+from apps.issues.services import issue_search_reindex
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search vectors of a project's issues in resumable chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_key", help="Key of the project to reindex")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            default=0,
+            help="Resume after this issue id (the last id printed by an interrupted run)",
+        )
+
+    def handle(self, *args, **options):
+        from apps.projects.selectors import project_get_by_key
+
+        try:
+            project = project_get_by_key(key=options["project_key"].upper())
+        except Exception:
+            raise CommandError(f"Project {options['project_key']} does not exist.")
+
+        batch_size = options["batch_size"]
+        last_id = options["after_id"]
+        issues = Issue.objects.filter(project=project).order_by("id")
+        total = issues.filter(id__gt=last_id).count()
+        self.stdout.write(f"Reindexing {total} issues in {project.key}...")
+
+        done = 0
+        started = time.monotonic()
+        while True:
+            # Keyset chunks: each one commits on its own and only locks its rows
+            issue_ids = list(issues.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+            if not issue_ids:
+                break
+            issue_search_reindex(issue_ids=issue_ids)
+            done += len(issue_ids)
+            last_id = issue_ids[-1]
+            self.stdout.write(f"  {done}/{total} issues (last id {last_id})")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Reindexed {done} issues in {project.key} in {elapsed:.2f}s"
+        ))
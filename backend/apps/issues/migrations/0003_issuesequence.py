@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0002_initial'),
+        ('projects', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueSequence',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='issue_sequence', serialize=False, to='projects.project')),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'issue_sequences',
+            },
+        ),
+        # Seed counters from the issues that already exist
+        migrations.RunSQL(
+            sql=(
+                "INSERT INTO issue_sequences (project_id, last_value) "
+                "SELECT project_id, MAX(sequence) FROM issues GROUP BY project_id"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
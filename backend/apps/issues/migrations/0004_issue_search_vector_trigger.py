@@ -0,0 +1,61 @@
+# Generated by Django 5.0.1 on 2026-10-17 10:05
+
+from django.db import migrations
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+CREATE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION issues_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector(coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector(coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER issues_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON issues
+    FOR EACH ROW EXECUTE FUNCTION issues_search_vector_update();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS issues_search_vector_trigger ON issues;
+DROP FUNCTION IF EXISTS issues_search_vector_update();
+"""
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Recompute vectors in id-range batches, committing after each one."""
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT MIN(id), MAX(id) FROM issues")
+        min_id, max_id = cursor.fetchone()
+    if min_id is None:
+        return
+
+    for start in range(min_id, max_id + 1, BACKFILL_BATCH_SIZE):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE issues SET search_vector = "
+                "setweight(to_tsvector(coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector(coalesce(description, '')), 'B') "
+                "WHERE id >= %s AND id < %s",
+                [start, start + BACKFILL_BATCH_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill batch commits on its own so row locks stay short-lived
+    atomic = False
+
+    dependencies = [
+        ('issues', '0003_issuesequence'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_TRIGGER_SQL, reverse_sql=DROP_TRIGGER_SQL),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
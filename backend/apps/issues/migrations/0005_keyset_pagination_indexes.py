@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 11:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('issues', '0004_issue_search_vector_trigger'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='issue',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='issues_project_cac5a7_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='events_project_0f49ca_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['issue', '-created_at', '-id'], name='events_issue_i_25f3a7_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='event',
+            name='events_project_547d3d_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='event',
+            name='events_issue_i_e31912_idx',
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 13:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('issues', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='issues_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
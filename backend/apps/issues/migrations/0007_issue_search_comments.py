@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# Comment text is capped so the combined document stays under the 1MB
+# tsvector limit on issues with very long threads.
+CREATE_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION issue_search_vector(issue_id bigint, title text, description text)
+RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector(coalesce(title, '')), 'A') ||
+        setweight(to_tsvector(coalesce(description, '')), 'B') ||
+        setweight(to_tsvector(coalesce((
+            SELECT left(string_agg(content, ' ' ORDER BY id), 200000)
+            FROM comments
+            WHERE comments.issue_id = issue_search_vector.issue_id
+        ), '')), 'C')
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION issues_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := issue_search_vector(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+RESTORE_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION issues_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector(coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector(coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION IF EXISTS issue_search_vector(bigint, text, text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    # Existing vectors pick up comment text via `manage.py rebuild_search_index`
+    atomic = False
+
+    dependencies = [
+        ('issues', '0006_issue_title_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='search_dirty',
+            field=models.BooleanField(default=False),
+        ),
+        AddIndexConcurrently(
+            model_name='issue',
+            index=models.Index(
+                condition=models.Q(('search_dirty', True)),
+                fields=['id'],
+                name='issues_search_dirty_idx',
+            ),
+        ),
+        migrations.RunSQL(sql=CREATE_FUNCTIONS_SQL, reverse_sql=RESTORE_FUNCTIONS_SQL),
+    ]
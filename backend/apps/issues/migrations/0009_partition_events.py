@@ -0,0 +1,125 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:40
+
+from datetime import datetime, timezone
+
+from django.db import migrations, transaction
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month_start, months):
+    month_index = month_start.month - 1 + months
+    return month_start.replace(year=month_start.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_events(apps, schema_editor):
+    """
+    Swap `events` for a table partitioned by month on created_at.
+
+    Existing rows are not copied: the old table is attached as the
+    `events_legacy` partition covering everything before next month, after a
+    validated CHECK constraint and a concurrently built (id, created_at)
+    unique index let the attach skip its own scan and index build. Monthly
+    partitions are created from next month on.
+    """
+    now = datetime.now(timezone.utc)
+    boundary = _add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), 1)
+    connection = schema_editor.connection
+
+    with connection.cursor() as cursor:
+        # Slow steps first, each in its own transaction without blocking
+        # writes; every step can be re-run after an interrupted attempt.
+        # A failed concurrent build leaves an invalid index behind
+        cursor.execute(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = 'events_legacy_id_created_at_uniq'"
+        )
+        row = cursor.fetchone()
+        if row is not None and not row[0]:
+            cursor.execute("DROP INDEX CONCURRENTLY events_legacy_id_created_at_uniq")
+        cursor.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS events_legacy_id_created_at_uniq "
+            "ON events (id, created_at)"
+        )
+        # Recreated rather than reused: an earlier attempt may have used an
+        # older boundary
+        cursor.execute("ALTER TABLE events DROP CONSTRAINT IF EXISTS events_legacy_bound")
+        cursor.execute(
+            "ALTER TABLE events ADD CONSTRAINT events_legacy_bound "
+            "CHECK (created_at IS NOT NULL AND created_at < %s) NOT VALID",
+            [boundary],
+        )
+        cursor.execute("ALTER TABLE events VALIDATE CONSTRAINT events_legacy_bound")
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE events IN ACCESS EXCLUSIVE MODE")
+        cursor.execute("ALTER TABLE events RENAME TO events_legacy")
+        cursor.execute("ALTER INDEX events_pkey RENAME TO events_legacy_pkey")
+        cursor.execute("ALTER INDEX events_project_0f49ca_idx RENAME TO events_legacy_project_0f49ca_idx")
+        cursor.execute("ALTER INDEX events_issue_i_25f3a7_idx RENAME TO events_legacy_issue_i_25f3a7_idx")
+
+        # Identity columns are not supported on partitioned tables before
+        # Postgres 17, so ids come from a plain sequence instead
+        cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM events_legacy")
+        next_id = cursor.fetchone()[0]
+        cursor.execute("ALTER TABLE events_legacy ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(f"CREATE SEQUENCE events_id_seq START WITH {int(next_id)}")
+
+        cursor.execute(
+            "CREATE TABLE events (LIKE events_legacy INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute("ALTER TABLE events ALTER COLUMN id SET DEFAULT nextval('events_id_seq')")
+        cursor.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+        cursor.execute("ALTER TABLE events ADD CONSTRAINT events_pkey PRIMARY KEY (id, created_at)")
+        cursor.execute("CREATE INDEX events_project_0f49ca_idx ON events (project_id, created_at DESC, id DESC)")
+        cursor.execute("CREATE INDEX events_issue_i_25f3a7_idx ON events (issue_id, created_at DESC, id DESC)")
+        cursor.execute("CREATE INDEX events_actor_id_idx ON events (actor_id)")
+        cursor.execute(
+            "ALTER TABLE events ADD CONSTRAINT events_project_id_fk_projects_id "
+            "FOREIGN KEY (project_id) REFERENCES projects (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            "ALTER TABLE events ADD CONSTRAINT events_issue_id_fk_issues_id "
+            "FOREIGN KEY (issue_id) REFERENCES issues (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            "ALTER TABLE events ADD CONSTRAINT events_actor_id_fk_users_id "
+            "FOREIGN KEY (actor_id) REFERENCES users (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+
+        # The old (id) primary key would clash with the parent's; the
+        # (id, created_at) unique index built above takes over its role
+        cursor.execute("ALTER TABLE events_legacy DROP CONSTRAINT events_legacy_pkey")
+        cursor.execute(
+            "ALTER TABLE events ATTACH PARTITION events_legacy FOR VALUES FROM (MINVALUE) TO (%s)",
+            [boundary],
+        )
+        cursor.execute("ALTER TABLE events_legacy DROP CONSTRAINT events_legacy_bound")
+
+        month = boundary
+        for _ in range(MONTHS_AHEAD + 1):
+            next_month = _add_months(month, 1)
+            cursor.execute(
+                f"CREATE TABLE events_p{month.year:04d}_{month.month:02d} PARTITION OF events "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [month, next_month],
+            )
+            month = next_month
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; the swap
+    # itself runs in a single atomic block
+    atomic = False
+
+    dependencies = [
+        ('issues', '0008_savedfilter'),
+        ('projects', '0002_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_events, migrations.RunPython.noop),
+    ]
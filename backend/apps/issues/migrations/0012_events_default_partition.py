@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0011_attachmentblob'),
+    ]
+
+    operations = [
+        # Catches events past the last monthly partition, so inserts keep
+        # working when partition maintenance falls behind. Not dropped on
+        # reverse: it may hold events.
+        migrations.RunSQL(
+            "CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0012_events_default_partition'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attachmentblob',
+            name='attachment_blobs_orphan_idx',
+        ),
+    ]
@@ -1,10 +1,12 @@
 """
 Issue models.
 """
+import uuid
+
 from django.conf import settings
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField
-from django.db import models
+from django.db import connection, models
 
 from apps.projects.models import Epic, Project, Sprint, WorkflowState
 
@@ -67,8 +69,10 @@ class Issue(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    # Full-text search
+    # Full-text search (maintained by the issues_search_vector_update trigger;
+    # comment changes set search_dirty and are folded in asynchronously)
     search_vector = SearchVectorField(null=True, blank=True)
+    search_dirty = models.BooleanField(default=False)
 
     class Meta:
         db_table = "issues"
@@ -76,9 +80,12 @@ class Issue(models.Model):
         unique_together = [["project", "sequence"]]
         indexes = [
             models.Index(fields=["project", "state"]),
+            models.Index(fields=["project", "-created_at", "-id"]),
             models.Index(fields=["assignee"]),
             models.Index(fields=["sprint"]),
             GinIndex(fields=["search_vector"]),
+            GinIndex(fields=["title"], opclasses=["gin_trgm_ops"], name="issues_title_trgm_idx"),
+            models.Index(fields=["id"], condition=models.Q(search_dirty=True), name="issues_search_dirty_idx"),
         ]
 
     def __str__(self):
@@ -87,8 +94,7 @@ class Issue(models.Model):
     def save(self, *args, **kwargs):
         if not self.sequence:
             # Auto-increment sequence per project
-            last_issue = Issue.objects.filter(project=self.project).order_by("-sequence").first()
-            self.sequence = (last_issue.sequence + 1) if last_issue else 1
+            self.sequence = IssueSequence.allocate(project_id=self.project_id)
         
         if not self.key:
             self.key = f"{self.project.key}-{self.sequence}"
@@ -96,6 +102,45 @@ class Issue(models.Model):
         super().save(*args, **kwargs)
 
 
+class IssueSequence(models.Model):
+    """Per-project counter for issue sequence numbers."""
+
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="issue_sequence"
+    )
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "issue_sequences"
+
+    def __str__(self):
+        return f"{self.project_id} @ {self.last_value}"
+
+    @classmethod
+    def allocate(cls, *, project_id: int, count: int = 1) -> int:
+        """
+        Reserve `count` consecutive sequence numbers and return the first one.
+
+        The upsert takes a row lock on the project's counter, so concurrent
+        allocations in one project queue up behind each other instead of
+        colliding on the (project, sequence) unique constraint.
+        """
+        table = cls._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (project_id, last_value) VALUES (%s, %s) "
+                f"ON CONFLICT (project_id) DO UPDATE "
+                f"SET last_value = {table}.last_value + EXCLUDED.last_value "
+                f"RETURNING last_value",
+                [project_id, count],
+            )
+            last_value = cursor.fetchone()[0]
+        return last_value - count + 1
+
+
 class Comment(models.Model):
     """Comment on an issue."""
     
@@ -113,11 +158,42 @@ class Comment(models.Model):
         return f"Comment by {self.author.username} on {self.issue.key}"
 
 
+class AttachmentBlob(models.Model):
+    """
+    Attachment content, stored once per SHA-256 digest.
+
+    `ref_count` is the number of attachments using the blob, kept by the
+    services. The collector deletes blobs no attachment uses, together with
+    their file.
+    """
+    
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField()  # blobs/<d[:2]>/<d[2:4]>/<digest><.ext>
+    size = models.PositiveIntegerField()  # bytes
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "attachment_blobs"
+
+    def __str__(self):
+        return f"{self.sha256} ({self.ref_count} refs)"
+
+
 class Attachment(models.Model):
     """File attachment for an issue."""
     
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name="attachments")
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="attachments")
+    # Null for attachments stored before content addressing; `file` then
+    # names a private copy instead of the blob's file
+    blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="attachments"
+    )
     file = models.FileField(upload_to="attachments/%Y/%m/%d/")
     filename = models.CharField(max_length=255)
     file_size = models.PositiveIntegerField()  # bytes
@@ -132,6 +208,41 @@ class Attachment(models.Model):
         return f"{self.filename} on {self.issue.key}"
 
 
+class AttachmentUpload(models.Model):
+    """
+    Chunked attachment upload in progress.
+
+    Parts arrive in order and are stored as they come; `received_bytes` is
+    the offset the next part must start at, so an interrupted client can ask
+    for it and resume. Completing the upload turns it into an Attachment.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name="attachment_uploads")
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="attachment_uploads"
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    file_size = models.PositiveIntegerField()  # bytes
+    received_bytes = models.PositiveIntegerField(default=0)
+    parts = models.JSONField(default=list)  # storage names, in offset order
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "attachment_uploads"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.file_size})"
+
+
 class Watcher(models.Model):
     """User watching an issue for updates."""
     
@@ -148,8 +259,34 @@ class Watcher(models.Model):
         return f"{self.user.username} watching {self.issue.key}"
 
 
+class SavedFilter(models.Model):
+    """Named issue query, stored with its compiled form."""
+    
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="saved_filters")
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="saved_filters")
+    name = models.CharField(max_length=100)
+    query = models.TextField()
+    compiled = models.JSONField(default=dict)  # Output of query_language.compile_query
+    is_shared = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "saved_filters"
+        ordering = ["name"]
+        unique_together = [["project", "owner", "name"]]
+
+    def __str__(self):
+        return f"{self.name} ({self.project.key})"
+
+
 class Event(models.Model):
-    """Event tracking for activity feed."""
+    """
+    Event tracking for activity feed.
+
+    The table is range-partitioned by month on created_at (see
+    apps.issues.partitions), so its database primary key is (id, created_at).
+    """
     
     class EventType(models.TextChoices):
         ISSUE_CREATED = "issue_created", "Issue Created"
@@ -172,8 +309,8 @@ class Event(models.Model):
         db_table = "events"
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["project", "-created_at"]),
-            models.Index(fields=["issue", "-created_at"]),
+            models.Index(fields=["project", "-created_at", "-id"]),
+            models.Index(fields=["issue", "-created_at", "-id"]),
         ]
 
     def __str__(self):
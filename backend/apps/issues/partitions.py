@@ -0,0 +1,174 @@
+"""
+Monthly partitions of the events table.
+
+``events`` is range-partitioned on ``created_at`` with one partition per
+month (``events_pYYYY_MM``), plus ``events_legacy`` holding everything from
+before partitioning and ``events_default`` catching rows no monthly
+partition covers yet. Maintenance keeps a few months of partitions ready
+ahead of time and detaches partitions past the retention period, optionally
+archiving them to gzipped CSV files before dropping them.
+"""
+import gzip
+import logging
+import os
+import re
+from datetime import datetime, timezone
+
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "events"
+LEGACY_PARTITION = "events_legacy"
+DEFAULT_PARTITION = "events_default"
+PARTITION_NAME = "events_p{year:04d}_{month:02d}"
+PARTITION_PATTERN = re.compile(r"^events_p\d{4}_\d{2}$")
+UPPER_BOUND_PATTERN = re.compile(r"TO \('([^']+)'\)")
+
+
+def month_start(value: datetime, months: int = 0) -> datetime:
+    """First instant (UTC) of the month `months` after the month of `value`."""
+    value = value.astimezone(timezone.utc)
+    month_index = value.month - 1 + months
+    return datetime(value.year + month_index // 12, month_index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def event_partitions() -> list:
+    """Attached partitions as (name, upper bound or None) ordered by upper bound."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), i.inhdetachpending "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [PARENT_TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound, detach_pending in rows:
+        match = UPPER_BOUND_PATTERN.search(bound or "")
+        upper = parse_datetime(match.group(1)) if match else None
+        partitions.append((name, upper, detach_pending))
+    partitions.sort(key=lambda partition: (partition[1] is None, partition[1] or datetime.min))
+    return partitions
+
+
+def event_partitions_ensure(*, months_ahead: int = 3) -> list:
+    """
+    Create any missing monthly partitions up to `months_ahead` months from now.
+
+    Rows that landed in the default partition because maintenance fell
+    behind are moved into the partition created for their month. Rows left
+    in the default partition afterwards are logged as an error.
+    """
+    existing = {name for name, _, _ in event_partitions()}
+    now = datetime.now(timezone.utc)
+    created = []
+    for offset in range(months_ahead + 1):
+        start = month_start(now, offset)
+        name = PARTITION_NAME.format(year=start.year, month=start.month)
+        if name in existing:
+            continue
+        _partition_create(
+            name=name, start=start, end=month_start(start, 1),
+            has_default=DEFAULT_PARTITION in existing,
+        )
+        created.append(name)
+
+    if DEFAULT_PARTITION in existing:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {DEFAULT_PARTITION}")
+            stray = cursor.fetchone()[0]
+        if stray:
+            logger.error(
+                "%s holds %d events outside every monthly partition; they move "
+                "once partitions for their months are created.",
+                DEFAULT_PARTITION, stray,
+            )
+    return created
+
+
+def _partition_create(*, name: str, start: datetime, end: datetime, has_default: bool) -> None:
+    create_sql = (
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+        f"FOR VALUES FROM (%s) TO (%s)"
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        moved = False
+        if has_default:
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+                f"WHERE created_at >= %s AND created_at < %s)",
+                [start, end],
+            )
+            moved = cursor.fetchone()[0]
+        if not moved:
+            cursor.execute(create_sql, [start, end])
+            return
+
+        # A new partition cannot overlap rows held by the default partition:
+        # detach it, create the partition, move the rows and re-attach
+        cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+        cursor.execute(create_sql, [start, end])
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f"INSERT INTO {PARENT_TABLE} SELECT * FROM moved",
+            [start, end],
+        )
+        logger.warning("Moved %d events from %s to %s", cursor.rowcount, DEFAULT_PARTITION, name)
+        cursor.execute(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+
+
+def event_partitions_detach(*, retain_months: int) -> list:
+    """
+    Detach partitions whose rows are all older than `retain_months` months.
+
+    DETACH ... CONCURRENTLY only blocks writers to the detached partition; a
+    detach interrupted half-way is finalized on the next run.
+    """
+    cutoff = month_start(datetime.now(timezone.utc), -retain_months)
+    detached = []
+    for name, upper, detach_pending in event_partitions():
+        if upper is None or upper > cutoff:
+            continue
+        suffix = "FINALIZE" if detach_pending else "CONCURRENTLY"
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}" {suffix}')
+        detached.append(name)
+    return detached
+
+
+def event_partitions_detached() -> list:
+    """Former partitions that were detached but not archived yet."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind = 'r' AND NOT relispartition AND (relname LIKE 'events\\_p%%' OR relname = %s) "
+            "ORDER BY relname",
+            [LEGACY_PARTITION],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return [name for name in names if PARTITION_PATTERN.match(name) or name == LEGACY_PARTITION]
+
+
+def event_partition_archive(*, name: str, directory: str) -> str:
+    """
+    Dump a detached partition to `<directory>/<name>.csv.gz` and drop it.
+
+    The file is written under a temporary name and renamed once complete, so
+    a crash never leaves a truncated archive next to a dropped table.
+    """
+    if name in {partition for partition, _, _ in event_partitions()}:
+        raise ValueError(f"{name} is still attached to {PARENT_TABLE}.")
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.csv.gz")
+    partial_path = f"{path}.partial"
+    with connection.cursor() as cursor:
+        with gzip.open(partial_path, "wb") as archive:
+            cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER)', archive)
+        os.replace(partial_path, path)
+        cursor.execute(f'DROP TABLE "{name}"')
+    return path
@@ -0,0 +1,435 @@
+"""
+Issue query language.
+
+A small JQL-style language for filtering and ordering issues::
+
+    assignee in (me, 12) AND priority >= high AND state.category != done
+    ORDER BY updated_at DESC
+
+``compile_query`` parses a query once into a JSON-serializable form (stored
+on ``SavedFilter``); ``apply_compiled_query`` turns that form into ``Q``
+objects and an ordering without parsing again. ``me`` is kept as a reference
+and resolved to the requesting user at run time.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.issues.models import Issue
+from apps.projects.models import WorkflowState
+
+# Bump when the compiled form changes; stale forms are recompiled from text
+COMPILED_VERSION = 1
+
+ME = {"ref": "me"}
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<op>!=|<=|>=|=|<|>|~)
+      | (?P<punct>[(),])
+      | (?P<word>[\w.:@+-]+)
+    )
+""", re.VERBOSE)
+
+KEYWORDS = {"AND", "OR", "NOT", "IN", "IS", "EMPTY", "NULL", "ORDER", "BY", "ASC", "DESC"}
+RANGE_LOOKUPS = {"<": "lt", "<=": "lte", ">": "gt", ">=": "gte"}
+
+# Lowest to highest, matching the declaration order of Issue.Priority
+PRIORITY_ORDER = list(Issue.Priority.values)
+PRIORITY_RANK = Case(
+    *[When(priority=value, then=Value(rank)) for rank, value in enumerate(PRIORITY_ORDER)],
+    output_field=IntegerField(),
+)
+
+
+class QueryLanguageError(ValueError):
+    """Raised for queries that cannot be parsed or compiled."""
+
+
+@dataclass(frozen=True)
+class _Field:
+    kind: str
+    path: str
+    choices: tuple = ()
+    nullable: bool = False
+
+
+FIELDS = {
+    "assignee": _Field("user", "assignee", nullable=True),
+    "reporter": _Field("user", "reporter"),
+    "priority": _Field("priority", "priority", choices=tuple(PRIORITY_ORDER)),
+    "type": _Field("choice", "issue_type", choices=tuple(Issue.Type.values)),
+    "issue_type": _Field("choice", "issue_type", choices=tuple(Issue.Type.values)),
+    "state": _Field("state", "state"),
+    "state.category": _Field("choice", "state__category", choices=tuple(WorkflowState.Category.values)),
+    "sprint": _Field("id", "sprint", nullable=True),
+    "epic": _Field("id", "epic", nullable=True),
+    "parent": _Field("id", "parent", nullable=True),
+    "key": _Field("text", "key"),
+    "title": _Field("text", "title"),
+    "story_points": _Field("number", "story_points", nullable=True),
+    "created_at": _Field("datetime", "created_at"),
+    "updated_at": _Field("datetime", "updated_at"),
+    "resolved_at": _Field("datetime", "resolved_at", nullable=True),
+    "due_date": _Field("date", "due_date", nullable=True),
+}
+
+ORDER_FIELDS = {
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "resolved_at": "resolved_at",
+    "due_date": "due_date",
+    "story_points": "story_points",
+    "key": "sequence",
+    "priority": "priority_rank",
+}
+
+
+def compile_query(text: str) -> dict:
+    """Parse `text` into its compiled form; raise QueryLanguageError if invalid."""
+    return _Parser(text).parse()
+
+
+def apply_compiled_query(queryset: QuerySet, compiled: dict, *, user) -> QuerySet:
+    """Filter and order `queryset` by a compiled query on behalf of `user`."""
+    qs = queryset.filter(compiled_query_q(compiled["where"], user=user))
+
+    order_by = compiled["order_by"]
+    if not order_by:
+        return qs
+    if any(field.lstrip("-") == "priority_rank" for field in order_by):
+        qs = qs.annotate(priority_rank=PRIORITY_RANK)
+    return qs.order_by(*order_by, "-id")
+
+
+def compiled_query_q(node, *, user) -> Q:
+    """Build the Q object of a compiled condition tree."""
+    if node is None:
+        return Q()
+    if "and" in node:
+        q = Q()
+        for child in node["and"]:
+            q &= compiled_query_q(child, user=user)
+        return q
+    if "or" in node:
+        q = Q()
+        for child in node["or"]:
+            q |= compiled_query_q(child, user=user)
+        return q
+    if "not" in node:
+        return ~compiled_query_q(node["not"], user=user)
+    return Q(**{node["lookup"]: _resolve_value(node["value"], user=user)})
+
+
+def _resolve_value(value, *, user):
+    if value == ME:
+        return user.id
+    if isinstance(value, list):
+        return [_resolve_value(item, user=user) for item in value]
+    return value
+
+
+def _tokenize(text: str) -> list:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise QueryLanguageError(f"Unexpected character at position {position}.")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        tokens.append((kind, value, match.start(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser::
+
+        query   := [or_expr] [ORDER BY order ("," order)*]
+        or_expr := and_expr (OR and_expr)*
+        and_expr:= not_expr (AND not_expr)*
+        not_expr:= NOT not_expr | "(" or_expr ")" | clause
+        clause  := field op value | field [NOT] IN "(" value ("," value)* ")"
+                 | field IS [NOT] (EMPTY | NULL)
+    """
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def parse(self) -> dict:
+        where = None
+        if self._peek() is not None and not self._at_keyword("ORDER"):
+            where = self._parse_or()
+
+        order_by = []
+        if self._accept_keyword("ORDER"):
+            self._expect_keyword("BY")
+            order_by.append(self._parse_order())
+            while self._accept("punct", ","):
+                order_by.append(self._parse_order())
+
+        token = self._peek()
+        if token is not None:
+            raise QueryLanguageError(f"Unexpected '{token[1]}' at position {token[2]}.")
+
+        return {
+            "version": COMPILED_VERSION,
+            "where": where,
+            "order_by": order_by,
+            "uses_me": ME in _iter_values(where),
+        }
+
+    def _parse_or(self):
+        nodes = [self._parse_and()]
+        while self._accept_keyword("OR"):
+            nodes.append(self._parse_and())
+        return nodes[0] if len(nodes) == 1 else {"or": nodes}
+
+    def _parse_and(self):
+        nodes = [self._parse_not()]
+        while self._accept_keyword("AND"):
+            nodes.append(self._parse_not())
+        return nodes[0] if len(nodes) == 1 else {"and": nodes}
+
+    def _parse_not(self):
+        if self._accept_keyword("NOT"):
+            return {"not": self._parse_not()}
+        if self._accept("punct", "("):
+            node = self._parse_or()
+            self._expect("punct", ")")
+            return node
+        return self._parse_clause()
+
+    def _parse_clause(self):
+        name, position = self._expect_name()
+        field = FIELDS.get(name.lower())
+        if field is None:
+            raise QueryLanguageError(f"Unknown field '{name}' at position {position}.")
+
+        if self._accept_keyword("IS"):
+            negate = self._accept_keyword("NOT")
+            if not (self._accept_keyword("EMPTY") or self._accept_keyword("NULL")):
+                self._fail("Expected EMPTY")
+            if not field.nullable:
+                raise QueryLanguageError(f"Field '{name}' cannot be empty.")
+            return {"lookup": f"{field.path}__isnull", "value": not negate}
+
+        if self._accept_keyword("NOT"):
+            self._expect_keyword("IN")
+            return {"not": _compile_equals(field, self._parse_list())}
+        if self._accept_keyword("IN"):
+            return _compile_equals(field, self._parse_list())
+
+        token = self._expect("op")
+        op = token[1]
+        value = self._parse_value()
+        if op == "=":
+            return _compile_equals(field, [value])
+        if op == "!=":
+            return {"not": _compile_equals(field, [value])}
+        if op == "~":
+            if field.kind != "text":
+                raise QueryLanguageError(f"Operator '~' is not supported for '{name}'.")
+            return {"lookup": f"{field.path}__icontains", "value": value[0]}
+        return _compile_range(field, RANGE_LOOKUPS[op], value, name=name)
+
+    def _parse_list(self) -> list:
+        self._expect("punct", "(")
+        values = [self._parse_value()]
+        while self._accept("punct", ","):
+            values.append(self._parse_value())
+        self._expect("punct", ")")
+        return values
+
+    def _parse_value(self) -> tuple:
+        """Return (text, quoted)."""
+        token = self._peek()
+        if token is None or token[0] not in ("string", "word"):
+            self._fail("Expected a value")
+        self.index += 1
+        return token[1], token[0] == "string"
+
+    def _parse_order(self) -> str:
+        name, position = self._expect_name()
+        field = ORDER_FIELDS.get(name.lower())
+        if field is None:
+            raise QueryLanguageError(f"Cannot order by '{name}' at position {position}.")
+        if self._accept_keyword("DESC"):
+            return f"-{field}"
+        self._accept_keyword("ASC")
+        return field
+
+    def _peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def _at_keyword(self, keyword: str) -> bool:
+        token = self._peek()
+        return token is not None and token[0] == "word" and token[1].upper() == keyword
+
+    def _accept_keyword(self, keyword: str) -> bool:
+        if self._at_keyword(keyword):
+            self.index += 1
+            return True
+        return False
+
+    def _expect_keyword(self, keyword: str) -> None:
+        if not self._accept_keyword(keyword):
+            self._fail(f"Expected {keyword}")
+
+    def _accept(self, kind: str, value: str = None) -> bool:
+        token = self._peek()
+        if token is not None and token[0] == kind and (value is None or token[1] == value):
+            self.index += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: str = None):
+        token = self._peek()
+        if not self._accept(kind, value):
+            self._fail(f"Expected '{value}'" if value else "Expected an operator")
+        return token
+
+    def _expect_name(self) -> tuple:
+        token = self._peek()
+        if token is None or token[0] != "word" or token[1].upper() in KEYWORDS:
+            self._fail("Expected a field name")
+        self.index += 1
+        return token[1], token[2]
+
+    def _fail(self, message: str):
+        token = self._peek()
+        if token is None:
+            raise QueryLanguageError(f"{message} at end of query.")
+        raise QueryLanguageError(f"{message} at position {token[2]}, got '{token[1]}'.")
+
+
+def _compile_equals(field: _Field, values: list) -> dict:
+    """Condition matching any of `values`."""
+    if field.kind == "user":
+        ids, usernames = [], []
+        for text, quoted in values:
+            if not quoted and text.lower() == "me":
+                ids.append(ME)
+            elif text.isdigit():
+                ids.append(int(text))
+            else:
+                usernames.append(text)
+        nodes = []
+        if ids:
+            nodes.append({"lookup": f"{field.path}_id__in", "value": ids})
+        if usernames:
+            nodes.append({"lookup": f"{field.path}__username__in", "value": usernames})
+        return nodes[0] if len(nodes) == 1 else {"or": nodes}
+
+    if field.kind == "state":
+        ids = [int(text) for text, _ in values if text.isdigit()]
+        names = [text for text, _ in values if not text.isdigit()]
+        nodes = [{"lookup": "state__name__iexact", "value": name} for name in names]
+        if ids:
+            nodes.insert(0, {"lookup": "state_id__in", "value": ids})
+        return nodes[0] if len(nodes) == 1 else {"or": nodes}
+
+    if field.kind in ("choice", "priority"):
+        return {"lookup": f"{field.path}__in", "value": [_choice(field, text) for text, _ in values]}
+    if field.kind == "id":
+        return {"lookup": f"{field.path}_id__in", "value": [_integer(text) for text, _ in values]}
+    if field.kind == "number":
+        return {"lookup": f"{field.path}__in", "value": [_integer(text) for text, _ in values]}
+    if field.kind == "text":
+        if field.path == "key":
+            return {"lookup": "key__in", "value": [text.upper() for text, _ in values]}
+        return {"lookup": f"{field.path}__in", "value": [text for text, _ in values]}
+    if field.kind == "date":
+        return {"lookup": f"{field.path}__in", "value": [_date(text) for text, _ in values]}
+
+    # Datetimes compare by calendar day for dates and exactly otherwise
+    nodes = []
+    for text, _ in values:
+        lookup, value = _datetime(field, text)
+        nodes.append({"lookup": lookup or field.path, "value": value})
+    return nodes[0] if len(nodes) == 1 else {"or": nodes}
+
+
+def _compile_range(field: _Field, lookup: str, value: tuple, *, name: str) -> dict:
+    text = value[0]
+    if field.kind == "priority":
+        rank = PRIORITY_ORDER.index(_choice(field, text))
+        ranks = {
+            "lt": range(0, rank),
+            "lte": range(0, rank + 1),
+            "gt": range(rank + 1, len(PRIORITY_ORDER)),
+            "gte": range(rank, len(PRIORITY_ORDER)),
+        }[lookup]
+        return {"lookup": "priority__in", "value": [PRIORITY_ORDER[index] for index in ranks]}
+    if field.kind == "number":
+        return {"lookup": f"{field.path}__{lookup}", "value": _integer(text)}
+    if field.kind == "date":
+        return {"lookup": f"{field.path}__{lookup}", "value": _date(text)}
+    if field.kind == "datetime":
+        date_lookup, parsed = _datetime(field, text)
+        return {"lookup": f"{date_lookup or field.path}__{lookup}", "value": parsed}
+    raise QueryLanguageError(f"Comparison operators are not supported for '{name}'.")
+
+
+def _choice(field: _Field, text: str) -> str:
+    value = text.lower()
+    if value not in field.choices:
+        raise QueryLanguageError(
+            f"Invalid value '{text}' for {field.path}, expected one of: {', '.join(field.choices)}."
+        )
+    return value
+
+
+def _integer(text: str) -> int:
+    try:
+        return int(text)
+    except ValueError:
+        raise QueryLanguageError(f"Expected a number, got '{text}'.")
+
+
+def _date(text: str) -> str:
+    try:
+        if parse_date(text) is not None:
+            return text
+    except ValueError:
+        pass
+    raise QueryLanguageError(f"Expected a date (YYYY-MM-DD), got '{text}'.")
+
+
+def _datetime(field: _Field, text: str) -> tuple:
+    """Return (date lookup or None, ISO value) for a datetime field."""
+    try:
+        if parse_date(text) is not None:
+            return f"{field.path}__date", text
+        if parse_datetime(text) is not None:
+            return None, text
+    except ValueError:
+        pass
+    raise QueryLanguageError(f"Expected a date or datetime, got '{text}'.")
+
+
+def _iter_values(node):
+    if node is None:
+        return
+    for key in ("and", "or"):
+        if key in node:
+            for child in node[key]:
+                yield from _iter_values(child)
+            return
+    if "not" in node:
+        yield from _iter_values(node["not"])
+        return
+    value = node["value"]
+    if isinstance(value, list):
+        yield from value
+    else:
+        yield value
@@ -0,0 +1,139 @@
+"""
+Issue search engine.
+
+Every query shape is routed to a condition Postgres can answer from an index:
+
+* key-shaped queries (``PROJ-12``) whose prefix is a searched project's key
+  use a prefix match on ``key``, served by the ``varchar_pattern_ops`` index
+  Django creates for the unique key column; other hyphenated words
+  (``utf-8``, ``x86-64``) are free text;
+* free text uses a prefix (typeahead) or websearch tsquery against the GIN
+  index on ``search_vector``;
+* fuzzy matches use trigram word similarity on ``title``, served by the
+  ``gin_trgm_ops`` index.
+
+Text and trigram ranks are combined into a single ``rank`` annotation.
+
+The search document is title (weight A), description (B) and comment text
+(C), built by the ``issue_search_vector`` SQL function. Title and
+description edits rebuild it inline through a trigger; comment changes only
+mark the issue dirty and are rebuilt in batches by
+``rebuild_search_vectors``.
+"""
+import re
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, QuerySet, Value, When
+from django.db.models.functions import Left
+
+KEY_PATTERN = re.compile(r"^\s*([A-Za-z][A-Za-z0-9]{1,9})-(\d*)\s*$")
+WEBSEARCH_PATTERN = re.compile(r'"|(^|\s)-\w|\s+or\s+', re.IGNORECASE)
+TERM_PATTERN = re.compile(r"\w+")
+
+# How much a perfect trigram match counts relative to the text rank
+TRIGRAM_WEIGHT = 0.5
+HEADLINE_OPTIONS = {"start_sel": "<mark>", "stop_sel": "</mark>"}
+
+REBUILD_VECTORS_SQL = """
+UPDATE issues
+SET search_vector = issue_search_vector(id, title, description), search_dirty = false
+WHERE id = ANY(%s)
+"""
+
+
+def search_issues(
+    queryset: QuerySet, query: str, *, project_keys, highlight: bool = False
+) -> QuerySet:
+    """
+    Filter and rank `queryset` by `query`.
+
+    `project_keys` are the keys of the searched projects; it may be a lazy
+    queryset, evaluated only for key-shaped queries.
+    """
+    key_match = KEY_PATTERN.match(query)
+    if key_match and key_match.group(1).upper() in set(project_keys):
+        return _search_by_key(queryset, key_match, highlight=highlight)
+
+    search_query = build_search_query(query)
+    if search_query is None:
+        # Still ranked, so rank-ordered pagination works on the empty result
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField())).none()
+
+    qs = queryset.filter(
+        Q(search_vector=search_query) | Q(title__trigram_word_similar=query)
+    ).annotate(
+        rank=SearchRank(F("search_vector"), search_query)
+        + TrigramWordSimilarity(query, "title") * TRIGRAM_WEIGHT,
+    ).order_by("-rank", "-created_at")
+
+    if highlight:
+        qs = qs.annotate(
+            title_highlight=SearchHeadline("title", search_query, **HEADLINE_OPTIONS),
+            description_highlight=SearchHeadline(
+                "description",
+                search_query,
+                max_words=35,
+                min_words=15,
+                **HEADLINE_OPTIONS,
+            ),
+        )
+    return qs
+
+
+def build_search_query(query: str):
+    """
+    Build a tsquery for free text.
+
+    Queries using websearch syntax (quotes, `or`, `-term`) are passed to
+    websearch_to_tsquery; anything else becomes an AND of prefix terms so
+    partially typed words still match.
+    """
+    if WEBSEARCH_PATTERN.search(query):
+        return SearchQuery(query, search_type="websearch")
+
+    terms = TERM_PATTERN.findall(query)
+    if not terms:
+        return None
+    return SearchQuery(" & ".join(f"{term}:*" for term in terms), search_type="raw")
+
+
+def _search_by_key(queryset: QuerySet, match, *, highlight: bool) -> QuerySet:
+    project_key, number = match.groups()
+    prefix = f"{project_key.upper()}-{number}"
+
+    # The exact key (PROJ-12) ranks above PROJ-120..., also under the
+    # (-rank, -id) order of ranked pagination
+    qs = queryset.filter(key__startswith=prefix).annotate(
+        rank=Case(
+            When(key=prefix, then=Value(2.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        )
+    ).order_by("-rank", "sequence")
+
+    if highlight:
+        qs = qs.annotate(
+            title_highlight=F("title"),
+            description_highlight=Left("description", 200),
+        )
+    return qs
+
+
+def rebuild_search_vectors(issue_ids: list) -> int:
+    """
+    Recompute the search vectors of `issue_ids` and clear their dirty flag.
+
+    Callers must hold row locks on the issues (SELECT ... FOR UPDATE) so the
+    rebuild sees every comment committed before the locks were granted.
+    """
+    if not issue_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(REBUILD_VECTORS_SQL, [list(issue_ids)])
+        return cursor.rowcount
@@ -1,15 +1,36 @@
 """
 Issue selectors.
 """
+from collections import defaultdict
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
-from django.contrib.postgres.search import SearchQuery, SearchRank
-from django.db.models import Prefetch, Q, QuerySet
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import Count, F, FloatField, Prefetch, Q, QuerySet, Value, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 
-from apps.issues.models import Attachment, Comment, Event, Issue, Watcher
-from apps.projects.models import Project, Sprint
+from apps.issues.models import Attachment, Comment, Event, Issue, SavedFilter, Watcher
+from apps.issues.query_language import COMPILED_VERSION, apply_compiled_query, compile_query
+from apps.issues.search import search_issues
+from apps.projects.models import Board, Project, Sprint
+from common.cache import cache_version_get
 
 User = get_user_model()
 
+PROJECT_ISSUES_VERSION_KEY = "project_issues:{project_id}:version"
+SAVED_FILTER_RESULTS_KEY = "saved_filter:{filter_id}:{updated}:v{version}:u{user_id}:l{limit}"
+# Issue changes bump the project version; the timeout bounds staleness of
+# everything else shown with the results (user names, workflow states)
+SAVED_FILTER_CACHE_TIMEOUT = 60
+
+# Feeds read this far back before falling back to older event partitions
+RECENT_EVENTS_WINDOW = timedelta(days=31)
+# Margin for clocks of different app servers when bounding by creation time
+EVENT_CLOCK_SKEW = timedelta(days=1)
+
 
 def issue_list(*, project: Project, filters: dict = None) -> QuerySet:
     """Get issues for a project with optional filters."""
@@ -44,16 +65,154 @@ def issue_list(*, project: Project, filters: dict = None) -> QuerySet:
     return qs
 
 
-def issue_search(*, project: Project, query: str) -> QuerySet:
-    """Full-text search for issues."""
-    search_query = SearchQuery(query)
-    return Issue.objects.filter(
-        project=project
-    ).filter(
-        Q(search_vector=search_query) | Q(key__icontains=query) | Q(title__icontains=query)
+def issue_list_by_query(*, project: Project, compiled: dict, user: User) -> QuerySet:
+    """Get a project's issues matching a compiled query-language query."""
+    qs = Issue.objects.filter(project=project).select_related(
+        "project",
+        "state",
+        "reporter",
+        "assignee",
+    )
+    return apply_compiled_query(qs, compiled, user=user)
+
+
+def issue_search(*, project: Project, query: str, highlight: bool = False) -> QuerySet:
+    """Full-text, key-prefix and fuzzy title search for issues."""
+    qs = Issue.objects.filter(project=project).select_related(
+        "project",
+        "state",
+        "reporter",
+        "assignee",
+    )
+    return search_issues(qs, query, project_keys=[project.key], highlight=highlight)
+
+
+def issue_search_global(*, project_ids: list, query: str, filters: dict = None) -> QuerySet:
+    """Search issues across several projects in one query."""
+    if not project_ids:
+        # Ranked like real results so rank-ordered pagination still works
+        return Issue.objects.annotate(rank=Value(0.0, output_field=FloatField())).none()
+
+    qs = Issue.objects.filter(project_id__in=project_ids)
+    
+    if filters:
+        if "project" in filters:
+            qs = qs.filter(project_id=filters["project"])
+        if "issue_type" in filters:
+            qs = qs.filter(issue_type=filters["issue_type"])
+        if "priority" in filters:
+            qs = qs.filter(priority=filters["priority"])
+        if "state_category" in filters:
+            qs = qs.filter(state__category=filters["state_category"])
+    
+    qs = qs.select_related(
+        "project",
+        "state",
+        "reporter",
+        "assignee",
+    )
+    project_keys = Project.objects.filter(id__in=project_ids).values_list("key", flat=True)
+    return search_issues(qs, query, project_keys=project_keys, highlight=True)
+
+
+def issue_search_facets(*, results: QuerySet) -> dict:
+    """
+    Count search results per project, issue type, priority and state category.
+
+    All four facets come from a single GROUPING SETS aggregate over the
+    matching rows instead of one GROUP BY query per facet.
+    """
+    matches = results.order_by().annotate(
+        facet_project_key=F("project__key"),
+        facet_state_category=F("state__category"),
+    ).values("project_id", "facet_project_key", "issue_type", "priority", "facet_state_category")
+    facets = {"project": [], "issue_type": [], "priority": [], "state_category": []}
+    try:
+        sql, params = matches.query.sql_with_params()
+    except EmptyResultSet:
+        # .none() or an empty __in list: nothing can match
+        return facets
+    
+    with connections[matches.db].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT project_id, facet_project_key, issue_type, priority, facet_state_category, COUNT(*)
+            FROM ({sql}) AS matches
+            GROUP BY GROUPING SETS (
+                (project_id, facet_project_key), (issue_type), (priority), (facet_state_category)
+            )
+            """,
+            params,
+        )
+        # Every facet column is NOT NULL, so the non-null column names the set
+        for project_id, project_key, issue_type, priority, state_category, count in cursor.fetchall():
+            if project_id is not None:
+                facets["project"].append({"id": project_id, "key": project_key, "count": count})
+            elif issue_type is not None:
+                facets["issue_type"].append({"value": issue_type, "count": count})
+            elif priority is not None:
+                facets["priority"].append({"value": priority, "count": count})
+            else:
+                facets["state_category"].append({"value": state_category, "count": count})
+    
+    for buckets in facets.values():
+        buckets.sort(key=lambda bucket: -bucket["count"])
+    return facets
+
+
+def issue_board_columns(*, board: Board, limit: int = 20) -> list:
+    """
+    Get the first `limit` issues and the total count of every workflow state.
+
+    All columns come from one windowed query: ROW_NUMBER() and COUNT() are
+    partitioned by state, in the same newest-first order used by keyset
+    pagination, so "load more" can continue from the last issue shown.
+    Each column carries the issue list filters that select its issues.
+    """
+    from apps.projects.selectors import workflow_state_list
+    
+    states = list(workflow_state_list(workflow=board.project.workflow))
+    
+    qs = Issue.objects.filter(project_id=board.project_id)
+    board_filters = {}
+    if board.board_type == Board.BoardType.SCRUM:
+        sprint_ids = list(
+            Sprint.objects.filter(board=board, status=Sprint.Status.ACTIVE)
+            .order_by("id").values_list("id", flat=True)
+        )
+        qs = qs.filter(sprint_id__in=sprint_ids)
+        board_filters["sprint"] = sprint_ids
+    
+    ranked = qs.select_related(
+        "state",
+        "reporter",
+        "assignee",
     ).annotate(
-        rank=SearchRank("search_vector", search_query)
-    ).order_by("-rank", "-created_at")
+        column_position=Window(
+            RowNumber(),
+            partition_by=[F("state_id")],
+            order_by=[F("created_at").desc(), F("id").desc()],
+        ),
+        column_total=Window(Count("id"), partition_by=[F("state_id")]),
+    ).filter(
+        column_position__lte=limit
+    ).order_by("state_id", "column_position")
+    
+    issues_by_state = defaultdict(list)
+    totals = {}
+    for issue in ranked:
+        issues_by_state[issue.state_id].append(issue)
+        totals[issue.state_id] = issue.column_total
+    
+    return [
+        {
+            "state": state,
+            "total": totals.get(state.id, 0),
+            "issues": issues_by_state[state.id],
+            "filters": {**board_filters, "state": state.id},
+        }
+        for state in states
+    ]
 
 
 def issue_get_by_id(*, issue_id: int) -> Issue:
@@ -73,9 +232,9 @@ def issue_get_by_id(*, issue_id: int) -> Issue:
     ).get(id=issue_id)
 
 
-def issue_get_by_key(*, key: str) -> Issue:
-    """Get issue by key."""
-    return Issue.objects.select_related(
+def issue_get_by_key(*, key: str, prefetch: bool = True) -> Issue:
+    """Get issue by key (without watchers, attachments and subtasks if not `prefetch`)."""
+    qs = Issue.objects.select_related(
         "project",
         "state",
         "reporter",
@@ -83,11 +242,14 @@ def issue_get_by_key(*, key: str) -> Issue:
         "sprint",
         "epic",
         "parent",
-    ).prefetch_related(
-        "watchers__user",
-        "attachments",
-        "subtasks",
-    ).get(key=key)
+    )
+    if prefetch:
+        qs = qs.prefetch_related(
+            "watchers__user",
+            "attachments",
+            "subtasks",
+        )
+    return qs.get(key=key)
 
 
 def comment_list(*, issue: Issue) -> QuerySet:
@@ -110,13 +272,125 @@ def is_watching(*, issue: Issue, user: User) -> bool:
     return Watcher.objects.filter(issue=issue, user=user).exists()
 
 
-def event_list_by_project(*, project: Project, limit: int = 50) -> QuerySet:
-    """Get recent events for a project."""
-    return Event.objects.filter(project=project).select_related(
-        "actor", "issue"
-    )[:limit]
+def event_list_by_project(*, project: Project, limit: int = 50, since: int = None):
+    """
+    Get recent events for a project (all of them when `limit` is None).
+
+    `events` is partitioned by month, so the feed is first read from the
+    partitions of the last RECENT_EVENTS_WINDOW and only falls back to older
+    ones when that window holds fewer than `limit` events.
+
+    With `since`, events after that event id are returned oldest first, so a
+    poller that is more than `limit` events behind catches up by polling
+    again from the last id it received.
+    """
+    # Nothing predates the project, so older partitions are always pruned
+    qs = Event.objects.filter(
+        project=project,
+        created_at__gte=project.created_at - EVENT_CLOCK_SKEW,
+    ).select_related("actor", "issue")
+    if since is not None:
+        qs = _events_after(qs, since)
+    if limit is None:
+        return qs
+    if since is not None:
+        return qs.order_by("created_at", "id")[:limit]
+    
+    recent = list(qs.filter(created_at__gte=timezone.now() - RECENT_EVENTS_WINDOW)[:limit])
+    if len(recent) == limit:
+        return recent
+    return list(qs[:limit])
+
+
+def event_list_by_issue(*, issue: Issue, since: int = None, limit: int = None) -> QuerySet:
+    """
+    Get events for an issue, pruned to partitions after its creation.
+
+    With `since`, up to `limit` events after that event id are returned
+    oldest first, as in event_list_by_project.
+    """
+    qs = Event.objects.filter(
+        issue=issue,
+        created_at__gte=issue.created_at - EVENT_CLOCK_SKEW,
+    ).select_related("actor")
+    if since is not None:
+        qs = _events_after(qs, since).order_by("created_at", "id")
+        if limit is not None:
+            qs = qs[:limit]
+    return qs
+
+
+def event_latest(*, project: Project = None, issue: Issue = None):
+    """
+    Get (id, created_at) of the newest event of a project or issue, or None.
 
+    Reads the newest partitions first, so for an active feed this is a
+    single probe of the (..., -created_at, -id) index.
+    """
+    if issue is not None:
+        qs = Event.objects.filter(issue=issue, created_at__gte=issue.created_at - EVENT_CLOCK_SKEW)
+    else:
+        qs = Event.objects.filter(project=project, created_at__gte=project.created_at - EVENT_CLOCK_SKEW)
+    qs = qs.order_by("-created_at", "-id").values_list("id", "created_at")
+    
+    latest = qs.filter(created_at__gte=timezone.now() - RECENT_EVENTS_WINDOW).first()
+    if latest is None:
+        latest = qs.first()
+    return latest
+
+
+def _events_after(qs: QuerySet, event_id: int) -> QuerySet:
+    """Events newer than `event_id`, bounded by its time so old partitions are pruned."""
+    since_at = qs.filter(id=event_id).values_list("created_at", flat=True).first()
+    qs = qs.filter(id__gt=event_id)
+    if since_at is not None:
+        qs = qs.filter(created_at__gte=since_at - EVENT_CLOCK_SKEW)
+    return qs
 
-def event_list_by_issue(*, issue: Issue) -> QuerySet:
-    """Get events for an issue."""
-    return Event.objects.filter(issue=issue).select_related("actor")
+
+def saved_filter_list(*, project: Project, user: User) -> QuerySet:
+    """Get the user's own and shared saved filters of a project."""
+    return SavedFilter.objects.filter(
+        Q(owner=user) | Q(is_shared=True),
+        project=project,
+    ).select_related("project", "owner")
+
+
+def saved_filter_compiled(*, saved_filter: SavedFilter) -> dict:
+    """Get a filter's compiled query, recompiling forms stored by older versions."""
+    compiled = saved_filter.compiled
+    if compiled.get("version") != COMPILED_VERSION:
+        compiled = compile_query(saved_filter.query)
+    return compiled
+
+
+def saved_filter_results(*, saved_filter: SavedFilter, user: User, limit: int = 50) -> dict:
+    """
+    Get the match count and first `limit` issues of a saved filter.
+
+    Results are cached under the project's issue version, which issue
+    services bump on every change, so dashboards polling the same filter are
+    served from the cache until an issue in the project actually changes.
+    """
+    compiled = saved_filter_compiled(saved_filter=saved_filter)
+    version = cache_version_get(PROJECT_ISSUES_VERSION_KEY.format(project_id=saved_filter.project_id))
+    
+    key = None
+    if version is not None:
+        key = SAVED_FILTER_RESULTS_KEY.format(
+            filter_id=saved_filter.id,
+            updated=saved_filter.updated_at.timestamp(),
+            version=version,
+            # Only queries that mention `me` differ between users
+            user_id=user.id if compiled["uses_me"] else 0,
+            limit=limit,
+        )
+        results = cache.get(key)
+        if results is not None:
+            return results
+    
+    qs = issue_list_by_query(project=saved_filter.project, compiled=compiled, user=user)
+    results = {"count": qs.count(), "issues": list(qs[:limit])}
+    if key is not None:
+        cache.set(key, results, SAVED_FILTER_CACHE_TIMEOUT)
+    return results
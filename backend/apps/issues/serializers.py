@@ -1,18 +1,41 @@
 """
 Issue serializers.
 """
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
 
-from apps.issues.models import Attachment, Comment, Event, Issue, Watcher
+from apps.issues.importers import IMPORT_FORMATS, import_format_from_filename
+from apps.issues.models import Attachment, AttachmentUpload, Comment, Event, Issue, SavedFilter, Watcher
+from apps.issues.query_language import QueryLanguageError, compile_query
+from apps.projects.models import WorkflowState
 from apps.projects.serializers import WorkflowStateSerializer
+from apps.projects.workflow_graph import workflow_graph_get
 from apps.users.serializers import UserSerializer
+from common.pagination import KeysetPagination
+
+
+class AllowedTransitionsMixin:
+    """Embeds the allowed next states of an issue from the cached workflow graph."""
 
+    def get_allowed_transitions(self, obj):
+        # One graph lookup per workflow for the whole (list) serialization
+        graphs = self.context.setdefault("workflow_graphs", {})
+        workflow_id = obj.state.workflow_id
+        if workflow_id not in graphs:
+            graphs[workflow_id] = workflow_graph_get(workflow_id=workflow_id)
+        states = graphs[workflow_id].allowed_next_states(obj.state_id)
+        return WorkflowStateSerializer(states, many=True).data
 
-class IssueListSerializer(serializers.ModelSerializer):
+
+class IssueListSerializer(AllowedTransitionsMixin, serializers.ModelSerializer):
     """Lightweight issue serializer for lists."""
     reporter = UserSerializer(read_only=True)
     assignee = UserSerializer(read_only=True)
     state = WorkflowStateSerializer(read_only=True)
+    allowed_transitions = serializers.SerializerMethodField()
 
     class Meta:
         model = Issue
@@ -23,6 +46,7 @@ class IssueListSerializer(serializers.ModelSerializer):
             "issue_type",
             "priority",
             "state",
+            "allowed_transitions",
             "reporter",
             "assignee",
             "sprint",
@@ -33,11 +57,67 @@ class IssueListSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "key", "created_at", "updated_at"]
 
 
-class IssueDetailSerializer(serializers.ModelSerializer):
+class IssueSearchResultSerializer(IssueListSerializer):
+    """Issue list serializer with search rank and highlighted snippets."""
+    rank = serializers.FloatField(read_only=True, default=None)
+    title_highlight = serializers.CharField(read_only=True, default=None)
+    description_highlight = serializers.CharField(read_only=True, default=None)
+
+    class Meta(IssueListSerializer.Meta):
+        fields = IssueListSerializer.Meta.fields + ["rank", "title_highlight", "description_highlight"]
+
+
+class GlobalSearchResultSerializer(IssueSearchResultSerializer):
+    """Search result serializer for results spanning several projects."""
+    project_key = serializers.CharField(source="project.key", read_only=True)
+
+    class Meta(IssueSearchResultSerializer.Meta):
+        fields = ["project", "project_key"] + IssueSearchResultSerializer.Meta.fields
+
+
+class GlobalSearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the cross-project search."""
+    q = serializers.CharField(max_length=200)
+    project = serializers.IntegerField(required=False)
+    issue_type = serializers.ChoiceField(choices=Issue.Type.choices, required=False)
+    priority = serializers.ChoiceField(choices=Issue.Priority.choices, required=False)
+    state_category = serializers.ChoiceField(choices=WorkflowState.Category.choices, required=False)
+
+
+class BoardColumnSerializer(serializers.Serializer):
+    """One workflow state column of a board."""
+    state = WorkflowStateSerializer(read_only=True)
+    total = serializers.IntegerField(read_only=True)
+    issues = IssueListSerializer(many=True, read_only=True)
+    next = serializers.SerializerMethodField()
+
+    def get_next(self, obj):
+        """Link to the issue list continuing this column after its last issue."""
+        if len(obj["issues"]) >= obj["total"]:
+            return None
+        
+        request = self.context["request"]
+        last = obj["issues"][-1]
+        paginator = KeysetPagination()
+        column_filters = {
+            name: ",".join(str(value) for value in values) if isinstance(values, list) else values
+            for name, values in obj["filters"].items()
+        }
+        query = urlencode({
+            **column_filters,
+            paginator.cursor_query_param: paginator.encode_cursor(*paginator.get_cursor_values(last)),
+            paginator.page_size_query_param: self.context["limit"],
+        })
+        url = reverse("issue-list", kwargs={"project_id": last.project_id})
+        return request.build_absolute_uri(f"{url}?{query}")
+
+
+class IssueDetailSerializer(AllowedTransitionsMixin, serializers.ModelSerializer):
     """Detailed issue serializer."""
     reporter = UserSerializer(read_only=True)
     assignee = UserSerializer(read_only=True)
     state = WorkflowStateSerializer(read_only=True)
+    allowed_transitions = serializers.SerializerMethodField()
     watchers = serializers.SerializerMethodField()
     is_watching = serializers.SerializerMethodField()
     comment_count = serializers.SerializerMethodField()
@@ -54,6 +134,7 @@ class IssueDetailSerializer(serializers.ModelSerializer):
             "issue_type",
             "priority",
             "state",
+            "allowed_transitions",
             "reporter",
             "assignee",
             "sprint",
@@ -131,6 +212,21 @@ class IssueCreateSerializer(serializers.ModelSerializer):
         )
 
 
+class IssueImportSerializer(serializers.Serializer):
+    """Serializer for bulk issue import uploads."""
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=IMPORT_FORMATS, required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("format"):
+            attrs["format"] = import_format_from_filename(attrs["file"].name)
+        if not attrs["format"]:
+            raise serializers.ValidationError(
+                {"format": "Could not infer format from file name. Use csv or jsonl."}
+            )
+        return attrs
+
+
 class IssueUpdateSerializer(serializers.ModelSerializer):
     """Issue update serializer."""
     assignee_id = serializers.IntegerField(required=False, allow_null=True)
@@ -155,7 +251,6 @@ class IssueUpdateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         from apps.issues.services import issue_update
-        from apps.projects.models import WorkflowState
         from django.contrib.auth import get_user_model
         
         User = get_user_model()
@@ -169,11 +264,66 @@ class IssueUpdateSerializer(serializers.ModelSerializer):
         # Handle state
         if "state_id" in validated_data:
             state_id = validated_data.pop("state_id")
-            validated_data["state"] = WorkflowState.objects.get(id=state_id)
+            graph = workflow_graph_get(workflow_id=instance.state.workflow_id)
+            if state_id not in graph.states:
+                raise serializers.ValidationError({"state_id": "Invalid state ID."})
+            validated_data["state"] = graph.states[state_id]
         
         return issue_update(issue=instance, actor=actor, **validated_data)
 
 
+class IssueBulkChangeSerializer(serializers.Serializer):
+    """Change set applied by a bulk issue update."""
+    state_id = serializers.IntegerField(required=False)
+    sprint = serializers.IntegerField(required=False, allow_null=True)
+    assignee_id = serializers.IntegerField(required=False, allow_null=True)
+    priority = serializers.ChoiceField(choices=Issue.Priority.choices, required=False)
+    epic = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        from apps.projects.models import Epic, Sprint, WorkflowState
+        from django.contrib.auth import get_user_model
+        
+        User = get_user_model()
+        project = self.context["project"]
+        
+        if not attrs:
+            raise serializers.ValidationError("At least one change is required.")
+        
+        lookups = {
+            "state_id": ("state", WorkflowState.objects.filter(workflow__project=project)),
+            "sprint": ("sprint", Sprint.objects.filter(board__project=project)),
+            "assignee_id": ("assignee", User.objects.filter(project_memberships__project=project)),
+            "epic": ("epic", Epic.objects.filter(project=project)),
+        }
+        changes = {}
+        for field, value in attrs.items():
+            if field not in lookups:
+                changes[field] = value
+                continue
+            
+            name, queryset = lookups[field]
+            if value is None:
+                changes[name] = None
+                continue
+            try:
+                changes[name] = queryset.get(id=value)
+            except queryset.model.DoesNotExist:
+                raise serializers.ValidationError({field: f"Invalid {name} for this project."})
+        
+        return changes
+
+
+class IssueBulkUpdateSerializer(serializers.Serializer):
+    """Serializer for bulk issue updates."""
+    keys = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        allow_empty=False,
+        max_length=500,
+    )
+    changes = IssueBulkChangeSerializer()
+
+
 class CommentSerializer(serializers.ModelSerializer):
     """Comment serializer."""
     author = UserSerializer(read_only=True)
@@ -194,6 +344,45 @@ class CommentSerializer(serializers.ModelSerializer):
         return comment_update(comment=instance, **validated_data)
 
 
+class SavedFilterSerializer(serializers.ModelSerializer):
+    """Saved filter serializer."""
+    owner = UserSerializer(read_only=True)
+
+    class Meta:
+        model = SavedFilter
+        fields = ["id", "name", "query", "is_shared", "owner", "created_at", "updated_at"]
+        read_only_fields = ["id", "owner", "created_at", "updated_at"]
+
+    def validate_query(self, value):
+        try:
+            compile_query(value)
+        except QueryLanguageError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+
+    def validate_name(self, value):
+        project = self.context["project"]
+        owner = self.context["request"].user
+        qs = SavedFilter.objects.filter(project=project, owner=owner, name=value)
+        if self.instance:
+            qs = qs.exclude(pk=self.instance.pk)
+        if qs.exists():
+            raise serializers.ValidationError("You already have a filter with this name.")
+        return value
+
+    def create(self, validated_data):
+        from apps.issues.services import saved_filter_create
+        return saved_filter_create(
+            project=self.context["project"],
+            owner=self.context["request"].user,
+            **validated_data,
+        )
+
+    def update(self, instance, validated_data):
+        from apps.issues.services import saved_filter_update
+        return saved_filter_update(saved_filter=instance, **validated_data)
+
+
 class AttachmentSerializer(serializers.ModelSerializer):
     """Attachment serializer."""
     uploaded_by = UserSerializer(read_only=True)
@@ -219,18 +408,50 @@ class AttachmentSerializer(serializers.ModelSerializer):
         return None
 
     def create(self, validated_data):
-        from apps.issues.services import attachment_create
+        from apps.issues.services import attachment_create_from_file
         issue = self.context["issue"]
         uploaded_by = self.context["request"].user
         file = self.context["request"].FILES.get("file")
         
-        return attachment_create(
-            issue=issue,
-            uploaded_by=uploaded_by,
-            file=file,
-            filename=file.name,
-            file_size=file.size,
-            content_type=file.content_type,
+        return attachment_create_from_file(issue=issue, uploaded_by=uploaded_by, file=file)
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    """Chunked upload state; `offset` is where the next part must start."""
+    offset = serializers.IntegerField(source="received_bytes", read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+    content_type = serializers.CharField(max_length=100, required=False, default="application/octet-stream")
+
+    class Meta:
+        model = AttachmentUpload
+        fields = [
+            "id",
+            "filename",
+            "content_type",
+            "file_size",
+            "offset",
+            "chunk_size",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+    def get_chunk_size(self, obj) -> int:
+        return settings.ATTACHMENT_UPLOAD_CHUNK_SIZE
+
+    def validate_file_size(self, value):
+        if not 0 < value <= settings.ATTACHMENT_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Attachments must be between 1 and {settings.ATTACHMENT_MAX_SIZE} bytes."
+            )
+        return value
+
+    def create(self, validated_data):
+        from apps.issues.services import attachment_upload_initiate
+        return attachment_upload_initiate(
+            issue=self.context["issue"],
+            uploaded_by=self.context["request"].user,
+            **validated_data,
         )
 
 
@@ -260,18 +481,21 @@ class IssueTransitionSerializer(serializers.Serializer):
     to_state_id = serializers.IntegerField()
 
     def validate_to_state_id(self, value):
-        from apps.projects.models import WorkflowState
-        from apps.projects.selectors import workflow_can_transition
+        issue = self.context["issue"]
+        graph = workflow_graph_get(workflow_id=issue.state.workflow_id)
         
-        try:
-            to_state = WorkflowState.objects.get(id=value)
-        except WorkflowState.DoesNotExist:
+        to_state = graph.states.get(value)
+        if to_state is None:
             raise serializers.ValidationError("Invalid state ID.")
         
-        issue = self.context["issue"]
-        if not workflow_can_transition(from_state=issue.state, to_state=to_state):
+        if not graph.can_transition(issue.state_id, to_state.id):
             raise serializers.ValidationError(
                 f"Cannot transition from {issue.state.name} to {to_state.name}."
             )
         
         return value
+
+    def validate(self, attrs):
+        graph = workflow_graph_get(workflow_id=self.context["issue"].state.workflow_id)
+        attrs["to_state"] = graph.states[attrs["to_state_id"]]
+        return attrs
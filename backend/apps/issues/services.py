@@ -1,17 +1,60 @@
 """
 Issue services.
 """
+from itertools import islice
+from typing import Iterable, Optional
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.postgres.search import SearchVector
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, QuerySet
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
-from apps.issues.models import Attachment, Comment, Event, Issue, Watcher
+from apps.issues.importers import import_row_to_fields, resolve_import_references
+from apps.issues.models import (
+    Attachment,
+    AttachmentBlob,
+    AttachmentUpload,
+    Comment,
+    Event,
+    Issue,
+    IssueSequence,
+    SavedFilter,
+    Watcher,
+)
+from apps.issues.query_language import compile_query
+from apps.issues.search import rebuild_search_vectors
+from apps.issues.selectors import PROJECT_ISSUES_VERSION_KEY
+from apps.issues.uploads import (
+    UploadOffsetMismatch,
+    attachment_storage,
+    blob_name,
+    blob_write,
+    content_sha256,
+    upload_content,
+    upload_part_write,
+    upload_parts_delete,
+)
+from apps.notifications.models import Notification
+from apps.notifications.services import (
+    notification_unread_release,
+    outbox_bulk_create,
+    outbox_create,
+)
 from apps.projects.models import Epic, Project, Sprint, WorkflowState
 from apps.projects.selectors import workflow_can_transition
+from apps.projects.workflow_graph import workflow_graph_get
+from common.cache import cache_version_bump
+from common.realtime import issue_channel, project_channel
+from common.realtime import publish as realtime_publish
 
 User = get_user_model()
 
+SEARCH_REINDEX_SCHEDULED_KEY = "issues:search_reindex:scheduled"
+SEARCH_REINDEX_SCHEDULE_TIMEOUT = 60
+
 
 @transaction.atomic
 def issue_create(
@@ -49,10 +92,6 @@ def issue_create(
         **kwargs
     )
     
-    # Update search vector
-    issue.search_vector = SearchVector("title", weight="A") + SearchVector("description", weight="B")
-    issue.save(update_fields=["search_vector"])
-    
     # Create event
     event_create(
         project=project,
@@ -65,27 +104,109 @@ def issue_create(
     # Auto-watch for reporter
     watcher_add(issue=issue, user=reporter)
     
+    project_issues_changed(project_id=project.id)
+    
     return issue
 
 
+def issue_bulk_import(
+    *,
+    project: Project,
+    rows: Iterable[tuple[int, Optional[dict]]],
+    default_reporter: User,
+    batch_size: int = 500,
+) -> dict:
+    """
+    Import issues from `(row_number, row)` pairs in fixed-size batches.
+
+    Each batch resolves its users, epics and sprints in one query per type,
+    reserves a block of sequence numbers and bulk-inserts the issues, their
+    creation events and reporter watchers in a single transaction. Invalid
+    rows are reported and skipped without aborting the import.
+    """
+    from apps.projects.selectors import workflow_get_initial_state
+
+    initial_state = workflow_get_initial_state(workflow=project.workflow)
+    rows = iter(rows)
+    created = 0
+    errors = []
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        lookups = resolve_import_references(project=project, batch=batch)
+        valid = []
+        for row_number, row in batch:
+            fields, row_errors = import_row_to_fields(
+                row, lookups=lookups, default_reporter=default_reporter
+            )
+            if row_errors:
+                errors.append({"row": row_number, "errors": row_errors})
+            else:
+                valid.append(fields)
+
+        if valid:
+            _issue_bulk_insert(project=project, initial_state=initial_state, rows=valid)
+            created += len(valid)
+
+    return {"created": created, "failed": len(errors), "errors": errors}
+
+
+@transaction.atomic
+def _issue_bulk_insert(*, project: Project, initial_state: WorkflowState, rows: list) -> list:
+    """Insert one batch of validated import rows."""
+    first_sequence = IssueSequence.allocate(project_id=project.id, count=len(rows))
+    issues = [
+        Issue(
+            project=project,
+            sequence=first_sequence + offset,
+            key=f"{project.key}-{first_sequence + offset}",
+            state=initial_state,
+            **fields,
+        )
+        for offset, fields in enumerate(rows)
+    ]
+    Issue.objects.bulk_create(issues)
+
+    Event.objects.bulk_create([
+        Event(
+            project=project,
+            issue=issue,
+            event_type=Event.EventType.ISSUE_CREATED,
+            actor=issue.reporter,
+            data={"title": issue.title, "key": issue.key},
+        )
+        for issue in issues
+    ])
+    Watcher.objects.bulk_create(
+        [Watcher(issue=issue, user=issue.reporter) for issue in issues],
+        ignore_conflicts=True,
+    )
+    project_issues_changed(project_id=project.id)
+    return issues
+
+
 @transaction.atomic
 def issue_update(*, issue: Issue, actor: User, **data) -> Issue:
     """Update an issue."""
+    # Old ids of changed relations, stored as JSON in the update event
     old_values = {}
     
     # Track changes for events
     if "assignee" in data and data["assignee"] != issue.assignee:
-        old_values["assignee"] = issue.assignee
+        old_values["assignee"] = issue.assignee_id
         issue.assignee = data.pop("assignee")
         if issue.assignee:
             watcher_add(issue=issue, user=issue.assignee)
     
     if "sprint" in data and data["sprint"] != issue.sprint:
-        old_values["sprint"] = issue.sprint
+        old_values["sprint"] = issue.sprint_id
         issue.sprint = data.pop("sprint")
     
     if "state" in data and data["state"] != issue.state:
-        old_values["state"] = issue.state
+        old_values["state"] = issue.state_id
         new_state = data.pop("state")
         # Validate transition
         if not workflow_can_transition(from_state=issue.state, to_state=new_state):
@@ -102,11 +223,8 @@ def issue_update(*, issue: Issue, actor: User, **data) -> Issue:
     for field, value in data.items():
         setattr(issue, field, value)
     
-    # Update search vector if title or description changed
-    if "title" in data or "description" in data:
-        issue.search_vector = SearchVector("title", weight="A") + SearchVector("description", weight="B")
-    
     issue.save()
+    changed_fields = sorted({*old_values, *data})
     
     # Create update event
     event_create(
@@ -117,6 +235,31 @@ def issue_update(*, issue: Issue, actor: User, **data) -> Issue:
         data={"changes": old_values, "key": issue.key},
     )
     
+    if "assignee" in old_values and issue.assignee_id:
+        outbox_create(
+            event_type="issue_assigned",
+            payload={"issue_id": issue.id, "assignee_id": issue.assignee_id, "actor_id": actor.id},
+        )
+    if "state" in old_values:
+        outbox_create(
+            event_type="issue_state_changed",
+            payload={
+                "issue_id": issue.id,
+                "actor_id": actor.id,
+                "from_state_id": old_values["state"],
+                "to_state_id": issue.state_id,
+            },
+        )
+    
+    project_issues_changed(project_id=issue.project_id)
+    _publish_issue_change(issue, {
+        "type": "issue.updated",
+        "fields": changed_fields,
+        "state": issue.state_id,
+        "assignee": issue.assignee_id,
+        "actor": actor.id,
+    })
+    
     return issue
 
 
@@ -150,9 +293,153 @@ def issue_transition(*, issue: Issue, to_state: WorkflowState, actor: User) -> I
         },
     )
     
+    outbox_create(
+        event_type="issue_state_changed",
+        payload={
+            "issue_id": issue.id,
+            "actor_id": actor.id,
+            "from_state_id": old_state.id,
+            "to_state_id": to_state.id,
+        },
+    )
+    
+    project_issues_changed(project_id=issue.project_id)
+    _publish_issue_change(issue, {
+        "type": "issue.transitioned",
+        "from_state": old_state.id,
+        "state": to_state.id,
+        "actor": actor.id,
+    })
+    
     return issue
 
 
+@transaction.atomic
+def issue_bulk_update(*, project: Project, keys: list, changes: dict, actor: User) -> dict:
+    """
+    Apply one change set to many issues of a project.
+
+    `changes` may hold `state`, `sprint`, `assignee`, `priority` and `epic`.
+    State changes are checked against the cached workflow graph; keys that
+    are missing or cannot make the transition are rejected. The accepted
+    issues are changed with a single UPDATE and their events, outbox
+    messages and assignee watchers are written with bulk_create; each
+    accepted issue gets its own realtime change message after commit.
+    """
+    issues = {
+        issue.key: issue
+        for issue in Issue.objects.filter(
+            project=project, key__in=keys
+        ).select_related("state").select_for_update(of=("self",))
+    }
+
+    to_state = changes.get("state")
+    graph = workflow_graph_get(workflow_id=to_state.workflow_id) if to_state else None
+
+    accepted = []
+    rejected = []
+    for key in dict.fromkeys(keys):
+        issue = issues.get(key)
+        if issue is None:
+            rejected.append({"key": key, "error": "Issue not found."})
+        elif (
+            to_state
+            and issue.state_id != to_state.id
+            and not graph.can_transition(issue.state_id, to_state.id)
+        ):
+            rejected.append({
+                "key": key,
+                "error": f"Cannot transition from {issue.state.name} to {to_state.name}.",
+            })
+        else:
+            accepted.append(issue)
+
+    if not accepted:
+        return {"updated": [], "rejected": rejected}
+
+    now = timezone.now()
+    update_fields = {field: value for field, value in changes.items() if field != "state"}
+    if to_state:
+        update_fields["state"] = to_state
+        if to_state.category == WorkflowState.Category.DONE:
+            update_fields["resolved_at"] = Coalesce(F("resolved_at"), now)
+        else:
+            update_fields["resolved_at"] = None
+    Issue.objects.filter(id__in=[issue.id for issue in accepted]).update(
+        updated_at=now, **update_fields
+    )
+
+    assignee = changes.get("assignee")
+    events = []
+    messages = []
+    for issue in accepted:
+        if to_state and issue.state_id != to_state.id:
+            messages.append(("issue_state_changed", {
+                "issue_id": issue.id,
+                "actor_id": actor.id,
+                "from_state_id": issue.state_id,
+                "to_state_id": to_state.id,
+            }))
+            events.append(Event(
+                project=project,
+                issue=issue,
+                event_type=Event.EventType.STATE_CHANGED,
+                actor=actor,
+                data={
+                    "key": issue.key,
+                    "from_state": issue.state.name,
+                    "to_state": to_state.name,
+                },
+            ))
+
+        old_values = {}
+        for field, value in changes.items():
+            if field == "state":
+                continue
+            old = getattr(issue, f"{field}_id") if field != "priority" else issue.priority
+            new = value.id if value is not None and field != "priority" else value
+            if old != new:
+                old_values[field] = old
+        if old_values:
+            events.append(Event(
+                project=project,
+                issue=issue,
+                event_type=Event.EventType.ISSUE_UPDATED,
+                actor=actor,
+                data={"changes": old_values, "key": issue.key},
+            ))
+        if assignee and issue.assignee_id != assignee.id:
+            messages.append(("issue_assigned", {
+                "issue_id": issue.id,
+                "assignee_id": assignee.id,
+                "actor_id": actor.id,
+            }))
+    Event.objects.bulk_create(events)
+    outbox_bulk_create(messages=messages)
+
+    if assignee:
+        Watcher.objects.bulk_create(
+            [Watcher(issue=issue, user=assignee) for issue in accepted],
+            ignore_conflicts=True,
+        )
+
+    project_issues_changed(project_id=project.id)
+    changed_fields = sorted(changes)
+    _publish_issue_changes([
+        (issue, {
+            "type": "issue.updated",
+            "fields": changed_fields,
+            "state": to_state.id if to_state else issue.state_id,
+            "assignee": assignee.id if assignee else (
+                None if "assignee" in changes else issue.assignee_id
+            ),
+            "actor": actor.id,
+        })
+        for issue in accepted
+    ])
+    return {"updated": [issue.key for issue in accepted], "rejected": rejected}
+
+
 @transaction.atomic
 def issue_delete(*, issue: Issue, actor: User) -> None:
     """Delete an issue."""
@@ -165,7 +452,96 @@ def issue_delete(*, issue: Issue, actor: User) -> None:
         data={"key": issue.key, "title": issue.title},
     )
     
+    project_id = issue.project_id
+    # The issue's attachments, uploads and notifications go with it
+    released = _attachment_refs_release(Attachment.objects.filter(issue=issue))
+    _attachment_uploads_abort(AttachmentUpload.objects.filter(issue=issue))
+    notification_unread_release(notifications=Notification.objects.filter(issue=issue))
     issue.delete()
+    project_issues_changed(project_id=project_id)
+    transaction.on_commit(lambda: _attachment_blobs_collect_all(released))
+
+
+@transaction.atomic
+def project_issues_delete(*, project: Project) -> None:
+    """
+    Delete every issue of a project.
+
+    Like issue_delete, releases the blob references, upload parts and
+    unread counts the cascade would otherwise leave behind.
+    """
+    released = _attachment_refs_release(Attachment.objects.filter(issue__project=project))
+    _attachment_uploads_abort(AttachmentUpload.objects.filter(issue__project=project))
+    notification_unread_release(notifications=Notification.objects.filter(issue__project=project))
+    Issue.objects.filter(project=project).delete()
+    project_issues_changed(project_id=project.id)
+    transaction.on_commit(lambda: _attachment_blobs_collect_all(released))
+
+
+def _publish_issue_change(issue: Issue, message: dict) -> None:
+    """Push a change message to the issue's and its project's subscribers after commit."""
+    _publish_issue_changes([(issue, message)])
+
+
+def _publish_issue_changes(changes: list) -> None:
+    """Push one change message per `(issue, message)` pair after commit."""
+    published = [
+        (
+            [project_channel(issue.project_id), issue_channel(issue.id)],
+            {"project": issue.project_id, "issue": issue.id, "key": issue.key, **message},
+        )
+        for issue, message in changes
+    ]
+
+    def publish_all():
+        for channels, message in published:
+            realtime_publish(channels, message)
+
+    transaction.on_commit(publish_all)
+
+
+def project_issues_changed(*, project_id: int) -> None:
+    """Bump the project's issue version after commit, expiring cached filter results."""
+    transaction.on_commit(
+        lambda: cache_version_bump(PROJECT_ISSUES_VERSION_KEY.format(project_id=project_id))
+    )
+
+
+@transaction.atomic
+def saved_filter_create(
+    *,
+    project: Project,
+    owner: User,
+    name: str,
+    query: str,
+    is_shared: bool = False,
+) -> SavedFilter:
+    """Create a saved filter, compiling its query once."""
+    return SavedFilter.objects.create(
+        project=project,
+        owner=owner,
+        name=name,
+        query=query,
+        compiled=compile_query(query),
+        is_shared=is_shared,
+    )
+
+
+@transaction.atomic
+def saved_filter_update(*, saved_filter: SavedFilter, **data) -> SavedFilter:
+    """Update a saved filter, recompiling its query if it changed."""
+    for field, value in data.items():
+        setattr(saved_filter, field, value)
+    if "query" in data:
+        saved_filter.compiled = compile_query(saved_filter.query)
+    saved_filter.save()
+    return saved_filter
+
+
+@transaction.atomic
+def saved_filter_delete(*, saved_filter: SavedFilter) -> None:
+    """Delete a saved filter."""
+    saved_filter.delete()
 
 
 @transaction.atomic
@@ -189,6 +565,17 @@ def comment_create(*, issue: Issue, author: User, content: str) -> Comment:
     # Auto-watch for commenter
     watcher_add(issue=issue, user=author)
     
+    outbox_create(
+        event_type="issue_commented",
+        payload={"issue_id": issue.id, "author_id": author.id, "comment_id": comment.id},
+    )
+    issue_search_mark_dirty(issue_id=issue.id)
+    _publish_issue_change(issue, {
+        "type": "comment.created",
+        "comment": comment.id,
+        "author": author.id,
+    })
+    
     return comment
 
 
@@ -197,13 +584,65 @@ def comment_update(*, comment: Comment, content: str) -> Comment:
     """Update a comment."""
     comment.content = content
     comment.save()
+    issue_search_mark_dirty(issue_id=comment.issue_id)
     return comment
 
 
 @transaction.atomic
 def comment_delete(*, comment: Comment) -> None:
     """Delete a comment."""
+    issue_id = comment.issue_id
     comment.delete()
+    issue_search_mark_dirty(issue_id=issue_id)
+
+
+def issue_search_mark_dirty(*, issue_id: int) -> None:
+    """
+    Flag an issue's search vector as stale and schedule a batched rebuild
+    once the current transaction commits.
+    """
+    # Unconditional so a concurrent rebuild holding the row lock is waited on
+    # and cannot clear the flag before this change is visible to it
+    Issue.objects.filter(pk=issue_id).update(search_dirty=True)
+    transaction.on_commit(_schedule_search_reindex)
+
+
+def issue_search_reindex_dirty(*, batch_size: int = 500) -> int:
+    """
+    Rebuild the search vectors of one batch of dirty issues.
+
+    Rows locked by a concurrent rebuild are skipped, so several workers can
+    drain the backlog side by side. Returns the number of issues rebuilt.
+    """
+    with transaction.atomic():
+        issue_ids = list(
+            Issue.objects.filter(search_dirty=True)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        return rebuild_search_vectors(issue_ids)
+
+
+def issue_search_reindex(*, issue_ids: list) -> int:
+    """Rebuild the search vectors of the given issues, dirty or not."""
+    with transaction.atomic():
+        locked_ids = list(
+            Issue.objects.filter(id__in=issue_ids)
+            .select_for_update()
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        return rebuild_search_vectors(locked_ids)
+
+
+def _schedule_search_reindex() -> None:
+    from apps.issues.tasks import reindex_dirty_issues
+    
+    # Coalesce bursts of comment changes into one queued task; the task
+    # clears the key when it starts
+    if cache.add(SEARCH_REINDEX_SCHEDULED_KEY, 1, SEARCH_REINDEX_SCHEDULE_TIMEOUT):
+        reindex_dirty_issues.delay()
 
 
 @transaction.atomic
@@ -211,20 +650,26 @@ def attachment_create(
     *,
     issue: Issue,
     uploaded_by: User,
-    file,
+    blob: AttachmentBlob,
     filename: str,
     file_size: int,
     content_type: str,
 ) -> Attachment:
-    """Create an attachment."""
+    """
+    Record an attachment of content that is already stored as `blob`.
+
+    Only metadata is written; the blob gains a reference.
+    """
     attachment = Attachment.objects.create(
         issue=issue,
         uploaded_by=uploaded_by,
-        file=file,
+        blob=blob,
+        file=blob.file.name,
         filename=filename,
         file_size=file_size,
         content_type=content_type,
     )
+    AttachmentBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
     
     # Create event
     event_create(
@@ -238,11 +683,260 @@ def attachment_create(
     return attachment
 
 
+def attachment_create_from_file(*, issue: Issue, uploaded_by: User, file) -> Attachment:
+    """Attach an uploaded file, storing its content only if no blob has it yet."""
+    # Hash before opening the transaction; it reads the whole file
+    sha256 = content_sha256(file)
+    with transaction.atomic():
+        blob = attachment_blob_acquire(sha256=sha256, size=file.size, content=file, filename=file.name)
+        return attachment_create(
+            issue=issue,
+            uploaded_by=uploaded_by,
+            blob=blob,
+            filename=file.name,
+            file_size=file.size,
+            content_type=file.content_type,
+        )
+
+
+def attachment_blob_acquire(*, sha256: str, size: int, content, filename: str) -> AttachmentBlob:
+    """
+    Get the blob for `sha256`, writing `content` to storage only if it is new.
+
+    A new blob's file name keeps the extension of `filename`.
+
+    Must run inside the transaction that adds the reference: the blob row
+    stays locked until commit, so the collector cannot delete it in between.
+    """
+    while True:
+        blob, _ = AttachmentBlob.objects.get_or_create(
+            sha256=sha256,
+            defaults={"size": size, "file": blob_name(sha256, filename)},
+        )
+        locked = AttachmentBlob.objects.select_for_update().filter(pk=blob.pk).first()
+        if locked is not None:
+            break
+        # Collected between the lookup and the lock; create it afresh
+    blob_write(name=locked.file.name, content=content)
+    return locked
+
+
+def attachment_blobs_collect(*, blob_ids: Optional[list] = None, batch_size: int = 100) -> int:
+    """
+    Delete one batch of unreferenced blobs and their files.
+
+    Blobs are selected on having no attachment, not on ref_count, so
+    references left behind by cascades outside the services (user or admin
+    deletes) do not keep them alive. Rows are locked with SKIP LOCKED, so a
+    blob being attached concurrently, whose row attachment_blob_acquire
+    holds until commit, is left alone. Files are removed before commit: if
+    the commit then fails, the surviving row points at a missing file and
+    the next upload of that content writes it again. Returns the number of
+    blobs deleted.
+    """
+    if blob_ids is not None and not blob_ids:
+        return 0
+    with transaction.atomic():
+        orphans = AttachmentBlob.objects.exclude(
+            Exists(Attachment.objects.filter(blob=OuterRef("pk")))
+        )
+        if blob_ids is not None:
+            orphans = orphans.filter(id__in=blob_ids)
+        blobs = list(orphans.select_for_update(skip_locked=True).order_by("id")[:batch_size])
+        if not blobs:
+            return 0
+        
+        AttachmentBlob.objects.filter(id__in=[blob.id for blob in blobs]).delete()
+        storage = attachment_storage()
+        for blob in blobs:
+            storage.delete(blob.file.name)
+    return len(blobs)
+
+
+def attachment_blobs_recount() -> int:
+    """Reset every blob's ref_count from its attachments; returns rows corrected."""
+    with transaction.atomic():
+        # Lock first so no reference is added between counting and writing
+        blobs = list(AttachmentBlob.objects.select_for_update().only("id", "ref_count").order_by("id"))
+        counts = dict(
+            Attachment.objects.filter(blob__isnull=False)
+            .values("blob_id").annotate(refs=Count("id")).order_by().values_list("blob_id", "refs")
+        )
+        corrected = 0
+        for blob in blobs:
+            refs = counts.get(blob.id, 0)
+            if blob.ref_count != refs:
+                AttachmentBlob.objects.filter(pk=blob.pk).update(ref_count=refs)
+                corrected += 1
+    return corrected
+
+
+def _attachment_blobs_collect_all(blob_ids: list, batch_size: int = 100) -> None:
+    """Collect `blob_ids` in batches of `batch_size`."""
+    for start in range(0, len(blob_ids), batch_size):
+        attachment_blobs_collect(blob_ids=blob_ids[start:start + batch_size], batch_size=batch_size)
+
+
+def _attachment_refs_release(attachments: QuerySet) -> list:
+    """Release the blob references of `attachments` before they are deleted."""
+    blob_refs = (
+        attachments.filter(blob__isnull=False)
+        .values("blob_id").annotate(refs=Count("id")).order_by("blob_id")
+    )
+    return _blob_refs_release({row["blob_id"]: row["refs"] for row in blob_refs})
+
+
+def _blob_refs_release(refs: dict) -> list:
+    """Take `refs[blob_id]` references off each blob; returns the blob ids."""
+    for blob_id, count in sorted(refs.items()):
+        AttachmentBlob.objects.filter(pk=blob_id).update(ref_count=Greatest(F("ref_count") - count, 0))
+    return sorted(refs)
+
+
+@transaction.atomic
+def attachment_upload_initiate(
+    *,
+    issue: Issue,
+    uploaded_by: User,
+    filename: str,
+    content_type: str,
+    file_size: int,
+) -> AttachmentUpload:
+    """Start a chunked upload; parts are then sent with attachment_upload_append."""
+    return AttachmentUpload.objects.create(
+        issue=issue,
+        uploaded_by=uploaded_by,
+        filename=filename,
+        content_type=content_type,
+        file_size=file_size,
+    )
+
+
+@transaction.atomic
+def attachment_upload_append(*, upload: AttachmentUpload, offset: int, stream, size: int) -> AttachmentUpload:
+    """
+    Store the next part of an upload, read from `stream`.
+
+    The part must start at the upload's current end, so a resumed client
+    that resends an already stored part gets UploadOffsetMismatch with the
+    offset to continue from. The upload row stays locked while the part is
+    written, which serializes duplicate requests.
+    """
+    upload = AttachmentUpload.objects.select_for_update().get(pk=upload.pk)
+    if offset != upload.received_bytes:
+        raise UploadOffsetMismatch(upload.received_bytes)
+    if not 0 < size <= settings.ATTACHMENT_UPLOAD_CHUNK_SIZE:
+        raise ValueError(f"Parts must be between 1 and {settings.ATTACHMENT_UPLOAD_CHUNK_SIZE} bytes.")
+    if offset + size > upload.file_size:
+        raise ValueError(f"Part ends past the declared size of {upload.file_size} bytes.")
+    
+    upload.parts.append(upload_part_write(upload_id=upload.id, offset=offset, stream=stream, size=size))
+    upload.received_bytes += size
+    upload.save(update_fields=["parts", "received_bytes", "updated_at"])
+    return upload
+
+
+def attachment_upload_complete(*, upload: AttachmentUpload) -> Attachment:
+    """
+    Turn a fully received upload into an attachment.
+
+    The parts are hashed before the transaction, holding no locks; the
+    upload is then locked and re-checked against the hashed parts. They are
+    copied into a blob only if that content is not stored yet.
+    """
+    if upload.received_bytes != upload.file_size:
+        raise ValueError(f"Upload incomplete: {upload.received_bytes} of {upload.file_size} bytes received.")
+    parts = list(upload.parts)
+    sha256 = content_sha256(upload_content(parts=parts, size=upload.file_size))
+
+    with transaction.atomic():
+        upload = AttachmentUpload.objects.select_for_update().select_related(
+            "issue__project"
+        ).filter(pk=upload.pk).first()
+        if upload is None:
+            raise ValueError("Upload was aborted or already completed.")
+        if upload.parts != parts:
+            raise ValueError("Upload changed while it was being completed.")
+
+        blob = attachment_blob_acquire(
+            sha256=sha256,
+            size=upload.file_size,
+            content=upload_content(parts=parts, size=upload.file_size),
+            filename=upload.filename,
+        )
+        attachment = attachment_create(
+            issue=upload.issue,
+            uploaded_by=upload.uploaded_by,
+            blob=blob,
+            filename=upload.filename,
+            file_size=upload.file_size,
+            content_type=upload.content_type,
+        )
+
+        upload.delete()
+        transaction.on_commit(lambda: upload_parts_delete(parts))
+    return attachment
+
+
+@transaction.atomic
+def attachment_upload_abort(*, upload: AttachmentUpload) -> None:
+    """Discard an upload and its stored parts."""
+    parts = list(upload.parts)
+    upload.delete()
+    transaction.on_commit(lambda: upload_parts_delete(parts))
+
+
+def _attachment_uploads_abort(uploads: QuerySet) -> None:
+    """
+    Delete `uploads` and, after commit, their stored parts.
+
+    The rows are locked first so a part being appended concurrently is
+    either listed here or rejected.
+    """
+    parts = [
+        part
+        for upload_parts in uploads.select_for_update(of=("self",)).values_list("parts", flat=True)
+        for part in upload_parts
+    ]
+    uploads.delete()
+    if parts:
+        transaction.on_commit(lambda: upload_parts_delete(parts))
+
+
+def attachment_uploads_expire(*, older_than, batch_size: int = 100) -> int:
+    """Abort uploads untouched since `older_than`; returns how many were removed."""
+    expired = 0
+    while True:
+        with transaction.atomic():
+            uploads = list(
+                AttachmentUpload.objects.filter(updated_at__lt=older_than)
+                .select_for_update(skip_locked=True)
+                .order_by("updated_at")[:batch_size]
+            )
+            for upload in uploads:
+                attachment_upload_abort(upload=upload)
+        expired += len(uploads)
+        if len(uploads) < batch_size:
+            return expired
+
+
 @transaction.atomic
 def attachment_delete(*, attachment: Attachment) -> None:
-    """Delete an attachment."""
-    attachment.file.delete()
+    """
+    Delete an attachment.
+
+    The blob's file is only removed once its last reference is gone.
+    """
+    if attachment.blob_id is None:
+        # Stored before content addressing: the file is this attachment's own
+        attachment.file.delete()
+        attachment.delete()
+        return
+    
+    blob_id = attachment.blob_id
     attachment.delete()
+    _blob_refs_release({blob_id: 1})
+    transaction.on_commit(lambda: attachment_blobs_collect(blob_ids=[blob_id]))
 
 
 @transaction.atomic
@@ -0,0 +1,93 @@
+"""
+Issue change streams.
+
+Server-Sent Events endpoints pushing the change messages published by issue
+services (see common.realtime). They are async views and need an ASGI
+server. Browsers' EventSource cannot send headers, so the JWT access token
+may also be passed as `?token=`.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from apps.issues.models import Issue
+from common.permissions import get_project_role
+from common.realtime import get_broker, issue_channel, project_channel
+
+HEARTBEAT_SECONDS = 15
+RECONNECT_MILLISECONDS = 3000
+
+
+@require_GET
+async def project_stream_view(request, project_id):
+    """Stream changes to any issue of a project."""
+    error = await sync_to_async(_authorize)(request, project_id)
+    if error is not None:
+        return error
+    return _event_stream_response([project_channel(project_id)])
+
+
+@require_GET
+async def issue_stream_view(request, project_id, issue_key):
+    """Stream changes to one issue."""
+    error = await sync_to_async(_authorize)(request, project_id)
+    if error is not None:
+        return error
+    
+    issue_id = await Issue.objects.filter(
+        project_id=project_id, key=issue_key
+    ).values_list("id", flat=True).afirst()
+    if issue_id is None:
+        return _error_response("Issue not found.", "not_found", 404)
+    return _event_stream_response([issue_channel(issue_id)])
+
+
+def _authorize(request, project_id):
+    """Authenticate the JWT and check membership; return an error response or None."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get("token")
+    if not raw_token:
+        return _error_response("Authentication credentials were not provided.", "not_authenticated", 401)
+    try:
+        request.user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except AuthenticationFailed as exc:
+        return _error_response(str(exc.detail), "authentication_failed", 401)
+    
+    if get_project_role(request, project_id) is None:
+        return _error_response("You do not have permission to perform this action.", "forbidden", 403)
+    return None
+
+
+def _error_response(message, code, status):
+    return JsonResponse(
+        {"error": {"message": message, "code": code, "status_code": status}},
+        status=status,
+    )
+
+
+def _event_stream_response(channels):
+    response = StreamingHttpResponse(_event_stream(channels), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def _event_stream(channels):
+    subscription = await get_broker().subscribe(channels)
+    try:
+        yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+        while True:
+            message = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            if message is None:
+                # Comment lines keep proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        await subscription.close()
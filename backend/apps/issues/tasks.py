@@ -0,0 +1,85 @@
+"""
+Celery tasks for issues.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from apps.issues.partitions import (
+    event_partition_archive,
+    event_partitions_detach,
+    event_partitions_detached,
+    event_partitions_ensure,
+)
+from apps.issues.services import (
+    SEARCH_REINDEX_SCHEDULED_KEY,
+    attachment_blobs_collect,
+    attachment_uploads_expire,
+    issue_search_reindex_dirty,
+)
+
+
+@shared_task
+def reindex_dirty_issues(batch_size=500, max_batches=20):
+    """Rebuild search vectors of issues whose comments changed, in batches."""
+    cache.delete(SEARCH_REINDEX_SCHEDULED_KEY)
+    
+    total = 0
+    for _ in range(max_batches):
+        rebuilt = issue_search_reindex_dirty(batch_size=batch_size)
+        total += rebuilt
+        if rebuilt < batch_size:
+            break
+    else:
+        # Backlog left over: continue in a fresh task instead of hogging a worker
+        reindex_dirty_issues.delay(batch_size=batch_size, max_batches=max_batches)
+    
+    return f"Reindexed {total} issues"
+
+
+@shared_task
+def maintain_event_partitions():
+    """
+    Create upcoming event partitions and archive expired ones.
+
+    Nothing is dropped unless both EVENT_RETENTION_MONTHS and
+    EVENT_ARCHIVE_DIR are set.
+    """
+    created = event_partitions_ensure(months_ahead=settings.EVENT_PARTITION_MONTHS_AHEAD)
+    
+    archived = []
+    if settings.EVENT_RETENTION_MONTHS > 0:
+        if not settings.EVENT_ARCHIVE_DIR:
+            raise ImproperlyConfigured(
+                "EVENT_RETENTION_MONTHS is set but EVENT_ARCHIVE_DIR is not; "
+                "refusing to drop event partitions without an archive."
+            )
+        event_partitions_detach(retain_months=settings.EVENT_RETENTION_MONTHS)
+        for name in event_partitions_detached():
+            event_partition_archive(name=name, directory=settings.EVENT_ARCHIVE_DIR)
+            archived.append(name)
+    
+    return f"Created {len(created)} and archived {len(archived)} event partitions"
+
+
+@shared_task
+def expire_attachment_uploads():
+    """Abort chunked uploads abandoned for ATTACHMENT_UPLOAD_EXPIRY_HOURS."""
+    older_than = timezone.now() - timedelta(hours=settings.ATTACHMENT_UPLOAD_EXPIRY_HOURS)
+    expired = attachment_uploads_expire(older_than=older_than)
+    return f"Expired {expired} uploads"
+
+
+@shared_task
+def collect_attachment_blobs(batch_size=500):
+    """Delete blobs left without attachments, e.g. by user or admin deletes."""
+    collected = 0
+    while True:
+        deleted = attachment_blobs_collect(batch_size=batch_size)
+        collected += deleted
+        if deleted < batch_size:
+            return f"Deleted {collected} unreferenced blobs"
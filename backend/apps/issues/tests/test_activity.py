@@ -0,0 +1,41 @@
+from django.urls import reverse
+
+from apps.issues.models import Event
+from apps.issues.services import event_create, issue_create
+
+
+def test_polling_since_catches_up_on_a_long_backlog(api_client, user, project):
+    url = reverse("project-activity", kwargs={"project_id": project.id})
+    seen = event_create(project=project, event_type=Event.EventType.ISSUE_CREATED, actor=user, data={})
+    missed = [
+        event_create(project=project, event_type=Event.EventType.ISSUE_UPDATED, actor=user, data={"n": n}).id
+        for n in range(250)
+    ]
+
+    received, since = [], seen.id
+    while True:
+        page = [event["id"] for event in api_client.get(url, {"since": since}).data]
+        received += page
+        if len(page) < 100:
+            break
+        since = page[-1]
+
+    assert received == missed
+
+
+def test_issue_feed_since_returns_the_next_page_oldest_first(api_client, user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    url = reverse("issue-activity", kwargs={"project_id": project.id, "issue_key": issue.key})
+    seen = Event.objects.get(issue=issue)
+    missed = [
+        event_create(
+            project=project, issue=issue, event_type=Event.EventType.ISSUE_UPDATED, actor=user, data={"n": n}
+        ).id
+        for n in range(150)
+    ]
+
+    first = [event["id"] for event in api_client.get(url, {"since": seen.id}).data]
+    rest = [event["id"] for event in api_client.get(url, {"since": first[-1]}).data]
+
+    assert first == missed[:100]
+    assert rest == missed[100:]
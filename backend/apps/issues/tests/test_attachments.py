@@ -0,0 +1,90 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from apps.issues.models import AttachmentBlob, AttachmentUpload
+from apps.issues.services import (
+    attachment_blobs_collect,
+    attachment_create_from_file,
+    attachment_upload_append,
+    attachment_upload_initiate,
+    issue_create,
+    issue_delete,
+)
+from apps.issues.uploads import attachment_storage, blob_name
+from apps.projects.services import project_delete
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _attach(issue, user, content=b"crash log"):
+    upload = SimpleUploadedFile("crash.log", content, content_type="text/plain")
+    return attachment_create_from_file(issue=issue, uploaded_by=user, file=upload)
+
+
+def test_identical_files_share_a_blob(user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+
+    first = _attach(issue, user)
+    second = _attach(issue, user)
+
+    assert first.blob_id == second.blob_id
+    assert AttachmentBlob.objects.get().ref_count == 2
+
+
+def test_blob_names_keep_the_extension(user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+
+    attachment = _attach(issue, user)
+
+    sha256 = attachment.blob.sha256
+    assert attachment.file.name == f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}.log"
+    assert blob_name(sha256, "notes.<script>") == f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def test_project_delete_collects_blobs(user, project, django_capture_on_commit_callbacks):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    attachment = _attach(issue, user)
+    _attach(issue, user)
+    name = blob_name(attachment.blob.sha256, "crash.log")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        project_delete(project=project)
+
+    assert not AttachmentBlob.objects.exists()
+    assert not attachment_storage().exists(name)
+
+
+@pytest.mark.parametrize("delete", ["issue", "project"])
+def test_deletes_remove_pending_upload_parts(delete, user, project, django_capture_on_commit_callbacks):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    upload = attachment_upload_initiate(
+        issue=issue, uploaded_by=user, filename="crash.log", content_type="text/plain", file_size=10,
+    )
+    upload = attachment_upload_append(upload=upload, offset=0, stream=io.BytesIO(b"crash"), size=5)
+    [part] = upload.parts
+
+    with django_capture_on_commit_callbacks(execute=True):
+        if delete == "issue":
+            issue_delete(issue=issue, actor=user)
+        else:
+            project_delete(project=project)
+
+    assert not AttachmentUpload.objects.exists()
+    assert not attachment_storage().exists(part)
+
+
+def test_collect_ignores_stale_ref_counts(user, other_user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    kept = _attach(issue, user, content=b"kept")
+    _attach(issue, other_user, content=b"orphaned")
+
+    # Deleting the uploader cascades past the services
+    other_user.delete()
+
+    assert attachment_blobs_collect() == 1
+    assert list(AttachmentBlob.objects.values_list("id", flat=True)) == [kept.blob_id]
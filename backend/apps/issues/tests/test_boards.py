@@ -0,0 +1,61 @@
+from urllib.parse import parse_qs, urlsplit
+
+from django.urls import reverse
+
+from apps.issues.services import issue_create
+from apps.projects.models import Board
+from apps.projects.services import board_create, sprint_create, sprint_start
+
+
+def _first_column(api_client, project, board):
+    response = api_client.get(
+        reverse("board-columns", kwargs={"project_id": project.id, "board_id": board.id}),
+        {"limit": 1},
+    )
+    return response.data["columns"][0]
+
+
+def _link_filters(url):
+    query = parse_qs(urlsplit(url).query)
+    return {name: values[0] for name, values in query.items() if name not in ("cursor", "page_size")}
+
+
+def test_scrum_column_next_link_keeps_sprint_filter(api_client, user, project):
+    board = board_create(project=project, name="Team", board_type=Board.BoardType.SCRUM)
+    sprint = sprint_start(sprint=sprint_create(board=board, name="Sprint 1"))
+    in_sprint = [
+        issue_create(project=project, title=f"Sprint work {n}", reporter=user, sprint=sprint)
+        for n in range(3)
+    ]
+    issue_create(project=project, title="Backlog item", reporter=user)
+
+    todo = _first_column(api_client, project, board)
+    filters = _link_filters(todo["next"])
+
+    assert todo["total"] == 3
+    assert filters == {"sprint": str(sprint.id), "state": str(todo["state"]["id"])}
+    response = api_client.get(reverse("issue-list", kwargs={"project_id": project.id}), filters)
+    assert sorted(issue["id"] for issue in response.data["results"]) == sorted(
+        issue.id for issue in in_sprint
+    )
+
+
+def test_scrum_column_next_link_lists_every_active_sprint(api_client, user, project):
+    board = board_create(project=project, name="Team", board_type=Board.BoardType.SCRUM)
+    sprints = [sprint_start(sprint=sprint_create(board=board, name=f"Sprint {n}")) for n in range(2)]
+    for sprint in sprints:
+        issue_create(project=project, title=f"Work in {sprint.name}", reporter=user, sprint=sprint)
+
+    todo = _first_column(api_client, project, board)
+
+    assert _link_filters(todo["next"])["sprint"] == f"{sprints[0].id},{sprints[1].id}"
+
+
+def test_kanban_column_next_link_has_no_sprint_filter(api_client, user, project):
+    board = board_create(project=project, name="Flow", board_type=Board.BoardType.KANBAN)
+    for n in range(2):
+        issue_create(project=project, title=f"Task {n}", reporter=user)
+
+    todo = _first_column(api_client, project, board)
+
+    assert _link_filters(todo["next"]) == {"state": str(todo["state"]["id"])}
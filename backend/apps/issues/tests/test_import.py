@@ -0,0 +1,24 @@
+from apps.issues.importers import import_row_to_fields, resolve_import_references
+
+
+def _fields(project, row, default_reporter):
+    lookups = resolve_import_references(project=project, batch=[(1, row)])
+    return import_row_to_fields(row, lookups=lookups, default_reporter=default_reporter)
+
+
+def test_members_resolve_by_username_or_email(user, project):
+    fields, errors = _fields(
+        project, {"title": "Crash on start", "reporter": user.email, "assignee": user.username}, user,
+    )
+
+    assert errors == {}
+    assert fields["reporter"] == user
+    assert fields["assignee"] == user
+
+
+def test_non_members_read_as_unknown_users(user, other_user, project):
+    _, member_errors = _fields(project, {"title": "Crash", "assignee": other_user.username}, user)
+    _, unknown_errors = _fields(project, {"title": "Crash", "assignee": "nobody"}, user)
+
+    assert member_errors == {"assignee": f'"{other_user.username}" does not exist.'}
+    assert unknown_errors == {"assignee": '"nobody" does not exist.'}
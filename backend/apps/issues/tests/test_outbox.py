@@ -0,0 +1,94 @@
+from django.urls import reverse
+
+from apps.issues.models import Event
+from apps.issues.services import issue_create, issue_transition, issue_update
+from apps.notifications.models import OutboxMessage
+from apps.projects.services import project_add_member
+
+
+def _states(project):
+    return {state.name: state for state in project.workflow.states.all()}
+
+
+def _messages():
+    return list(OutboxMessage.objects.order_by("id").values_list("event_type", "payload"))
+
+
+def test_patching_state_writes_state_changed_message(api_client, user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    states = _states(project)
+    url = reverse("issue-detail", kwargs={"project_id": project.id, "issue_key": issue.key})
+
+    response = api_client.patch(url, {"state_id": states["In Progress"].id}, format="json")
+
+    assert response.status_code == 200
+    assert _messages() == [("issue_state_changed", {
+        "issue_id": issue.id,
+        "actor_id": user.id,
+        "from_state_id": states["To Do"].id,
+        "to_state_id": states["In Progress"].id,
+    })]
+    event = Event.objects.get(event_type=Event.EventType.ISSUE_UPDATED)
+    assert event.data["changes"] == {"state": states["To Do"].id}
+
+
+def test_reassigning_writes_assigned_message(user, other_user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user, assignee=user)
+
+    issue_update(issue=issue, actor=user, assignee=other_user)
+
+    assert _messages() == [
+        ("issue_assigned", {"issue_id": issue.id, "assignee_id": other_user.id, "actor_id": user.id}),
+    ]
+
+
+def test_unassigning_writes_no_message(user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user, assignee=user)
+
+    issue_update(issue=issue, actor=user, assignee=None)
+
+    assert _messages() == []
+
+
+def test_transition_writes_state_changed_message(user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    states = _states(project)
+
+    issue_transition(issue=issue, to_state=states["In Progress"], actor=user)
+
+    assert _messages() == [("issue_state_changed", {
+        "issue_id": issue.id,
+        "actor_id": user.id,
+        "from_state_id": states["To Do"].id,
+        "to_state_id": states["In Progress"].id,
+    })]
+
+
+def test_bulk_update_writes_a_message_per_changed_issue(api_client, user, other_user, project):
+    project_add_member(project=project, user=other_user)
+    states = _states(project)
+    moved = issue_create(project=project, title="Crash on start", reporter=user)
+    already_there = issue_create(project=project, title="Slow search", reporter=user, assignee=other_user)
+    issue_transition(issue=already_there, to_state=states["In Progress"], actor=user)
+    OutboxMessage.objects.all().delete()
+
+    response = api_client.post(
+        reverse("issue-bulk-update", kwargs={"project_id": project.id}),
+        {
+            "keys": [moved.key, already_there.key],
+            "changes": {"state_id": states["In Progress"].id, "assignee_id": other_user.id},
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert sorted(response.data["updated"]) == sorted([moved.key, already_there.key])
+    assert _messages() == [
+        ("issue_state_changed", {
+            "issue_id": moved.id,
+            "actor_id": user.id,
+            "from_state_id": states["To Do"].id,
+            "to_state_id": states["In Progress"].id,
+        }),
+        ("issue_assigned", {"issue_id": moved.id, "assignee_id": other_user.id, "actor_id": user.id}),
+    ]
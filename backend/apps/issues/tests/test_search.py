@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from apps.issues.models import Issue
+from apps.issues.selectors import issue_search, issue_search_facets, issue_search_global
+from apps.issues.services import issue_create
+
+EMPTY_FACETS = {"project": [], "issue_type": [], "priority": [], "state_category": []}
+
+
+def test_facets_of_empty_queryset(db):
+    assert issue_search_facets(results=Issue.objects.none()) == EMPTY_FACETS
+
+
+def test_facets_without_project_memberships(db):
+    results = issue_search_global(project_ids=[], query="login")
+    assert issue_search_facets(results=results) == EMPTY_FACETS
+
+
+def test_global_search_without_memberships(api_client):
+    response = api_client.get(reverse("global-search"), {"q": "PIL-1"})
+
+    assert response.status_code == 200
+    assert response.data["results"] == []
+    assert response.data["facets"] == EMPTY_FACETS
+
+
+def test_global_search_without_word_characters(api_client, project):
+    response = api_client.get(reverse("global-search"), {"q": "!!"})
+
+    assert response.status_code == 200
+    assert response.data["results"] == []
+    assert response.data["facets"] == EMPTY_FACETS
+
+
+def test_global_search_ranks_exact_key_first(user, project):
+    for number in range(1, 11):
+        issue_create(project=project, title=f"Issue {number}", reporter=user)
+
+    results = issue_search_global(project_ids=[project.id], query="pil-1")
+
+    # The order SearchRankPagination pages in
+    assert list(results.order_by("-rank", "-id").values_list("key", flat=True)) == ["PIL-1", "PIL-10"]
+
+
+def test_project_search_routes_its_own_key(user, project):
+    issue_create(project=project, title="Crash on start", reporter=user)
+
+    results = issue_search(project=project, query="pil-1")
+
+    assert [(issue.key, issue.rank) for issue in results] == [("PIL-1", 2.0)]
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="full-text search needs Postgres")
+def test_hyphenated_words_are_free_text(user, project):
+    issue = issue_create(project=project, title="UTF-8 decoding fails", reporter=user)
+
+    assert list(issue_search(project=project, query="utf-8")) == [issue]
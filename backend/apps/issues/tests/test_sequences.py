@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection, connections
+
+from apps.issues.models import Issue, IssueSequence
+from apps.issues.services import issue_create
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="needs concurrent writers; SQLite fails them with 'table is locked'",
+)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_issue_creates_get_unique_gap_free_keys(user, project):
+    creates = 300
+
+    def create(n):
+        try:
+            return issue_create(project=project, title=f"Issue {n}", reporter=user).sequence
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        sequences = list(pool.map(create, range(creates)))
+
+    assert sorted(sequences) == list(range(1, creates + 1))
+    keys = list(Issue.objects.filter(project=project).values_list("key", flat=True))
+    assert len(set(keys)) == creates
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_block_allocations_do_not_overlap(project):
+    def allocate(count):
+        try:
+            first = IssueSequence.allocate(project_id=project.id, count=count)
+            return range(first, first + count)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        blocks = list(pool.map(allocate, [1, 5, 20] * 40))
+
+    allocated = sorted(value for block in blocks for value in block)
+    assert allocated == list(range(1, sum(len(block) for block in blocks) + 1))
@@ -0,0 +1,166 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.issues import streams
+from apps.issues.services import issue_bulk_update, issue_create, issue_transition, issue_update
+from common import realtime
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = realtime.InMemoryBroker()
+    monkeypatch.setattr(realtime, "_broker", broker)
+    return broker
+
+
+def _states(project):
+    return {state.name: state for state in project.workflow.states.all()}
+
+
+def _get(path, user=None):
+    headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"} if user else {}
+    return AsyncRequestFactory().get(path, headers=headers)
+
+
+async def _next_frame(frames):
+    frame = await asyncio.wait_for(anext(frames), timeout=2)
+    return frame.decode()
+
+
+def _event(frame):
+    event_line, data_line = frame.strip().split("\n")
+    assert event_line.startswith("event: ")
+    return event_line[len("event: "):], json.loads(data_line[len("data: "):])
+
+
+def _after_commit(django_capture_on_commit_callbacks, function, **kwargs):
+    def run():
+        with django_capture_on_commit_callbacks(execute=True):
+            return function(**kwargs)
+
+    return sync_to_async(run)()
+
+
+def test_project_stream_receives_issue_updates(broker, user, project,
+                                               django_capture_on_commit_callbacks):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+
+    async def scenario():
+        response = await streams.project_stream_view(_get("/stream/", user), project.id)
+        frames = response.streaming_content
+        assert await _next_frame(frames) == f"retry: {streams.RECONNECT_MILLISECONDS}\n\n"
+
+        await _after_commit(
+            django_capture_on_commit_callbacks, issue_update,
+            issue=issue, actor=user, priority="high",
+        )
+        return response, await _next_frame(frames)
+
+    response, frame = async_to_sync(scenario)()
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert _event(frame) == ("issue.updated", {
+        "type": "issue.updated",
+        "project": project.id,
+        "issue": issue.id,
+        "key": issue.key,
+        "fields": ["priority"],
+        "state": issue.state_id,
+        "assignee": None,
+        "actor": user.id,
+    })
+
+
+def test_issue_stream_receives_transitions(broker, user, project, django_capture_on_commit_callbacks):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    states = _states(project)
+
+    async def scenario():
+        request = AsyncRequestFactory().get("/stream/", {"token": str(AccessToken.for_user(user))})
+        response = await streams.issue_stream_view(request, project.id, issue.key)
+        frames = response.streaming_content
+        await _next_frame(frames)
+
+        await _after_commit(
+            django_capture_on_commit_callbacks, issue_transition,
+            issue=issue, to_state=states["In Progress"], actor=user,
+        )
+        return await _next_frame(frames)
+
+    event_type, message = _event(async_to_sync(scenario)())
+
+    assert event_type == "issue.transitioned"
+    assert message["from_state"] == states["To Do"].id
+    assert message["state"] == states["In Progress"].id
+
+
+def test_bulk_update_publishes_a_message_per_accepted_issue(broker, user, other_user, project,
+                                                             django_capture_on_commit_callbacks):
+    states = _states(project)
+    first = issue_create(project=project, title="Crash on start", reporter=user)
+    second = issue_create(project=project, title="Slow search", reporter=user, assignee=other_user)
+
+    async def scenario():
+        response = await streams.project_stream_view(_get("/stream/", user), project.id)
+        frames = response.streaming_content
+        await _next_frame(frames)
+
+        await _after_commit(
+            django_capture_on_commit_callbacks, issue_bulk_update,
+            project=project, keys=[first.key, second.key, "NOPE-1"],
+            changes={"state": states["In Progress"], "assignee": None}, actor=user,
+        )
+        return [await _next_frame(frames), await _next_frame(frames)]
+
+    messages = [_event(frame)[1] for frame in async_to_sync(scenario)()]
+
+    assert [message["key"] for message in messages] == [first.key, second.key]
+    for message in messages:
+        assert message["type"] == "issue.updated"
+        assert message["fields"] == ["assignee", "state"]
+        assert message["state"] == states["In Progress"].id
+        assert message["assignee"] is None
+
+
+def test_idle_stream_sends_keep_alive(broker, user, project, monkeypatch):
+    monkeypatch.setattr(streams, "HEARTBEAT_SECONDS", 0.01)
+
+    async def scenario():
+        response = await streams.project_stream_view(_get("/stream/", user), project.id)
+        frames = response.streaming_content
+        await _next_frame(frames)
+        return await _next_frame(frames)
+
+    assert async_to_sync(scenario)() == ": keep-alive\n\n"
+
+
+def test_closing_stream_unsubscribes(broker):
+    channel = realtime.project_channel(1)
+
+    async def scenario():
+        frames = streams._event_stream([channel])
+        await anext(frames)
+        subscribed = set(broker.subscriptions)
+        await frames.aclose()
+        return subscribed
+
+    assert async_to_sync(scenario)() == {channel}
+    assert broker.subscriptions == {}
+
+
+def test_stream_requires_token(broker, project):
+    response = async_to_sync(streams.project_stream_view)(_get("/stream/"), project.id)
+
+    assert response.status_code == 401
+    assert json.loads(response.content)["error"]["code"] == "not_authenticated"
+
+
+def test_stream_requires_membership(broker, other_user, project):
+    response = async_to_sync(streams.project_stream_view)(_get("/stream/", other_user), project.id)
+
+    assert response.status_code == 403
@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.issues.models import Attachment, AttachmentUpload
+from apps.issues.services import attachment_uploads_expire, issue_create
+from apps.issues.uploads import attachment_storage
+from apps.projects.services import project_add_member
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def issue(user, project):
+    return issue_create(project=project, title="Crash on start", reporter=user)
+
+
+def _url(name, issue, upload_id=None):
+    kwargs = {"project_id": issue.project_id, "issue_key": issue.key}
+    if upload_id is not None:
+        kwargs["pk"] = upload_id
+    return reverse(name, kwargs=kwargs)
+
+
+def _initiate(api_client, issue, file_size=10):
+    response = api_client.post(
+        _url("attachment-upload-create", issue),
+        {"filename": "crash.log", "content_type": "text/plain", "file_size": file_size},
+        format="json",
+    )
+    assert response.status_code == 201
+    return response.data["id"]
+
+
+def _put_part(api_client, issue, upload_id, offset, data):
+    return api_client.put(
+        f"{_url('attachment-upload-part', issue, upload_id)}?offset={offset}",
+        data,
+        content_type="application/octet-stream",
+    )
+
+
+def test_initiate_starts_at_offset_zero(api_client, issue):
+    response = api_client.post(
+        _url("attachment-upload-create", issue),
+        {"filename": "crash.log", "file_size": 10},
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert response.data["offset"] == 0
+    assert response.data["content_type"] == "application/octet-stream"
+
+
+def test_parts_append_in_order(api_client, issue):
+    upload_id = _initiate(api_client, issue)
+
+    first = _put_part(api_client, issue, upload_id, 0, b"crash")
+    second = _put_part(api_client, issue, upload_id, 5, b" log!")
+
+    assert (first.status_code, first.data["offset"]) == (200, 5)
+    assert (second.status_code, second.data["offset"]) == (200, 10)
+    assert len(AttachmentUpload.objects.get().parts) == 2
+
+
+def test_part_at_wrong_offset_conflicts(api_client, issue):
+    upload_id = _initiate(api_client, issue)
+    _put_part(api_client, issue, upload_id, 0, b"crash")
+
+    # A resent first part
+    response = _put_part(api_client, issue, upload_id, 0, b"crash")
+
+    assert response.status_code == 409
+    assert AttachmentUpload.objects.get().received_bytes == 5
+
+
+def test_part_past_declared_size_is_rejected(api_client, issue):
+    upload_id = _initiate(api_client, issue, file_size=4)
+
+    response = _put_part(api_client, issue, upload_id, 0, b"crash")
+
+    assert response.status_code == 400
+
+
+def test_get_returns_resume_offset(api_client, issue):
+    upload_id = _initiate(api_client, issue)
+    _put_part(api_client, issue, upload_id, 0, b"crash")
+
+    response = api_client.get(_url("attachment-upload-detail", issue, upload_id))
+
+    assert response.status_code == 200
+    assert response.data["offset"] == 5
+
+
+def test_uploads_are_private_to_the_uploader(api_client, issue, other_user, project):
+    upload_id = _initiate(api_client, issue)
+    project_add_member(project=project, user=other_user)
+    api_client.force_authenticate(user=other_user)
+
+    response = api_client.get(_url("attachment-upload-detail", issue, upload_id))
+
+    assert response.status_code == 404
+
+
+def test_complete_creates_attachment(api_client, issue, django_capture_on_commit_callbacks):
+    upload_id = _initiate(api_client, issue)
+    _put_part(api_client, issue, upload_id, 0, b"crash")
+    _put_part(api_client, issue, upload_id, 5, b" log!")
+    parts = AttachmentUpload.objects.get().parts
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(_url("attachment-upload-complete", issue, upload_id))
+
+    assert response.status_code == 201
+    attachment = Attachment.objects.get()
+    assert (attachment.filename, attachment.file_size, attachment.content_type) == (
+        "crash.log", 10, "text/plain",
+    )
+    with attachment.file.open("rb") as stored:
+        assert stored.read() == b"crash log!"
+    assert not AttachmentUpload.objects.exists()
+    assert not any(attachment_storage().exists(part) for part in parts)
+
+
+def test_complete_before_last_part_conflicts(api_client, issue):
+    upload_id = _initiate(api_client, issue)
+    _put_part(api_client, issue, upload_id, 0, b"crash")
+
+    response = api_client.post(_url("attachment-upload-complete", issue, upload_id))
+
+    assert response.status_code == 409
+    assert not Attachment.objects.exists()
+
+
+def test_abort_deletes_parts(api_client, issue, django_capture_on_commit_callbacks):
+    upload_id = _initiate(api_client, issue)
+    _put_part(api_client, issue, upload_id, 0, b"crash")
+    [part] = AttachmentUpload.objects.get().parts
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.delete(_url("attachment-upload-detail", issue, upload_id))
+
+    assert response.status_code == 204
+    assert not AttachmentUpload.objects.exists()
+    assert not attachment_storage().exists(part)
+
+
+def test_expire_aborts_only_stale_uploads(api_client, issue, django_capture_on_commit_callbacks):
+    stale_id = _initiate(api_client, issue)
+    _put_part(api_client, issue, stale_id, 0, b"crash")
+    [part] = AttachmentUpload.objects.get(pk=stale_id).parts
+    AttachmentUpload.objects.filter(pk=stale_id).update(updated_at=timezone.now() - timedelta(days=2))
+    fresh_id = _initiate(api_client, issue)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        expired = attachment_uploads_expire(older_than=timezone.now() - timedelta(days=1))
+
+    assert expired == 1
+    assert [str(pk) for pk in AttachmentUpload.objects.values_list("id", flat=True)] == [fresh_id]
+    assert not attachment_storage().exists(part)
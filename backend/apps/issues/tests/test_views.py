@@ -0,0 +1,85 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from apps.issues.services import (
+    attachment_create_from_file,
+    comment_create,
+    issue_create,
+    saved_filter_create,
+    watcher_add,
+)
+
+# Query counts must not depend on how many rows a page shows
+SIZES = [1, 3]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def issue(user, project):
+    return issue_create(project=project, title="Crash on start", reporter=user)
+
+
+def _get(api_client, url, django_assert_num_queries, queries):
+    # The first request caches the user's project roles
+    api_client.get(url)
+    with django_assert_num_queries(queries):
+        response = api_client.get(url)
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_issue_list_queries(api_client, user, other_user, project, size, django_assert_num_queries):
+    for n in range(size):
+        issue = issue_create(project=project, title=f"Task {n}", reporter=user, assignee=other_user)
+        watcher_add(issue=issue, user=other_user)
+
+    # project, count, issues, watchers, watcher users
+    _get(api_client, reverse("issue-list", kwargs={"project_id": project.id}), django_assert_num_queries, 5)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_issue_detail_queries(api_client, user, other_user, issue, size, django_assert_num_queries):
+    for n in range(size):
+        comment_create(issue=issue, author=user, content=f"Comment {n}")
+    watcher_add(issue=issue, user=other_user)
+    url = reverse("issue-detail", kwargs={"project_id": issue.project_id, "issue_key": issue.key})
+
+    # project, issue, watchers, watcher users, is_watching, comment and attachment counts
+    _get(api_client, url, django_assert_num_queries, 7)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_comment_list_queries(api_client, user, issue, size, django_assert_num_queries):
+    for n in range(size):
+        comment_create(issue=issue, author=user, content=f"Comment {n}")
+    url = reverse("comment-list", kwargs={"project_id": issue.project_id, "issue_key": issue.key})
+
+    # project, issue, comments with authors
+    _get(api_client, url, django_assert_num_queries, 3)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_attachment_list_queries(api_client, user, issue, size, django_assert_num_queries):
+    for n in range(size):
+        upload = SimpleUploadedFile(f"log-{n}.txt", f"line {n}".encode(), content_type="text/plain")
+        attachment_create_from_file(issue=issue, uploaded_by=user, file=upload)
+    url = reverse("attachment-list", kwargs={"project_id": issue.project_id, "issue_key": issue.key})
+
+    # project, issue, attachments with uploaders
+    _get(api_client, url, django_assert_num_queries, 3)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_saved_filter_list_queries(api_client, user, project, size, django_assert_num_queries):
+    for n in range(size):
+        saved_filter_create(project=project, owner=user, name=f"Bugs {n}", query="type = bug")
+    url = reverse("saved-filter-list", kwargs={"project_id": project.id})
+
+    # project, count, filters with owners
+    _get(api_client, url, django_assert_num_queries, 3)
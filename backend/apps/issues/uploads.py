@@ -0,0 +1,150 @@
+"""
+Attachment file storage and chunked uploads.
+
+Attachment content is stored once per SHA-256 digest under
+``blobs/<d[:2]>/<d[2:4]>/<digest><.ext>``; identical files attached to many
+issues share one blob. The extension is the first uploader's, so media
+servers still pick the content type from the name.
+
+Each part of a chunked upload is written to the attachment storage as its
+own object under ``attachment-uploads/<upload id>/`` as soon as it arrives,
+so a request never holds more than one chunk and any storage backend works.
+Completing an upload reads the parts back, in order, as the content.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+
+from apps.issues.models import Attachment
+
+UPLOAD_PREFIX = "attachment-uploads"
+BLOB_PREFIX = "blobs"
+EXTENSION_PATTERN = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+class UploadOffsetMismatch(ValueError):
+    """A part did not start where the upload currently ends."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Expected a part starting at offset {offset}.")
+        self.offset = offset
+
+
+class IncompletePart(ValueError):
+    """The request body ended before the announced part size."""
+
+
+def attachment_storage():
+    return Attachment._meta.get_field("file").storage
+
+
+def blob_name(sha256: str, filename: str = "") -> str:
+    """Storage name for the blob of `sha256`, keeping the extension of `filename`."""
+    extension = os.path.splitext(filename)[1].lower()
+    if not EXTENSION_PATTERN.match(extension):
+        extension = ""
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def blob_sha256(name: str) -> str:
+    """The digest a blob file name was stored under."""
+    return os.path.basename(name).split(".", 1)[0]
+
+
+def content_sha256(content: File) -> str:
+    """Hex SHA-256 of `content`, read chunk by chunk."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_write(*, name: str, content: File) -> str:
+    """
+    Store `content` as the blob file `name` unless it is already there.
+
+    A file left behind by a rolled-back upload has the same bytes by
+    construction, so it is reused rather than rewritten.
+    """
+    storage = attachment_storage()
+    if not storage.exists(name):
+        storage.save(name, content)
+    return name
+
+
+def blob_names(*, prefix: str = BLOB_PREFIX):
+    """Every stored blob file name, walking the two fan-out levels."""
+    storage = attachment_storage()
+    if not storage.exists(prefix):
+        return
+    first_levels, _ = storage.listdir(prefix)
+    for first in first_levels:
+        second_levels, _ = storage.listdir(f"{prefix}/{first}")
+        for second in second_levels:
+            _, files = storage.listdir(f"{prefix}/{first}/{second}")
+            for name in files:
+                yield f"{prefix}/{first}/{second}/{name}"
+
+
+def upload_part_write(*, upload_id, offset: int, stream, size: int) -> str:
+    """Stream exactly `size` bytes from `stream` into a new part object."""
+    storage = attachment_storage()
+    name = f"{UPLOAD_PREFIX}/{upload_id}/{offset:012d}.part"
+    # A retry of a part whose bookkeeping never committed replaces it
+    storage.delete(name)
+    try:
+        return storage.save(name, _StreamFile(stream, size))
+    except Exception:
+        storage.delete(name)
+        raise
+
+
+def upload_content(*, parts: list, size: int) -> File:
+    """The stored parts of an upload, readable back to back as one file."""
+    return _PartsFile(parts, size)
+
+
+def upload_parts_delete(parts: list) -> None:
+    storage = attachment_storage()
+    for name in parts:
+        storage.delete(name)
+
+
+class _StreamFile(File):
+    """Exactly `size` bytes of a request body, read chunk by chunk."""
+
+    def __init__(self, stream, size: int):
+        super().__init__(stream)
+        self.size = size
+
+    def chunks(self, chunk_size=None):
+        remaining = self.size
+        while remaining > 0:
+            data = self.file.read(min(chunk_size or self.DEFAULT_CHUNK_SIZE, remaining))
+            if not data:
+                raise IncompletePart(f"Part ended {remaining} bytes short.")
+            remaining -= len(data)
+            yield data
+
+    def __iter__(self):
+        return self.chunks()
+
+
+class _PartsFile(File):
+    """Stored parts read back to back as one file."""
+
+    def __init__(self, parts: list, size: int):
+        super().__init__(None)
+        self.parts = parts
+        self.size = size
+
+    def chunks(self, chunk_size=None):
+        storage = attachment_storage()
+        for name in self.parts:
+            with storage.open(name, "rb") as part:
+                yield from part.chunks(chunk_size)
+
+    def __iter__(self):
+        return self.chunks()
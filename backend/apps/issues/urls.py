@@ -6,19 +6,33 @@ from django.urls import path
 from apps.issues.views import (
     AttachmentDetailView,
     AttachmentListCreateView,
+    AttachmentUploadCompleteView,
+    AttachmentUploadCreateView,
+    AttachmentUploadDetailView,
+    AttachmentUploadPartView,
     CommentDetailView,
     CommentListCreateView,
     IssueDetailView,
     IssueListCreateView,
+    SavedFilterDetailView,
+    SavedFilterListCreateView,
+    board_columns_view,
+    global_search_view,
     issue_activity_view,
+    issue_bulk_update_view,
+    issue_import_view,
     issue_transition_view,
     project_activity_view,
+    saved_filter_issues_view,
     watchers_view,
 )
+from apps.issues.streams import issue_stream_view, project_stream_view
 
 urlpatterns = [
     # Issues
     path("projects/<int:project_id>/issues/", IssueListCreateView.as_view(), name="issue-list"),
+    path("projects/<int:project_id>/issues/bulk/", issue_bulk_update_view, name="issue-bulk-update"),
+    path("projects/<int:project_id>/issues/import/", issue_import_view, name="issue-import"),
     path("projects/<int:project_id>/issues/<str:issue_key>/", IssueDetailView.as_view(), name="issue-detail"),
     path("projects/<int:project_id>/issues/<str:issue_key>/transitions/", issue_transition_view, name="issue-transition"),
     # Comments
@@ -27,8 +41,23 @@ urlpatterns = [
     # Attachments
     path("projects/<int:project_id>/issues/<str:issue_key>/attachments/", AttachmentListCreateView.as_view(), name="attachment-list"),
     path("projects/<int:project_id>/issues/<str:issue_key>/attachments/<int:pk>/", AttachmentDetailView.as_view(), name="attachment-detail"),
+    path("projects/<int:project_id>/issues/<str:issue_key>/attachments/uploads/", AttachmentUploadCreateView.as_view(), name="attachment-upload-create"),
+    path("projects/<int:project_id>/issues/<str:issue_key>/attachments/uploads/<uuid:pk>/", AttachmentUploadDetailView.as_view(), name="attachment-upload-detail"),
+    path("projects/<int:project_id>/issues/<str:issue_key>/attachments/uploads/<uuid:pk>/parts/", AttachmentUploadPartView.as_view(), name="attachment-upload-part"),
+    path("projects/<int:project_id>/issues/<str:issue_key>/attachments/uploads/<uuid:pk>/complete/", AttachmentUploadCompleteView.as_view(), name="attachment-upload-complete"),
     # Watchers
     path("projects/<int:project_id>/issues/<str:issue_key>/watchers/", watchers_view, name="watchers"),
+    # Boards
+    path("projects/<int:project_id>/boards/<int:board_id>/columns/", board_columns_view, name="board-columns"),
+    # Saved filters
+    path("projects/<int:project_id>/filters/", SavedFilterListCreateView.as_view(), name="saved-filter-list"),
+    path("projects/<int:project_id>/filters/<int:pk>/", SavedFilterDetailView.as_view(), name="saved-filter-detail"),
+    path("projects/<int:project_id>/filters/<int:pk>/issues/", saved_filter_issues_view, name="saved-filter-issues"),
+    # Search
+    path("search/", global_search_view, name="global-search"),
+    # Real-time streams
+    path("projects/<int:project_id>/stream/", project_stream_view, name="project-stream"),
+    path("projects/<int:project_id>/issues/<str:issue_key>/stream/", issue_stream_view, name="issue-stream"),
     # Activity
     path("projects/<int:project_id>/activity/", project_activity_view, name="project-activity"),
     path("projects/<int:project_id>/issues/<str:issue_key>/activity/", issue_activity_view, name="issue-activity"),
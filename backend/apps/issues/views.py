@@ -1,25 +1,44 @@
 """
 Issue views.
 """
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django_filters import rest_framework as filters
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from apps.issues.models import Attachment, Comment, Issue
+from apps.issues.models import Attachment, AttachmentUpload, Issue
+from apps.issues.query_language import QueryLanguageError, compile_query
 from apps.issues.serializers import (
     AttachmentSerializer,
+    AttachmentUploadSerializer,
+    BoardColumnSerializer,
     CommentSerializer,
     EventSerializer,
+    GlobalSearchQuerySerializer,
+    GlobalSearchResultSerializer,
+    IssueBulkUpdateSerializer,
     IssueCreateSerializer,
     IssueDetailSerializer,
+    IssueImportSerializer,
     IssueListSerializer,
+    IssueSearchResultSerializer,
     IssueTransitionSerializer,
     IssueUpdateSerializer,
+    SavedFilterSerializer,
 )
-from common.permissions import IsProjectMember
+from common.exceptions import BadRequest, Conflict, Forbidden, NotFound
+from common.mixins import IssueLookupMixin, ProjectLookupMixin
+from common.pagination import CursorOptInPagination, KeysetPagination, SearchRankPagination
+from common.parsers import OctetStreamParser
+from common.permissions import IsProjectMember, get_member_project_ids
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """Comma-separated list of numbers."""
 
 
 class IssueFilter(filters.FilterSet):
@@ -27,7 +46,8 @@ class IssueFilter(filters.FilterSet):
     state = filters.NumberFilter(field_name="state__id")
     assignee = filters.NumberFilter(field_name="assignee__id")
     reporter = filters.NumberFilter(field_name="reporter__id")
-    sprint = filters.NumberFilter(field_name="sprint__id")
+    # Several ids for scrum board columns, which show every active sprint
+    sprint = NumberInFilter(field_name="sprint__id")
     epic = filters.NumberFilter(field_name="epic__id")
     issue_type = filters.ChoiceFilter(choices=Issue.Type.choices)
     priority = filters.ChoiceFilter(choices=Issue.Priority.choices)
@@ -37,9 +57,10 @@ class IssueFilter(filters.FilterSet):
         fields = ["state", "assignee", "reporter", "sprint", "epic", "issue_type", "priority"]
 
 
-class IssueListCreateView(generics.ListCreateAPIView):
+class IssueListCreateView(ProjectLookupMixin, generics.ListCreateAPIView):
     """List and create issues."""
     permission_classes = [IsAuthenticated, IsProjectMember]
+    pagination_class = CursorOptInPagination
     filterset_class = IssueFilter
     search_fields = ["key", "title", "description"]
     ordering_fields = ["created_at", "updated_at", "priority"]
@@ -47,29 +68,39 @@ class IssueListCreateView(generics.ListCreateAPIView):
     def get_serializer_class(self):
         if self.request.method == "POST":
             return IssueCreateSerializer
+        if self.request.query_params.get("q"):
+            return IssueSearchResultSerializer
         return IssueListSerializer
 
     def get_queryset(self):
         from apps.issues.selectors import issue_list, issue_search
-        from apps.projects.selectors import project_get_by_id
         
-        project = project_get_by_id(project_id=self.kwargs["project_id"])
+        project = self.get_project()
         
         # Handle search
         search_query = self.request.query_params.get("q")
         if search_query:
-            return issue_search(project=project, query=search_query)
+            return issue_search(project=project, query=search_query, highlight=True)
+        
+        # Handle query-language filters
+        jql = self.request.query_params.get("jql")
+        if jql:
+            from apps.issues.selectors import issue_list_by_query
+            try:
+                compiled = compile_query(jql)
+            except QueryLanguageError as exc:
+                raise BadRequest(str(exc))
+            return issue_list_by_query(project=project, compiled=compiled, user=self.request.user)
         
         return issue_list(project=project)
 
     def get_serializer_context(self):
-        from apps.projects.selectors import project_get_by_id
         context = super().get_serializer_context()
-        context["project"] = project_get_by_id(project_id=self.kwargs["project_id"])
+        context["project"] = self.get_project()
         return context
 
 
-class IssueDetailView(generics.RetrieveUpdateDestroyAPIView):
+class IssueDetailView(ProjectLookupMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, or delete an issue."""
     permission_classes = [IsAuthenticated, IsProjectMember]
     lookup_field = "key"
@@ -82,63 +113,56 @@ class IssueDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         from apps.issues.selectors import issue_list
-        from apps.projects.selectors import project_get_by_id
-        
-        project = project_get_by_id(project_id=self.kwargs["project_id"])
-        return issue_list(project=project)
+        return issue_list(project=self.get_project())
 
     def perform_destroy(self, instance):
         from apps.issues.services import issue_delete
         issue_delete(issue=instance, actor=self.request.user)
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(IssueLookupMixin, generics.ListCreateAPIView):
     """List and create comments on an issue."""
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated, IsProjectMember]
 
     def get_queryset(self):
-        from apps.issues.selectors import comment_list, issue_get_by_key
-        issue = issue_get_by_key(key=self.kwargs["issue_key"])
-        return comment_list(issue=issue)
+        from apps.issues.selectors import comment_list
+        return comment_list(issue=self.get_issue())
 
     def get_serializer_context(self):
-        from apps.issues.selectors import issue_get_by_key
         context = super().get_serializer_context()
-        context["issue"] = issue_get_by_key(key=self.kwargs["issue_key"])
+        context["issue"] = self.get_issue()
         return context
 
 
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetailView(IssueLookupMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, or delete a comment."""
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated, IsProjectMember]
 
     def get_queryset(self):
-        return Comment.objects.all()
+        from apps.issues.selectors import comment_list
+        return comment_list(issue=self.get_issue())
 
     def get_serializer_context(self):
-        from apps.issues.selectors import issue_get_by_key
         context = super().get_serializer_context()
-        context["issue"] = issue_get_by_key(key=self.kwargs["issue_key"])
+        context["issue"] = self.get_issue()
         return context
 
 
-class AttachmentListCreateView(generics.ListCreateAPIView):
+class AttachmentListCreateView(IssueLookupMixin, generics.ListCreateAPIView):
     """List and upload attachments for an issue."""
     serializer_class = AttachmentSerializer
     permission_classes = [IsAuthenticated, IsProjectMember]
     parser_classes = [MultiPartParser]
 
     def get_queryset(self):
-        from apps.issues.selectors import attachment_list, issue_get_by_key
-        issue = issue_get_by_key(key=self.kwargs["issue_key"])
-        return attachment_list(issue=issue)
+        from apps.issues.selectors import attachment_list
+        return attachment_list(issue=self.get_issue())
 
     def get_serializer_context(self):
-        from apps.issues.selectors import issue_get_by_key
         context = super().get_serializer_context()
-        context["issue"] = issue_get_by_key(key=self.kwargs["issue_key"])
+        context["issue"] = self.get_issue()
         return context
 
 
@@ -155,6 +179,139 @@ class AttachmentDetailView(generics.RetrieveDestroyAPIView):
         attachment_delete(attachment=instance)
 
 
+class AttachmentUploadCreateView(IssueLookupMixin, generics.CreateAPIView):
+    """Start a chunked attachment upload."""
+    serializer_class = AttachmentUploadSerializer
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["issue"] = self.get_issue()
+        return context
+
+
+class AttachmentUploadDetailView(IssueLookupMixin, generics.RetrieveDestroyAPIView):
+    """Get the resume offset of an upload, or abort it."""
+    serializer_class = AttachmentUploadSerializer
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get_queryset(self):
+        return AttachmentUpload.objects.filter(issue=self.get_issue(), uploaded_by=self.request.user)
+
+    def perform_destroy(self, instance):
+        from apps.issues.services import attachment_upload_abort
+        attachment_upload_abort(upload=instance)
+
+
+class AttachmentUploadPartView(AttachmentUploadDetailView):
+    """
+    Append a part to an upload.
+
+    The body is the raw bytes (application/octet-stream) and `?offset=` must
+    equal the upload's current offset; a mismatch answers 409 so the client
+    can fetch the offset and resume from there.
+    """
+    http_method_names = ["put", "options"]
+    parser_classes = [OctetStreamParser]
+
+    def put(self, request, *args, **kwargs):
+        from apps.issues.services import attachment_upload_append
+        from apps.issues.uploads import UploadOffsetMismatch
+        
+        upload = self.get_object()
+        try:
+            offset = int(request.query_params["offset"])
+            size = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            raise BadRequest("offset and Content-Length are required.")
+        
+        try:
+            upload = attachment_upload_append(upload=upload, offset=offset, stream=request.data, size=size)
+        except UploadOffsetMismatch as e:
+            raise Conflict(str(e))
+        except ValueError as e:
+            raise BadRequest(str(e))
+        return Response(self.get_serializer(upload).data)
+
+
+class AttachmentUploadCompleteView(AttachmentUploadDetailView):
+    """Finish an upload, creating the attachment."""
+    http_method_names = ["post", "options"]
+
+    def post(self, request, *args, **kwargs):
+        from apps.issues.services import attachment_upload_complete
+        
+        try:
+            attachment = attachment_upload_complete(upload=self.get_object())
+        except ValueError as e:
+            raise Conflict(str(e))
+        serializer = AttachmentSerializer(attachment, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SavedFilterListCreateView(ProjectLookupMixin, generics.ListCreateAPIView):
+    """List and create saved filters of a project."""
+    serializer_class = SavedFilterSerializer
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get_queryset(self):
+        from apps.issues.selectors import saved_filter_list
+        return saved_filter_list(project=self.get_project(), user=self.request.user)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["project"] = self.get_project()
+        return context
+
+
+class SavedFilterDetailView(ProjectLookupMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Retrieve, update, or delete a saved filter; only its owner may change it."""
+    serializer_class = SavedFilterSerializer
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get_queryset(self):
+        from apps.issues.selectors import saved_filter_list
+        return saved_filter_list(project=self.get_project(), user=self.request.user)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["project"] = self.get_project()
+        return context
+
+    def perform_update(self, serializer):
+        if serializer.instance.owner_id != self.request.user.id:
+            raise Forbidden("Only the owner can change a saved filter.")
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        from apps.issues.services import saved_filter_delete
+        if instance.owner_id != self.request.user.id:
+            raise Forbidden("Only the owner can delete a saved filter.")
+        saved_filter_delete(saved_filter=instance)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsProjectMember])
+def saved_filter_issues_view(request, project_id, pk):
+    """Run a saved filter: match count and first issues, served from cache when possible."""
+    from apps.issues.selectors import saved_filter_list, saved_filter_results
+    from apps.projects.selectors import project_get_by_id
+    
+    project = project_get_by_id(project_id=project_id)
+    saved_filter = saved_filter_list(project=project, user=request.user).filter(pk=pk).first()
+    if saved_filter is None:
+        raise NotFound("Saved filter not found.")
+    
+    try:
+        limit = min(max(int(request.query_params.get("limit", 50)), 1), 100)
+    except ValueError:
+        limit = 50
+    
+    results = saved_filter_results(saved_filter=saved_filter, user=request.user, limit=limit)
+    serializer = IssueListSerializer(results["issues"], many=True, context={"request": request})
+    return Response({"count": results["count"], "results": serializer.data})
+
+
 @api_view(["GET", "POST", "DELETE"])
 @permission_classes([IsAuthenticated, IsProjectMember])
 def watchers_view(request, project_id, issue_key):
@@ -181,45 +338,204 @@ def watchers_view(request, project_id, issue_key):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsProjectMember])
+@parser_classes([MultiPartParser])
+def issue_import_view(request, project_id):
+    """Bulk import issues from a CSV or JSONL upload."""
+    from apps.issues.importers import iter_import_rows
+    from apps.issues.services import issue_bulk_import
+    from apps.projects.selectors import project_get_by_id
+    
+    serializer = IssueImportSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    project = project_get_by_id(project_id=project_id)
+    rows = iter_import_rows(
+        serializer.validated_data["file"],
+        fmt=serializer.validated_data["format"],
+    )
+    result = issue_bulk_import(project=project, rows=rows, default_reporter=request.user)
+    return Response(result)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsProjectMember])
+def issue_bulk_update_view(request, project_id):
+    """Apply one change set to many issues."""
+    from apps.issues.services import issue_bulk_update
+    from apps.projects.selectors import project_get_by_id
+    
+    project = project_get_by_id(project_id=project_id)
+    serializer = IssueBulkUpdateSerializer(data=request.data, context={"project": project})
+    serializer.is_valid(raise_exception=True)
+    
+    result = issue_bulk_update(
+        project=project,
+        keys=serializer.validated_data["keys"],
+        changes=serializer.validated_data["changes"],
+        actor=request.user,
+    )
+    return Response(result)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsProjectMember])
 def issue_transition_view(request, project_id, issue_key):
     """Transition issue to a new state."""
     from apps.issues.selectors import issue_get_by_key
     from apps.issues.services import issue_transition
-    from apps.projects.models import WorkflowState
     
     issue = issue_get_by_key(key=issue_key)
     serializer = IssueTransitionSerializer(data=request.data, context={"issue": issue})
     serializer.is_valid(raise_exception=True)
     
-    to_state = WorkflowState.objects.get(id=serializer.validated_data["to_state_id"])
+    to_state = serializer.validated_data["to_state"]
     issue = issue_transition(issue=issue, to_state=to_state, actor=request.user)
     
     response_serializer = IssueDetailSerializer(issue, context={"request": request})
     return Response(response_serializer.data)
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsProjectMember])
+def board_columns_view(request, project_id, board_id):
+    """Get every column of a board with its total and first issues."""
+    from apps.issues.selectors import issue_board_columns
+    from apps.projects.models import Board
+    
+    try:
+        board = Board.objects.select_related("project__workflow").get(id=board_id, project_id=project_id)
+    except Board.DoesNotExist:
+        raise NotFound("Board not found.")
+    
+    try:
+        limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    
+    columns = issue_board_columns(board=board, limit=limit)
+    serializer = BoardColumnSerializer(columns, many=True, context={"request": request, "limit": limit})
+    return Response({"board_id": board.id, "columns": serializer.data})
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsProjectMember])
 def project_activity_view(request, project_id):
-    """Get activity feed for a project."""
-    from apps.issues.selectors import event_list_by_project
+    """
+    Get activity feed for a project.
+
+    `?since=<event id>` returns up to 100 newer events, oldest first; poll
+    again from the last id while a full page comes back. Responses carry an
+    ETag and Last-Modified of the newest event, and unchanged feeds answer
+    304.
+    """
+    from apps.issues.selectors import event_latest, event_list_by_project
     from apps.projects.selectors import project_get_by_id
     
     project = project_get_by_id(project_id=project_id)
-    events = event_list_by_project(project=project, limit=100)
+    
+    validators = _feed_validators(event_latest(project=project))
+    not_modified = get_conditional_response(request, **validators)
+    if not_modified is not None:
+        return not_modified
+    since = _since_param(request)
+    
+    if KeysetPagination.cursor_query_param in request.query_params:
+        paginator = KeysetPagination()
+        events = paginator.paginate_queryset(
+            event_list_by_project(project=project, limit=None, since=since), request
+        )
+        serializer = EventSerializer(events, many=True)
+        return _with_validators(paginator.get_paginated_response(serializer.data), **validators)
+    
+    events = event_list_by_project(project=project, limit=100, since=since)
     serializer = EventSerializer(events, many=True)
-    return Response(serializer.data)
+    return _with_validators(Response(serializer.data), **validators)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsProjectMember])
 def issue_activity_view(request, project_id, issue_key):
-    """Get activity feed for an issue."""
-    from apps.issues.selectors import event_list_by_issue, issue_get_by_key
+    """
+    Get activity feed for an issue.
+
+    Like the project feed, `?since=<event id>` returns up to 100 newer
+    events, oldest first, and conditional requests are answered with 304.
+    """
+    from apps.issues.selectors import event_latest, event_list_by_issue, issue_get_by_key
     
-    issue = issue_get_by_key(key=issue_key)
-    events = event_list_by_issue(issue=issue)
+    issue = issue_get_by_key(key=issue_key, prefetch=False)
+    
+    validators = _feed_validators(event_latest(issue=issue))
+    not_modified = get_conditional_response(request, **validators)
+    if not_modified is not None:
+        return not_modified
+    
+    since = _since_param(request)
+    
+    if KeysetPagination.cursor_query_param in request.query_params:
+        paginator = KeysetPagination()
+        events = paginator.paginate_queryset(event_list_by_issue(issue=issue, since=since), request)
+        serializer = EventSerializer(events, many=True)
+        return _with_validators(paginator.get_paginated_response(serializer.data), **validators)
+    
+    events = event_list_by_issue(issue=issue, since=since, limit=100)
     serializer = EventSerializer(events, many=True)
-    return Response(serializer.data)
+    return _with_validators(Response(serializer.data), **validators)
+
+
+def _feed_validators(latest) -> dict:
+    """ETag and Last-Modified of a feed, from its newest (id, created_at)."""
+    if latest is None:
+        return {"etag": quote_etag("events-0"), "last_modified": None}
+    event_id, created_at = latest
+    return {"etag": quote_etag(f"events-{event_id}"), "last_modified": int(created_at.timestamp())}
+
+
+def _with_validators(response, *, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def _since_param(request):
+    since = request.query_params.get("since")
+    if not since:
+        return None
+    try:
+        return int(since)
+    except ValueError:
+        raise BadRequest("since must be an event id.")
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def global_search_view(request):
+    """
+    Search issues across every project the user is a member of.
+
+    Results are ranked and paged with a (rank, id) cursor. Facet counts
+    cover the whole result set and are only computed for the first page.
+    """
+    from apps.issues.selectors import issue_search_facets, issue_search_global
+    
+    params = GlobalSearchQuerySerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    search_filters = dict(params.validated_data)
+    query = search_filters.pop("q")
+    
+    results = issue_search_global(
+        project_ids=get_member_project_ids(request),
+        query=query,
+        filters=search_filters,
+    )
+    
+    paginator = SearchRankPagination()
+    page = paginator.paginate_queryset(results, request)
+    serializer = GlobalSearchResultSerializer(page, many=True, context={"request": request})
+    response = paginator.get_paginated_response(serializer.data)
+    if not request.query_params.get(paginator.cursor_query_param):
+        response.data["facets"] = issue_search_facets(results=results)
+    return response
@@ -3,7 +3,7 @@ Notification admin configuration.
 """
 from django.contrib import admin
 
-from apps.notifications.models import Notification, OutboxMessage
+from apps.notifications.models import EmailDelivery, Notification, NotificationState, OutboxMessage
 
 
 @admin.register(Notification)
@@ -17,7 +17,23 @@ class NotificationAdmin(admin.ModelAdmin):
 
 @admin.register(OutboxMessage)
 class OutboxMessageAdmin(admin.ModelAdmin):
-    list_display = ["event_type", "status", "retry_count", "created_at", "processed_at"]
+    list_display = ["event_type", "status", "retry_count", "available_at", "created_at", "processed_at"]
     list_filter = ["status", "event_type", "created_at"]
     search_fields = ["event_type", "error_message"]
     readonly_fields = ["created_at", "processed_at"]
+
+
+@admin.register(NotificationState)
+class NotificationStateAdmin(admin.ModelAdmin):
+    list_display = ["user", "unread_count", "read_watermark", "updated_at"]
+    search_fields = ["user__username"]
+    autocomplete_fields = ["user"]
+    readonly_fields = ["updated_at"]
+
+
+@admin.register(EmailDelivery)
+class EmailDeliveryAdmin(admin.ModelAdmin):
+    list_display = ["subject", "to_email", "status", "attempts", "available_at", "sent_at"]
+    list_filter = ["status", "created_at"]
+    search_fields = ["to_email", "subject", "error_message"]
+    readonly_fields = ["created_at", "sent_at"]
@@ -0,0 +1,55 @@
+"""
+Outbox metrics command.
+"""
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.selectors import outbox_metrics
+
+
+class Command(BaseCommand):
+    help = "Report outbox backlog, processing latency and failure rates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window", type=int, default=60, help="Minutes of history to summarise")
+        parser.add_argument("--json", action="store_true", help="Print the raw metrics as JSON")
+
+    def handle(self, *args, **options):
+        metrics = outbox_metrics(window=timedelta(minutes=options["window"]))
+        if options["json"]:
+            self.stdout.write(json.dumps(metrics, indent=2, default=str))
+            return
+
+        pending = metrics["pending"]
+        self.stdout.write(
+            f"Pending: {pending['total']} (oldest {pending['oldest_age_seconds']:.0f}s)"
+        )
+        for event_type, count in sorted(pending["by_event_type"].items()):
+            self.stdout.write(f"  {event_type:<24} {count}")
+        processing = metrics["processing"]
+        self.stdout.write(f"Processing: {processing['count']} ({processing['expired']} with expired leases)")
+
+        self.stdout.write(f"Last {options['window']} minutes:")
+        self.stdout.write(
+            f"  created {metrics['created']}, {metrics['throughput_per_minute']:.1f} processed/min, "
+            f"failure rate {metrics['failure_rate']:.1%}, retry rate {metrics['retry_rate']:.1%}, "
+            f"{metrics['dead']} dead"
+        )
+        self.stdout.write(f"  latency {_percentiles(metrics['latency_seconds'], 's')}")
+        for event_type, figures in sorted(metrics["handlers"].items()):
+            handler_ms = figures["handler_ms"]
+            self.stdout.write(
+                f"  {event_type:<24} {figures['processed']:>7} processed, "
+                f"latency {_percentiles(figures['latency_seconds'], 's')}, "
+                f"handler avg {_number(handler_ms['avg'])}ms p95 {_number(handler_ms['p95'])}ms"
+            )
+
+
+def _percentiles(values: dict, unit: str) -> str:
+    return " ".join(f"{name} {_number(value)}{unit}" for name, value in values.items())
+
+
+def _number(value) -> str:
+    return "-" if value is None else f"{value:.2f}"
@@ -0,0 +1,26 @@
+"""
+Unread notification counter repair command.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.notifications.models import NotificationState
+from apps.notifications.services import notification_unread_recount
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute unread notification counters, e.g. after deletes outside the services"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="Only recount this user id")
+
+    def handle(self, *args, **options):
+        user_ids = options["user"] or NotificationState.objects.values_list("user_id", flat=True)
+        corrected = 0
+        for user in User.objects.filter(id__in=list(user_ids)).iterator():
+            before = NotificationState.objects.filter(user=user).values_list("unread_count", flat=True).first()
+            if notification_unread_recount(user=user) != before:
+                corrected += 1
+        self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} unread counters"))
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 18:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_outbox_leases'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('read_watermark', models.BigIntegerField(default=0)),
+                ('unread_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'notification_states',
+            },
+        ),
+        migrations.RunSQL(
+            sql=(
+                "INSERT INTO notification_states (user_id, read_watermark, unread_count, updated_at) "
+                "SELECT recipient_id, 0, COUNT(*), NOW() FROM notifications "
+                "WHERE NOT is_read GROUP BY recipient_id"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
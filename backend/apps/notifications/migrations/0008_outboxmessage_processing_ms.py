@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0007_emaildelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='processing_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -3,13 +3,21 @@ Notification models with Outbox pattern.
 """
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from apps.issues.models import Issue
 from apps.projects.models import Project
 
 
 class OutboxMessage(models.Model):
-    """Outbox for reliable message processing."""
+    """
+    Outbox for reliable message processing.
+
+    Workers claim PENDING rows that are due (`available_at`) and hold them as
+    PROCESSING until `locked_until`; a row whose lease expires is claimable
+    again. Failed attempts go back to PENDING with a later `available_at`
+    until the retry budget is spent, after which the row stays FAILED.
+    """
     
     class Status(models.TextChoices):
         PENDING = "pending", "Pending"
@@ -22,6 +30,9 @@ class OutboxMessage(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     error_message = models.TextField(blank=True)
     retry_count = models.PositiveIntegerField(default=0)
+    processing_ms = models.PositiveIntegerField(null=True, blank=True)  # last attempt's handler time
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
@@ -69,7 +80,78 @@ class Notification(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["recipient", "is_read", "-created_at"]),
+            models.Index(fields=["recipient", "-created_at", "-id"]),
         ]
 
     def __str__(self):
         return f"{self.title} for {self.recipient.username}"
+
+
+class NotificationState(models.Model):
+    """
+    Per-user read watermark and unread counter.
+
+    Notifications with an id up to `read_watermark` count as read whatever
+    their `is_read` flag says, so "mark all read" moves the watermark instead
+    of updating every row. `unread_count` is kept in step by the services.
+    """
+    
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_state"
+    )
+    read_watermark = models.BigIntegerField(default=0)
+    unread_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "notification_states"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count} unread"
+
+
+class EmailDelivery(models.Model):
+    """
+    Queued email, sent in batches by the email worker.
+
+    Claimed and retried the same way as OutboxMessage: PENDING rows become
+    SENDING under a lease, failed sends go back to PENDING with a later
+    `available_at` until the attempt budget is spent.
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENDING = "sending", "Sending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="email_deliveries"
+    )
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "email_deliveries"
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} - {self.status}"
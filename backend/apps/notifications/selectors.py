@@ -1,31 +1,182 @@
 """
 Notification selectors.
 """
+from datetime import date, datetime, timedelta
+
 from django.contrib.auth import get_user_model
-from django.db.models import QuerySet
+from django.db import connection
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, Max, Q, QuerySet, Sum
+from django.utils import timezone
 
-from apps.notifications.models import Notification, OutboxMessage
+from apps.issues.models import Issue
+from apps.notifications.models import Notification, NotificationState, OutboxMessage
 
 User = get_user_model()
 
 
+def notification_read_watermark(*, user: User) -> int:
+    """Id up to which all of the user's notifications count as read."""
+    watermark = NotificationState.objects.filter(user=user).values_list("read_watermark", flat=True).first()
+    return watermark or 0
+
+
 def notification_list(*, user: User, is_read: bool = None) -> QuerySet:
-    """Get notifications for a user."""
-    qs = Notification.objects.filter(recipient=user).select_related("project", "issue")
+    """
+    Get notifications for a user.
+
+    Each row is annotated with `read`, which also covers notifications below
+    the user's read watermark.
+    """
+    read = Q(is_read=True) | Q(id__lte=notification_read_watermark(user=user))
+    qs = Notification.objects.filter(recipient=user).select_related("project", "issue").annotate(
+        read=ExpressionWrapper(read, output_field=BooleanField())
+    )
     
     if is_read is not None:
-        qs = qs.filter(is_read=is_read)
+        qs = qs.filter(read) if is_read else qs.exclude(read)
     
     return qs
 
 
 def notification_unread_count(*, user: User) -> int:
-    """Count unread notifications for a user."""
-    return Notification.objects.filter(recipient=user, is_read=False).count()
+    """Count unread notifications for a user from the maintained counter."""
+    count = NotificationState.objects.filter(user=user).values_list("unread_count", flat=True).first()
+    return max(count or 0, 0)
+
+
+def _unread_q() -> Q:
+    """Unread notifications of any recipient, honouring read watermarks."""
+    return Q(is_read=False) & (
+        Q(recipient__notification_state__isnull=True)
+        | Q(id__gt=F("recipient__notification_state__read_watermark"))
+    )
+
+
+def outbox_metrics(*, window: timedelta = timedelta(hours=1)) -> dict:
+    """
+    Backlog and throughput figures for the outbox.
+
+    Every query filters on status first and, except for the live backlog, on
+    created_at within `window`, so all of them are range scans of the
+    (status, created_at) index rather than passes over the whole table.
+    Latency is measured from creation to processing; handler times come from
+    `processing_ms`.
+    """
+    now = timezone.now()
+    since = now - window
+    Status = OutboxMessage.Status
+
+    pending = OutboxMessage.objects.filter(status=Status.PENDING)
+    pending_by_type = {
+        row["event_type"]: row["count"]
+        for row in pending.order_by().values("event_type").annotate(count=Count("id"))
+    }
+    oldest = pending.order_by("created_at").values_list("created_at", flat=True).first()
+    processing = OutboxMessage.objects.filter(status=Status.PROCESSING).aggregate(
+        count=Count("id"),
+        expired=Count("id", filter=Q(locked_until__lte=now)),
+    )
+
+    # All four statuses spelled out so the planner can range-scan the index
+    # once per status instead of falling back to a sequential scan
+    recent = OutboxMessage.objects.filter(status__in=Status.values, created_at__gte=since).aggregate(
+        created=Count("id"),
+        processed=Count("id", filter=Q(status=Status.PROCESSED)),
+        failed=Count("id", filter=Q(status=Status.FAILED)),
+        retried=Count("id", filter=Q(retry_count__gt=0)),
+        attempts=Sum("retry_count"),
+    )
+    created = recent["created"]
+    handled_attempts = recent["processed"] + (recent["attempts"] or 0)
+
+    handlers = {}
+    overall = None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT
+                event_type,
+                COUNT(*),
+                percentile_cont(ARRAY[0.5, 0.95, 0.99]) WITHIN GROUP (
+                    ORDER BY EXTRACT(EPOCH FROM processed_at - created_at)
+                ),
+                AVG(processing_ms),
+                percentile_cont(0.95) WITHIN GROUP (ORDER BY processing_ms),
+                MAX(processing_ms)
+            FROM outbox_messages
+            WHERE status = %s AND created_at >= %s
+            GROUP BY GROUPING SETS ((event_type), ())
+            """,
+            [Status.PROCESSED, since],
+        )
+        for event_type, count, latency, avg_ms, p95_ms, max_ms in cursor.fetchall():
+            figures = {
+                "processed": count,
+                "latency_seconds": dict(zip(("p50", "p95", "p99"), latency or (None, None, None))),
+                "handler_ms": {
+                    "avg": float(avg_ms) if avg_ms is not None else None,
+                    "p95": p95_ms,
+                    "max": max_ms,
+                },
+            }
+            if event_type is None:
+                overall = figures
+            else:
+                handlers[event_type] = figures
+
+    return {
+        "window_seconds": int(window.total_seconds()),
+        "pending": {
+            "total": sum(pending_by_type.values()),
+            "by_event_type": pending_by_type,
+            "oldest_age_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+        },
+        "processing": processing,
+        "throughput_per_minute": recent["processed"] / (window.total_seconds() / 60),
+        "created": created,
+        "failure_rate": (recent["attempts"] or 0) / handled_attempts if handled_attempts else 0.0,
+        "retry_rate": recent["retried"] / created if created else 0.0,
+        "dead": recent["failed"],
+        "latency_seconds": overall["latency_seconds"] if overall else {"p50": None, "p95": None, "p99": None},
+        "handlers": handlers,
+    }
+
+
+def digest_recipient_ids(*, since: datetime, today: date, due_before: date) -> list:
+    """Ids of users with unread notifications since `since` or open issues due soon."""
+    notified = Notification.objects.filter(
+        _unread_q(), created_at__gte=since
+    ).values_list("recipient_id", flat=True).order_by()
+    assigned = Issue.objects.filter(
+        assignee__isnull=False,
+        resolved_at__isnull=True,
+        due_date__gte=today,
+        due_date__lte=due_before,
+    ).values_list("assignee_id", flat=True).order_by()
+    return sorted(set(notified.union(assigned)))
+
+
+def digest_notification_groups(*, user_ids: list, since: datetime) -> list:
+    """Unread notifications since `since` counted per (recipient, project, issue)."""
+    return list(
+        Notification.objects.filter(
+            _unread_q(), recipient_id__in=user_ids, created_at__gte=since
+        )
+        .values("recipient_id", "project_id", "project__name", "issue_id", "issue__key", "issue__title")
+        .annotate(count=Count("id"), latest=Max("created_at"))
+        .order_by("recipient_id", "project__name", "-latest")
+    )
 
 
-def outbox_pending_messages(*, limit: int = 100) -> QuerySet:
-    """Get pending outbox messages."""
-    return OutboxMessage.objects.filter(
-        status=OutboxMessage.Status.PENDING
-    ).order_by("created_at")[:limit]
+def digest_due_issues(*, user_ids: list, today: date, due_before: date) -> list:
+    """Open issues assigned to `user_ids` due between `today` and `due_before`."""
+    return list(
+        Issue.objects.filter(
+            assignee_id__in=user_ids,
+            resolved_at__isnull=True,
+            due_date__gte=today,
+            due_date__lte=due_before,
+        )
+        .values("assignee_id", "key", "title", "due_date", "project__name")
+        .order_by("assignee_id", "due_date", "key")
+    )
@@ -10,6 +10,7 @@ class NotificationSerializer(serializers.ModelSerializer):
     """Notification serializer."""
     project_key = serializers.CharField(source="project.key", read_only=True, allow_null=True)
     issue_key = serializers.CharField(source="issue.key", read_only=True, allow_null=True)
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
@@ -25,3 +26,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             "created_at",
         ]
         read_only_fields = ["id", "created_at", "read_at"]
+
+    def get_is_read(self, obj) -> bool:
+        # `read` is annotated by notification_list and honours the watermark
+        return getattr(obj, "read", obj.is_read) or obj.is_read
@@ -1,43 +1,146 @@
 """
 Notification services.
 """
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
 from django.db import transaction
+from django.db.models import Count, F, Max, Q, QuerySet
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 from apps.issues.models import Issue
-from apps.notifications.models import Notification, OutboxMessage
+from apps.notifications.models import EmailDelivery, Notification, NotificationState, OutboxMessage
+from apps.notifications.selectors import digest_due_issues, digest_notification_groups
 from apps.projects.models import Project
+from common.cache import cache_rate_acquire
 
 User = get_user_model()
 
+OUTBOX_PROCESS_SCHEDULED_KEY = "notifications:outbox:scheduled"
+OUTBOX_PROCESS_SCHEDULE_TIMEOUT = 60
+EMAIL_SEND_SCHEDULED_KEY = "notifications:email:scheduled"
+EMAIL_SEND_SCHEDULE_TIMEOUT = 60
+EMAIL_RATE_KEY = "notifications:email:rate"
+
 
 @transaction.atomic
 def outbox_create(*, event_type: str, payload: dict) -> OutboxMessage:
-    """Create an outbox message."""
-    return OutboxMessage.objects.create(
+    """
+    Create an outbox message.
+
+    The row is written in the caller's transaction, so it exists exactly when
+    the change it describes does; the processor is woken once that
+    transaction commits.
+    """
+    message = OutboxMessage.objects.create(
         event_type=event_type,
         payload=payload,
     )
+    transaction.on_commit(_schedule_outbox_processing)
+    return message
 
 
 @transaction.atomic
-def outbox_mark_processed(*, message: OutboxMessage) -> OutboxMessage:
+def outbox_bulk_create(*, messages: list) -> list:
+    """Create outbox messages from `(event_type, payload)` pairs in one INSERT."""
+    if not messages:
+        return []
+    created = OutboxMessage.objects.bulk_create([
+        OutboxMessage(event_type=event_type, payload=payload)
+        for event_type, payload in messages
+    ])
+    transaction.on_commit(_schedule_outbox_processing)
+    return created
+
+
+def _schedule_outbox_processing() -> None:
+    from apps.notifications.tasks import process_outbox_messages
+    
+    # Coalesce bursts of changes into one queued task; the task clears the
+    # key when it starts, so messages committed while it runs wake it again
+    if cache.add(OUTBOX_PROCESS_SCHEDULED_KEY, 1, OUTBOX_PROCESS_SCHEDULE_TIMEOUT):
+        process_outbox_messages.delay()
+
+
+def outbox_claim_batch(*, limit: int = 100) -> list:
+    """
+    Claim up to `limit` due messages for this worker.
+
+    Rows are picked with SELECT ... FOR UPDATE SKIP LOCKED and moved to
+    PROCESSING under a lease of OUTBOX_LEASE_SECONDS in one short
+    transaction, so concurrent workers always claim disjoint batches.
+    Messages whose lease ran out (a worker died mid-batch) are claimed again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.filter(
+                Q(status=OutboxMessage.Status.PENDING, available_at__lte=now)
+                | Q(status=OutboxMessage.Status.PROCESSING, locked_until__lte=now)
+            )
+            .select_for_update(skip_locked=True)
+            .order_by("created_at")[:limit]
+        )
+        if messages:
+            locked_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            OutboxMessage.objects.filter(id__in=[message.id for message in messages]).update(
+                status=OutboxMessage.Status.PROCESSING,
+                locked_until=locked_until,
+            )
+            for message in messages:
+                message.status = OutboxMessage.Status.PROCESSING
+                message.locked_until = locked_until
+    return messages
+
+
+@transaction.atomic
+def outbox_mark_processed(*, message: OutboxMessage, processing_ms: int = None) -> OutboxMessage:
     """Mark outbox message as processed."""
     message.status = OutboxMessage.Status.PROCESSED
     message.processed_at = timezone.now()
-    message.save()
+    message.locked_until = None
+    message.processing_ms = processing_ms
+    message.save(update_fields=["status", "processed_at", "locked_until", "processing_ms"])
     return message
 
 
+def outbox_retry_delay(*, retry_count: int) -> int:
+    """Seconds to wait before attempt `retry_count + 1`: exponential, capped."""
+    return min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** retry_count,
+        settings.OUTBOX_RETRY_MAX_SECONDS,
+    )
+
+
 @transaction.atomic
-def outbox_mark_failed(*, message: OutboxMessage, error: str) -> OutboxMessage:
-    """Mark outbox message as failed."""
-    message.status = OutboxMessage.Status.FAILED
+def outbox_mark_failed(*, message: OutboxMessage, error: str, processing_ms: int = None) -> OutboxMessage:
+    """
+    Record a failed attempt.
+
+    The message goes back to PENDING, due after an exponential backoff on
+    `retry_count`, until OUTBOX_MAX_RETRIES attempts have failed; then it is
+    left FAILED for inspection.
+    """
     message.error_message = error
+    message.locked_until = None
+    message.processing_ms = processing_ms
+    if message.retry_count < settings.OUTBOX_MAX_RETRIES:
+        message.status = OutboxMessage.Status.PENDING
+        message.available_at = timezone.now() + timedelta(
+            seconds=outbox_retry_delay(retry_count=message.retry_count)
+        )
+    else:
+        message.status = OutboxMessage.Status.FAILED
     message.retry_count += 1
-    message.save()
+    message.save(update_fields=[
+        "status", "error_message", "locked_until", "processing_ms", "available_at", "retry_count",
+    ])
     return message
 
 
@@ -52,6 +155,7 @@ def notification_create(
     issue: Issue = None,
 ) -> Notification:
     """Create a notification."""
+    _unread_counts_add(user_ids=[recipient.id])
     return Notification.objects.create(
         recipient=recipient,
         notification_type=notification_type,
@@ -62,91 +166,424 @@ def notification_create(
     )
 
 
+@transaction.atomic
+def notification_bulk_create(
+    *,
+    recipients: list,
+    notification_type: str,
+    title: str,
+    message: str,
+    project: Project = None,
+    issue: Issue = None,
+) -> list:
+    """Create the same notification for many recipients in one INSERT."""
+    _unread_counts_add(user_ids=[recipient.id for recipient in recipients])
+    return Notification.objects.bulk_create([
+        Notification(
+            recipient=recipient,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            project=project,
+            issue=issue,
+        )
+        for recipient in recipients
+    ])
+
+
+def _unread_counts_add(*, user_ids: list) -> None:
+    """
+    Add one unread notification per occurrence in `user_ids` to the counters.
+
+    Must run before the notifications are inserted: the counter rows stay
+    locked until commit, so a concurrent "mark all read" either waits for
+    the new rows or moves the watermark before their ids are allocated.
+    """
+    if not user_ids:
+        return
+    counts = {}
+    for user_id in user_ids:
+        counts[user_id] = counts.get(user_id, 0) + 1
+    
+    NotificationState.objects.bulk_create(
+        [NotificationState(user_id=user_id) for user_id in counts],
+        ignore_conflicts=True,
+    )
+    # Lock in a fixed order so overlapping fan-outs cannot deadlock
+    list(
+        NotificationState.objects.filter(user_id__in=counts)
+        .select_for_update()
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+    )
+    for increment in set(counts.values()):
+        NotificationState.objects.filter(
+            user_id__in=[user_id for user_id, count in counts.items() if count == increment]
+        ).update(unread_count=F("unread_count") + increment)
+
+
+@transaction.atomic
+def notification_unread_release(*, notifications: QuerySet) -> None:
+    """
+    Take `notifications` out of their recipients' unread counters.
+
+    Call in the transaction that deletes them, before the delete: cascades
+    from issues and projects remove notifications without going through
+    these services.
+    """
+    recipient_ids = set(notifications.values_list("recipient_id", flat=True))
+    if not recipient_ids:
+        return
+    # Same lock order as _unread_counts_add
+    list(
+        NotificationState.objects.filter(user_id__in=recipient_ids)
+        .select_for_update()
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+    )
+    unread = (
+        notifications.filter(
+            is_read=False, id__gt=F("recipient__notification_state__read_watermark")
+        )
+        .values("recipient_id").annotate(unread=Count("id")).order_by()
+    )
+    counts = {row["recipient_id"]: row["unread"] for row in unread}
+    for decrement in set(counts.values()):
+        NotificationState.objects.filter(
+            user_id__in=[user_id for user_id, count in counts.items() if count == decrement]
+        ).update(unread_count=Greatest(F("unread_count") - decrement, 0))
+
+
+def _notification_state_lock(*, user_id: int) -> NotificationState:
+    NotificationState.objects.get_or_create(user_id=user_id)
+    return NotificationState.objects.select_for_update().get(user_id=user_id)
+
+
 @transaction.atomic
 def notification_mark_read(*, notification: Notification) -> Notification:
     """Mark a notification as read."""
-    if not notification.is_read:
-        notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
+    if notification.is_read:
+        return notification
+    
+    state = _notification_state_lock(user_id=notification.recipient_id)
+    notification.is_read = True
+    notification.read_at = timezone.now()
+    # Conditional so two concurrent requests only decrement once
+    marked = Notification.objects.filter(id=notification.id, is_read=False).update(
+        is_read=True, read_at=notification.read_at
+    )
+    if marked and notification.id > state.read_watermark:
+        NotificationState.objects.filter(user_id=state.user_id).update(
+            unread_count=Greatest(F("unread_count") - 1, 0)
+        )
     return notification
 
 
 @transaction.atomic
 def notification_mark_all_read(*, user: User) -> int:
-    """Mark all notifications as read for a user."""
-    return Notification.objects.filter(
-        recipient=user,
-        is_read=False
-    ).update(is_read=True, read_at=timezone.now())
+    """
+    Mark all notifications as read for a user.
+
+    Only the watermark moves; notification rows are left untouched. Returns
+    the number of notifications that were unread.
+    """
+    state = _notification_state_lock(user_id=user.id)
+    latest_id = Notification.objects.filter(recipient=user).aggregate(latest=Max("id"))["latest"]
+    marked = max(state.unread_count, 0)
+    if latest_id and latest_id > state.read_watermark:
+        state.read_watermark = latest_id
+    state.unread_count = 0
+    state.save(update_fields=["read_watermark", "unread_count", "updated_at"])
+    return marked
+
+
+@transaction.atomic
+def notification_unread_recount(*, user: User) -> int:
+    """Recompute a user's unread counter from the notifications table."""
+    state = _notification_state_lock(user_id=user.id)
+    state.unread_count = Notification.objects.filter(
+        recipient=user, is_read=False, id__gt=state.read_watermark
+    ).count()
+    state.save(update_fields=["unread_count", "updated_at"])
+    return state.unread_count
 
 
 def notification_send_email(*, notification: Notification) -> None:
-    """Send email notification."""
+    """Queue an email for a notification."""
+    notification_send_emails(notifications=[notification])
+
+
+@transaction.atomic
+def notification_send_emails(*, notifications: list) -> list:
+    """
+    Queue emails for notifications on the email worker.
+
+    Deliveries are written in the caller's transaction, so nothing is mailed
+    for notifications that get rolled back. Recipients must already be
+    loaded on the notifications.
+    """
     # In production, use a proper email template
-    send_mail(
-        subject=notification.title,
-        message=notification.message,
-        from_email=None,  # Uses DEFAULT_FROM_EMAIL
-        recipient_list=[notification.recipient.email],
-        fail_silently=True,
+    deliveries = EmailDelivery.objects.bulk_create([
+        EmailDelivery(
+            notification=notification,
+            to_email=notification.recipient.email,
+            subject=notification.title,
+            body=notification.message,
+        )
+        for notification in notifications
+        if notification.recipient.email
+    ])
+    if deliveries:
+        transaction.on_commit(_schedule_email_sending)
+    return deliveries
+
+
+def _schedule_email_sending() -> None:
+    from apps.notifications.tasks import send_queued_emails
+    
+    if cache.add(EMAIL_SEND_SCHEDULED_KEY, 1, EMAIL_SEND_SCHEDULE_TIMEOUT):
+        send_queued_emails.delay()
+
+
+def email_claim_batch(*, limit: int) -> list:
+    """
+    Claim up to `limit` due deliveries for this worker.
+
+    Same SKIP LOCKED lease as outbox_claim_batch, so several email workers
+    never send the same message twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        deliveries = list(
+            EmailDelivery.objects.filter(
+                Q(status=EmailDelivery.Status.PENDING, available_at__lte=now)
+                | Q(status=EmailDelivery.Status.SENDING, locked_until__lte=now)
+            )
+            .select_for_update(skip_locked=True)
+            .order_by("available_at")[:limit]
+        )
+        if deliveries:
+            locked_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            EmailDelivery.objects.filter(id__in=[delivery.id for delivery in deliveries]).update(
+                status=EmailDelivery.Status.SENDING,
+                locked_until=locked_until,
+            )
+            for delivery in deliveries:
+                delivery.status = EmailDelivery.Status.SENDING
+                delivery.locked_until = locked_until
+    return deliveries
+
+
+def email_send_batch(*, deliveries: list, rate: float = 0) -> dict:
+    """
+    Send claimed deliveries over one SMTP connection.
+
+    Messages go out one by one on the shared connection, so a rejected
+    recipient fails only its own delivery. Sending is paced to at most
+    `rate` per second across every worker, counted in the shared cache (0
+    means unpaced). Returns sent/failed counts and the achieved rate.
+    """
+    started = time.monotonic()
+    sent = []
+    failed = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        failed = [(delivery, str(e)) for delivery in deliveries]
+    else:
+        try:
+            for delivery in deliveries:
+                while rate and (delay := cache_rate_acquire(EMAIL_RATE_KEY, rate=rate)) > 0:
+                    time.sleep(delay)
+                message = EmailMessage(
+                    subject=delivery.subject,
+                    body=delivery.body,
+                    from_email=None,  # Uses DEFAULT_FROM_EMAIL
+                    to=[delivery.to_email],
+                    connection=connection,
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as e:
+                    failed.append((delivery, str(e)))
+                else:
+                    sent.append(delivery)
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    EmailDelivery.objects.filter(id__in=[delivery.id for delivery in sent]).update(
+        status=EmailDelivery.Status.SENT,
+        sent_at=now,
+        locked_until=None,
+        attempts=F("attempts") + 1,
     )
+    for delivery, error in failed:
+        _email_mark_failed(delivery=delivery, error=error)
+
+    elapsed = time.monotonic() - started
+    return {
+        "sent": len(sent),
+        "failed": len(failed),
+        "retry_at": min(
+            (d.available_at for d, _ in failed if d.status == EmailDelivery.Status.PENDING),
+            default=None,
+        ),
+        "seconds": elapsed,
+        "per_second": len(sent) / elapsed if elapsed else 0.0,
+    }
+
+
+def _email_mark_failed(*, delivery: EmailDelivery, error: str) -> None:
+    delivery.attempts += 1
+    delivery.error_message = error
+    delivery.locked_until = None
+    if delivery.attempts < settings.EMAIL_MAX_ATTEMPTS:
+        delivery.status = EmailDelivery.Status.PENDING
+        delivery.available_at = timezone.now() + timedelta(
+            seconds=outbox_retry_delay(retry_count=delivery.attempts - 1)
+        )
+    else:
+        delivery.status = EmailDelivery.Status.FAILED
+    delivery.save(update_fields=["attempts", "error_message", "locked_until", "status", "available_at"])
+
+
+@transaction.atomic
+def daily_digest_send(*, user_ids: list, since: datetime) -> int:
+    """
+    Queue the daily digest for a chunk of users.
+
+    The whole chunk is summarised from two aggregate queries and queued as
+    email deliveries, so digests share the email worker's rate limit and
+    retries. Users with nothing to report get no email. Returns the number
+    of digests queued.
+    """
+    today = timezone.localdate()
+    due_before = today + timedelta(days=settings.DIGEST_DUE_SOON_DAYS)
 
+    groups = defaultdict(list)
+    for row in digest_notification_groups(user_ids=user_ids, since=since):
+        groups[row["recipient_id"]].append(row)
+    due = defaultdict(list)
+    for row in digest_due_issues(user_ids=user_ids, today=today, due_before=due_before):
+        due[row["assignee_id"]].append(row)
 
-def process_outbox_message(*, message: OutboxMessage) -> None:
-    """Process an outbox message and create notifications."""
+    recipients = User.objects.filter(id__in=groups.keys() | due.keys()).only("id", "username", "email")
+    deliveries = EmailDelivery.objects.bulk_create([
+        EmailDelivery(
+            to_email=user.email,
+            subject=f"Your daily digest for {today:%b %d}",
+            body=_digest_body(user=user, groups=groups[user.id], due=due[user.id]),
+        )
+        for user in recipients
+        if user.email
+    ])
+    if deliveries:
+        transaction.on_commit(_schedule_email_sending)
+    return len(deliveries)
+
+
+def _digest_body(*, user: User, groups: list, due: list) -> str:
+    # In production, use a proper email template
+    lines = [f"Hi {user.username},", ""]
+    if groups:
+        lines.append(f"Unread notifications ({sum(row['count'] for row in groups)}):")
+        project = None
+        for row in groups:
+            if row["project__name"] != project:
+                project = row["project__name"]
+                lines.append(f"  {project or 'General'}")
+            label = f"{row['issue__key']} {row['issue__title']}" if row["issue_id"] else "Project updates"
+            lines.append(f"    {label} ({row['count']})")
+        lines.append("")
+    if due:
+        lines.append("Assigned to you and due soon:")
+        for row in due:
+            lines.append(f"  {row['key']} {row['title']} ({row['project__name']}), due {row['due_date']:%b %d}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def process_outbox_message(*, message: OutboxMessage) -> bool:
+    """
+    Process a claimed outbox message and create notifications.
+
+    The notifications and the PROCESSED status commit together, so a failed
+    attempt leaves nothing behind for its retry to duplicate. Returns False
+    if the attempt failed.
+    """
+    started = time.monotonic()
     try:
-        event_type = message.event_type
-        payload = message.payload
-        
-        if event_type == "issue_assigned":
-            _handle_issue_assigned(payload)
-        elif event_type == "issue_commented":
-            _handle_issue_commented(payload)
-        elif event_type == "issue_state_changed":
-            _handle_issue_state_changed(payload)
-        # Add more event handlers as needed
-        
-        outbox_mark_processed(message=message)
+        with transaction.atomic():
+            event_type = message.event_type
+            payload = message.payload
+            
+            if event_type == "issue_assigned":
+                _handle_issue_assigned(payload)
+            elif event_type == "issue_commented":
+                _handle_issue_commented(payload)
+            elif event_type == "issue_state_changed":
+                _handle_issue_state_changed(payload)
+            # Add more event handlers as needed
+            
+            outbox_mark_processed(message=message, processing_ms=_elapsed_ms(started))
     except Exception as e:
-        outbox_mark_failed(message=message, error=str(e))
+        outbox_mark_failed(message=message, error=str(e), processing_ms=_elapsed_ms(started))
+        return False
+    return True
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.monotonic() - started) * 1000)
+
+
+def _watcher_recipients(*, issue: Issue, exclude: User) -> list:
+    """Users watching `issue` other than `exclude`, loaded in one query."""
+    return list(
+        User.objects.filter(watched_issues__issue=issue)
+        .exclude(id=exclude.id)
+        .only("id", "username", "email")
+    )
 
 
 def _handle_issue_assigned(payload: dict) -> None:
     """Handle issue assignment notification."""
     try:
-        issue = Issue.objects.get(id=payload["issue_id"])
-        if issue.assignee:
+        issue = Issue.objects.select_related("project").get(id=payload["issue_id"])
+        actor = User.objects.get(id=payload["actor_id"]) if payload.get("actor_id") else issue.reporter
+        # The assignee at the time of the change, even if it changed again since
+        assignee = User.objects.get(id=payload["assignee_id"])
+        if assignee != actor:
             notification = notification_create(
-                recipient=issue.assignee,
+                recipient=assignee,
                 notification_type=Notification.Type.ISSUE_ASSIGNED,
                 title=f"You were assigned to {issue.key}",
-                message=f"{issue.reporter.username} assigned you to {issue.title}",
+                message=f"{actor.username} assigned you to {issue.title}",
                 project=issue.project,
                 issue=issue,
             )
             notification_send_email(notification=notification)
-    except Issue.DoesNotExist:
+    except (Issue.DoesNotExist, User.DoesNotExist):
         pass
 
 
 def _handle_issue_commented(payload: dict) -> None:
     """Handle issue comment notification."""
     try:
-        issue = Issue.objects.get(id=payload["issue_id"])
+        issue = Issue.objects.select_related("project").get(id=payload["issue_id"])
         author = User.objects.get(id=payload["author_id"])
         
         # Notify watchers (except the comment author)
-        for watcher in issue.watchers.exclude(user=author):
-            notification = notification_create(
-                recipient=watcher.user,
-                notification_type=Notification.Type.ISSUE_COMMENTED,
-                title=f"New comment on {issue.key}",
-                message=f"{author.username} commented on {issue.title}",
-                project=issue.project,
-                issue=issue,
-            )
-            notification_send_email(notification=notification)
+        notifications = notification_bulk_create(
+            recipients=_watcher_recipients(issue=issue, exclude=author),
+            notification_type=Notification.Type.ISSUE_COMMENTED,
+            title=f"New comment on {issue.key}",
+            message=f"{author.username} commented on {issue.title}",
+            project=issue.project,
+            issue=issue,
+        )
+        notification_send_emails(notifications=notifications)
     except (Issue.DoesNotExist, User.DoesNotExist):
         pass
 
@@ -154,18 +591,17 @@ def _handle_issue_commented(payload: dict) -> None:
 def _handle_issue_state_changed(payload: dict) -> None:
     """Handle issue state change notification."""
     try:
-        issue = Issue.objects.get(id=payload["issue_id"])
+        issue = Issue.objects.select_related("project", "state").get(id=payload["issue_id"])
         actor = User.objects.get(id=payload["actor_id"])
         
         # Notify watchers (except the actor)
-        for watcher in issue.watchers.exclude(user=actor):
-            notification = notification_create(
-                recipient=watcher.user,
-                notification_type=Notification.Type.ISSUE_STATE_CHANGED,
-                title=f"{issue.key} state changed",
-                message=f"{actor.username} moved {issue.title} to {issue.state.name}",
-                project=issue.project,
-                issue=issue,
-            )
+        notification_bulk_create(
+            recipients=_watcher_recipients(issue=issue, exclude=actor),
+            notification_type=Notification.Type.ISSUE_STATE_CHANGED,
+            title=f"{issue.key} state changed",
+            message=f"{actor.username} moved {issue.title} to {issue.state.name}",
+            project=issue.project,
+            issue=issue,
+        )
     except (Issue.DoesNotExist, User.DoesNotExist):
         pass
@@ -1,25 +1,118 @@
 """
 Celery tasks for notifications.
 """
+from datetime import timedelta
+
 from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.notifications.models import OutboxMessage
+from apps.notifications.selectors import digest_recipient_ids
+from apps.notifications.services import (
+    EMAIL_SEND_SCHEDULED_KEY,
+    OUTBOX_PROCESS_SCHEDULED_KEY,
+    daily_digest_send,
+    email_claim_batch,
+    email_send_batch,
+    outbox_claim_batch,
+    process_outbox_message,
+)
 
-from apps.notifications.selectors import outbox_pending_messages
-from apps.notifications.services import process_outbox_message
+logger = get_task_logger(__name__)
 
 
 @shared_task
-def process_outbox_messages():
-    """Process pending outbox messages."""
-    messages = outbox_pending_messages(limit=100)
+def process_outbox_messages(batch_size=100):
+    """
+    Claim and process one batch of outbox messages.
+
+    Queued by the producing services once their transaction commits; the
+    periodic run only sweeps up messages whose wake-up was lost. A full batch
+    queues the next one before processing starts, so idle workers drain the
+    backlog in parallel. Failed messages queue a run for when their backoff
+    ends.
+    """
+    cache.delete(OUTBOX_PROCESS_SCHEDULED_KEY)
     
+    messages = outbox_claim_batch(limit=batch_size)
+    if len(messages) == batch_size:
+        process_outbox_messages.delay(batch_size=batch_size)
+    
+    failed = 0
+    next_retry_at = None
     for message in messages:
-        process_outbox_message(message=message)
+        if process_outbox_message(message=message):
+            continue
+        failed += 1
+        if message.status == OutboxMessage.Status.PENDING:
+            next_retry_at = min(next_retry_at or message.available_at, message.available_at)
+    
+    if next_retry_at:
+        delay = (next_retry_at - timezone.now()).total_seconds()
+        process_outbox_messages.apply_async(kwargs={"batch_size": batch_size}, countdown=max(delay, 0))
+    
+    return f"Processed {len(messages) - failed} messages, {failed} failed"
+
+
+@shared_task
+def send_queued_emails(batch_size=None):
+    """
+    Send one batch of queued emails over a single connection.
+
+    Routed to the "email" queue so slow SMTP servers never hold up outbox
+    processing. Sending is paced to EMAIL_RATE_LIMIT messages per second
+    across all workers; a full batch queues the next one and failed sends
+    queue a run for when their backoff ends.
+    """
+    cache.delete(EMAIL_SEND_SCHEDULED_KEY)
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    
+    deliveries = email_claim_batch(limit=batch_size)
+    if not deliveries:
+        return "Sent 0 emails"
+    
+    result = email_send_batch(deliveries=deliveries, rate=settings.EMAIL_RATE_LIMIT)
+    if len(deliveries) == batch_size:
+        send_queued_emails.delay(batch_size=batch_size)
+    if result["retry_at"]:
+        delay = (result["retry_at"] - timezone.now()).total_seconds()
+        send_queued_emails.apply_async(kwargs={"batch_size": batch_size}, countdown=max(delay, 0))
+    
+    summary = "Sent {sent} emails, {failed} failed, in {seconds:.2f}s ({per_second:.1f} msg/s)".format(**result)
+    logger.info(summary)
+    return summary
+
+
+@shared_task
+def send_daily_digest(chunk_size=None):
+    """
+    Queue the daily digest for everyone with something to report.
+
+    Recipients are found with two set queries and split into chunks, each
+    summarised by its own task so the work spreads across workers; the
+    email worker then sends them.
+    """
+    chunk_size = chunk_size or settings.DIGEST_CHUNK_SIZE
+    since = timezone.now() - timedelta(days=1)
+    today = timezone.localdate()
+    user_ids = digest_recipient_ids(
+        since=since,
+        today=today,
+        due_before=today + timedelta(days=settings.DIGEST_DUE_SOON_DAYS),
+    )
+    
+    for start in range(0, len(user_ids), chunk_size):
+        send_daily_digest_chunk.delay(user_ids=user_ids[start:start + chunk_size], since=since.isoformat())
     
-    return f"Processed {len(messages)} messages"
+    return f"Queued digests for {len(user_ids)} users"
 
 
 @shared_task
-def send_daily_digest():
-    """Send daily digest emails (scaffold)."""
-    # TODO: Implement daily digest logic
-    pass
+def send_daily_digest_chunk(user_ids, since):
+    """Queue the daily digest for one chunk of users."""
+    queued = daily_digest_send(user_ids=user_ids, since=parse_datetime(since))
+    return f"Queued {queued} digests"
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.utils import timezone
+
+from apps.notifications.models import EmailDelivery, Notification
+from apps.notifications.services import daily_digest_send, notification_bulk_create
+
+
+def test_digest_is_queued_and_sent_by_the_email_worker(
+    user, other_user, project, django_capture_on_commit_callbacks
+):
+    notification_bulk_create(
+        recipients=[user],
+        notification_type=Notification.Type.ISSUE_COMMENTED,
+        title="Commented",
+        message="A comment was added.",
+        project=project,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        queued = daily_digest_send(
+            user_ids=[user.id, other_user.id], since=timezone.now() - timedelta(days=1)
+        )
+
+    assert queued == 1
+    delivery = EmailDelivery.objects.get()
+    assert delivery.to_email == user.email
+    assert delivery.notification is None
+    assert delivery.status == EmailDelivery.Status.SENT
+    assert [message.to for message in mail.outbox] == [[user.email]]
@@ -0,0 +1,56 @@
+from django.core import mail
+
+from apps.notifications import services
+from apps.notifications.models import EmailDelivery
+from apps.notifications.services import email_claim_batch, email_send_batch
+from common import cache as common_cache
+from common.cache import cache_rate_acquire
+
+
+class _Clock:
+    """Wall and monotonic time that only moves when something sleeps."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_rate_allows_rate_slots_per_second():
+    waits = [cache_rate_acquire("test:rate", rate=3, now=100.25) for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.0, 0.75]
+    assert cache_rate_acquire("test:rate", rate=3, now=101.0) == 0.0
+
+
+def test_fractional_rate_spreads_slots_over_longer_windows():
+    assert cache_rate_acquire("test:rate", rate=0.5, now=100.0) == 0.0
+    assert cache_rate_acquire("test:rate", rate=0.5, now=101.0) == 1.0
+    assert cache_rate_acquire("test:rate", rate=0.5, now=102.0) == 0.0
+
+
+def test_workers_share_the_email_rate(db, monkeypatch):
+    clock = _Clock(1000.0)
+    monkeypatch.setattr(common_cache, "time", clock)
+    monkeypatch.setattr(services, "time", clock)
+    EmailDelivery.objects.bulk_create([
+        EmailDelivery(to_email=f"user{n}@example.com", subject="Digest", body="Hello") for n in range(6)
+    ])
+
+    # Two workers, each sending half of the queue at "the same time"
+    first_worker = email_claim_batch(limit=3)
+    second_worker = email_claim_batch(limit=3)
+    email_send_batch(deliveries=first_worker, rate=2)
+    clock.now = 1000.0
+    email_send_batch(deliveries=second_worker, rate=2)
+
+    assert len(mail.outbox) == 6
+    # 2 per second in total: the second worker waits out the first's budget
+    assert clock.now == 1002.0
+    assert not EmailDelivery.objects.exclude(status=EmailDelivery.Status.SENT).exists()
@@ -0,0 +1,93 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+
+from apps.notifications.models import OutboxMessage
+from apps.notifications.services import outbox_create
+
+Status = OutboxMessage.Status
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="outbox_metrics uses percentile_cont and GROUPING SETS",
+)
+
+
+@pytest.fixture
+def staff_client(api_client, user):
+    user.is_staff = True
+    user.save(update_fields=["is_staff"])
+    return api_client
+
+
+@pytest.fixture
+def messages(db):
+    outbox_create(event_type="issue_assigned", payload={})
+    outbox_create(event_type="issue_commented", payload={})
+    processed = outbox_create(event_type="issue_commented", payload={})
+    OutboxMessage.objects.filter(pk=processed.pk).update(
+        status=Status.PROCESSED,
+        processed_at=F("created_at") + timedelta(seconds=2),
+        processing_ms=40,
+    )
+    dead = outbox_create(event_type="issue_state_changed", payload={})
+    OutboxMessage.objects.filter(pk=dead.pk).update(status=Status.FAILED, retry_count=9)
+
+
+def test_metrics_view_is_staff_only(api_client):
+    response = api_client.get(reverse("outbox-metrics"))
+
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("window", ["soon", "0", str(7 * 24 * 60 + 1)])
+def test_metrics_view_rejects_bad_windows(staff_client, window):
+    response = staff_client.get(reverse("outbox-metrics"), {"window": window})
+
+    assert response.status_code == 400
+
+
+@postgres_only
+def test_metrics_view_reports_backlog_and_latency(staff_client, messages):
+    response = staff_client.get(reverse("outbox-metrics"), {"window": 30})
+
+    assert response.status_code == 200
+    metrics = response.data
+    assert metrics["window_seconds"] == 1800
+    assert metrics["pending"]["total"] == 2
+    assert metrics["pending"]["by_event_type"] == {"issue_assigned": 1, "issue_commented": 1}
+    assert (metrics["created"], metrics["dead"]) == (4, 1)
+    assert metrics["failure_rate"] == pytest.approx(0.9)
+    assert metrics["retry_rate"] == pytest.approx(0.25)
+    assert metrics["latency_seconds"]["p50"] == pytest.approx(2.0)
+    assert metrics["handlers"]["issue_commented"]["handler_ms"]["max"] == 40
+
+
+@postgres_only
+def test_metrics_command_json(messages):
+    out = StringIO()
+
+    call_command("outbox_metrics", "--window", "30", "--json", stdout=out)
+
+    metrics = json.loads(out.getvalue())
+    assert metrics["pending"]["total"] == 2
+    assert list(metrics["handlers"]) == ["issue_commented"]
+
+
+@postgres_only
+def test_metrics_command_summary(messages):
+    out = StringIO()
+
+    call_command("outbox_metrics", stdout=out)
+
+    output = out.getvalue()
+    assert output.startswith("Pending: 2 ")
+    assert "created 4," in output
+    assert "1 dead" in output
+    assert "issue_commented" in output
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.issues.models import Watcher
+from apps.issues.services import issue_create, issue_update
+from apps.notifications.models import EmailDelivery, Notification, OutboxMessage
+from apps.notifications.services import (
+    outbox_claim_batch,
+    outbox_create,
+    outbox_mark_failed,
+    outbox_retry_delay,
+    process_outbox_message,
+)
+from apps.projects.services import project_add_member
+
+User = get_user_model()
+Status = OutboxMessage.Status
+
+
+def test_claim_leases_due_messages(db, settings):
+    due = outbox_create(event_type="issue_commented", payload={})
+    later = outbox_create(event_type="issue_commented", payload={})
+    OutboxMessage.objects.filter(pk=later.pk).update(available_at=timezone.now() + timedelta(minutes=5))
+
+    claimed = outbox_claim_batch()
+
+    assert [message.id for message in claimed] == [due.id]
+    due.refresh_from_db()
+    assert due.status == Status.PROCESSING
+    assert due.locked_until > timezone.now() + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS - 5)
+    # Leased messages are not claimed twice
+    assert outbox_claim_batch() == []
+
+
+def test_claim_reclaims_expired_leases(db):
+    message = outbox_create(event_type="issue_commented", payload={})
+    outbox_claim_batch()
+    # The worker holding the lease died
+    OutboxMessage.objects.filter(pk=message.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+    assert [claimed.id for claimed in outbox_claim_batch()] == [message.id]
+
+
+def test_retry_delay_doubles_up_to_the_cap(settings):
+    settings.OUTBOX_RETRY_BASE_SECONDS = 30
+    settings.OUTBOX_RETRY_MAX_SECONDS = 300
+
+    assert [outbox_retry_delay(retry_count=count) for count in range(6)] == [30, 60, 120, 240, 300, 300]
+
+
+def test_mark_failed_backs_off(db, settings):
+    settings.OUTBOX_RETRY_BASE_SECONDS = 30
+    message = outbox_create(event_type="issue_commented", payload={})
+    message.retry_count = 2
+    before = timezone.now()
+
+    outbox_mark_failed(message=message, error="boom")
+
+    message.refresh_from_db()
+    assert (message.status, message.retry_count, message.error_message) == (Status.PENDING, 3, "boom")
+    assert message.locked_until is None
+    assert before + timedelta(seconds=120) <= message.available_at <= timezone.now() + timedelta(seconds=120)
+
+
+def test_mark_failed_gives_up_after_max_retries(db, settings):
+    settings.OUTBOX_MAX_RETRIES = 3
+    message = outbox_create(event_type="issue_commented", payload={})
+    message.retry_count = 3
+
+    outbox_mark_failed(message=message, error="boom")
+
+    message.refresh_from_db()
+    assert (message.status, message.retry_count) == (Status.FAILED, 4)
+
+
+def test_failed_handler_leaves_nothing_behind(user, project):
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    # No author_id: the handler raises after nothing was written
+    message = outbox_create(event_type="issue_commented", payload={"issue_id": issue.id})
+
+    assert not process_outbox_message(message=message)
+
+    message.refresh_from_db()
+    assert (message.status, message.retry_count) == (Status.PENDING, 1)
+    assert "author_id" in message.error_message
+    assert not Notification.objects.exists()
+
+
+def test_assigned_notifies_the_assignee_of_the_message(user, other_user, project):
+    project_add_member(project=project, user=other_user)
+    issue = issue_create(project=project, title="Crash on start", reporter=user)
+    issue_update(issue=issue, actor=user, assignee=other_user)
+    # Reassigned before the first message is processed
+    issue_update(issue=issue, actor=other_user, assignee=user)
+
+    for message in OutboxMessage.objects.order_by("id"):
+        assert process_outbox_message(message=message)
+
+    assert list(
+        Notification.objects.order_by("id").values_list("recipient", "notification_type")
+    ) == [
+        (other_user.id, Notification.Type.ISSUE_ASSIGNED),
+        (user.id, Notification.Type.ISSUE_ASSIGNED),
+    ]
+
+
+def _comment_fan_out_queries(*, issue, author, watchers):
+    users = User.objects.bulk_create([
+        User(username=f"{issue.key}-watcher-{n}", email=f"{issue.key}-watcher-{n}@example.com")
+        for n in range(watchers)
+    ])
+    Watcher.objects.bulk_create([Watcher(issue=issue, user=watcher) for watcher in users])
+    message = outbox_create(
+        event_type="issue_commented", payload={"issue_id": issue.id, "author_id": author.id},
+    )
+
+    with CaptureQueriesContext(connection) as captured:
+        assert process_outbox_message(message=message)
+    return [query["sql"] for query in captured.captured_queries]
+
+
+def test_comment_fan_out_queries_do_not_grow_with_watchers(user, project):
+    small = issue_create(project=project, title="Crash on start", reporter=user)
+    large = issue_create(project=project, title="Slow search", reporter=user)
+
+    few = _comment_fan_out_queries(issue=small, author=user, watchers=3)
+    many = _comment_fan_out_queries(issue=large, author=user, watchers=300)
+
+    assert Notification.objects.filter(issue=large).count() == 300
+    assert EmailDelivery.objects.filter(notification__issue=large).count() == 300
+
+    def without_inserts(queries):
+        return [sql for sql in queries if not sql.startswith("INSERT")]
+
+    assert len(without_inserts(many)) == len(without_inserts(few))
+    if connection.vendor == "postgresql":
+        # SQLite splits bulk inserts by its parameter limit
+        assert len(many) == len(few)
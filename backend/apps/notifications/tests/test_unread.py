@@ -0,0 +1,101 @@
+from django.core.management import call_command
+
+from apps.issues.services import issue_create, issue_delete
+from apps.notifications.models import Notification, NotificationState
+from apps.notifications.selectors import notification_unread_count
+from apps.notifications.services import (
+    notification_bulk_create,
+    notification_mark_all_read,
+    notification_mark_read,
+    notification_unread_recount,
+)
+from apps.projects.services import project_delete
+
+
+def _notify(recipients, *, issue=None, project=None, times=1):
+    created = []
+    for _ in range(times):
+        created += notification_bulk_create(
+            recipients=recipients,
+            notification_type=Notification.Type.ISSUE_COMMENTED,
+            title="Commented",
+            message="A comment was added.",
+            project=project,
+            issue=issue,
+        )
+    return created
+
+
+def test_bulk_create_counts_each_recipient(user, other_user, project):
+    _notify([user, other_user, user])
+
+    assert notification_unread_count(user=user) == 2
+    assert notification_unread_count(user=other_user) == 1
+
+
+def test_mark_read_decrements_once(user, project):
+    first, _ = _notify([user], times=2)
+
+    notification_mark_read(notification=first)
+    notification_mark_read(notification=Notification.objects.get(id=first.id))
+
+    assert notification_unread_count(user=user) == 1
+    assert notification_unread_recount(user=user) == 1
+
+
+def test_mark_read_below_watermark_keeps_counter(user, project):
+    first, = _notify([user])
+    notification_mark_all_read(user=user)
+    _notify([user])
+
+    notification_mark_read(notification=first)
+
+    assert notification_unread_count(user=user) == 1
+
+
+def test_issue_delete_releases_unread(user, other_user, project):
+    issue = issue_create(project=project, title="Broken login", reporter=user)
+    kept = issue_create(project=project, title="Slow search", reporter=user)
+    read, _ = _notify([user, other_user], issue=issue)
+    _notify([user], issue=kept)
+    notification_mark_read(notification=read)
+
+    issue_delete(issue=issue, actor=user)
+
+    assert notification_unread_count(user=user) == 1
+    assert notification_unread_count(user=other_user) == 0
+    assert notification_unread_recount(user=user) == 1
+
+
+def test_issue_delete_ignores_notifications_below_watermark(user, project):
+    issue = issue_create(project=project, title="Broken login", reporter=user)
+    _notify([user], issue=issue)
+    notification_mark_all_read(user=user)
+    _notify([user])
+
+    issue_delete(issue=issue, actor=user)
+
+    assert notification_unread_count(user=user) == 1
+
+
+def test_project_delete_releases_unread(user, other_user, project):
+    issue = issue_create(project=project, title="Broken login", reporter=user)
+    _notify([user, other_user], issue=issue)
+    _notify([other_user], project=project)
+    _notify([other_user])
+
+    project_delete(project=project)
+
+    assert notification_unread_count(user=user) == 0
+    assert notification_unread_count(user=other_user) == 1
+    assert notification_unread_recount(user=other_user) == 1
+
+
+def test_recount_command_repairs_drift(user, project, capsys):
+    _notify([user], times=3)
+    NotificationState.objects.filter(user=user).update(unread_count=7)
+
+    call_command("recount_unread_notifications")
+
+    assert notification_unread_count(user=user) == 3
+    assert "Corrected 1" in capsys.readouterr().out
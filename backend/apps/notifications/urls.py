@@ -8,6 +8,7 @@ from apps.notifications.views import (
     NotificationListView,
     notification_mark_all_read_view,
     notification_unread_count_view,
+    outbox_metrics_view,
 )
 
 urlpatterns = [
@@ -15,4 +16,5 @@ urlpatterns = [
     path("notifications/unread-count/", notification_unread_count_view, name="notification-unread-count"),
     path("notifications/mark-all-read/", notification_mark_all_read_view, name="notification-mark-all-read"),
     path("notifications/<int:pk>/", NotificationDetailView.as_view(), name="notification-detail"),
+    path("notifications/outbox/metrics/", outbox_metrics_view, name="outbox-metrics"),
 ]
@@ -3,17 +3,19 @@ Notification views.
 """
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from apps.notifications.models import Notification
 from apps.notifications.serializers import NotificationSerializer
+from common.exceptions import BadRequest
+from common.pagination import CursorOptInPagination
 
 
 class NotificationListView(generics.ListAPIView):
     """List notifications for current user."""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CursorOptInPagination
 
     def get_queryset(self):
         from apps.notifications.selectors import notification_list
@@ -31,7 +33,8 @@ class NotificationDetailView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        from apps.notifications.selectors import notification_list
+        return notification_list(user=self.request.user)
 
     def perform_update(self, serializer):
         from apps.notifications.services import notification_mark_read
@@ -55,3 +58,20 @@ def notification_mark_all_read_view(request):
     from apps.notifications.services import notification_mark_all_read
     count = notification_mark_all_read(user=request.user)
     return Response({"marked_read": count})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def outbox_metrics_view(request):
+    """Outbox backlog, latency and failure metrics (staff only)."""
+    from datetime import timedelta
+
+    from apps.notifications.selectors import outbox_metrics
+    
+    try:
+        window = int(request.query_params.get("window", 60))
+    except ValueError:
+        raise BadRequest("window must be a number of minutes.")
+    if not 1 <= window <= 7 * 24 * 60:
+        raise BadRequest("window must be between 1 minute and 7 days.")
+    return Response(outbox_metrics(window=timedelta(minutes=window)))
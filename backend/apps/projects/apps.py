@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ProjectsConfig(AppConfig):
+    name = "apps.projects"
+
+    def ready(self):
+        from apps.projects import signals  # noqa: F401
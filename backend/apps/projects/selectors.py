@@ -2,7 +2,7 @@
 Project selectors.
 """
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch, Q, QuerySet
+from django.db.models import Count, Prefetch, Q, QuerySet
 
 from apps.projects.models import (
     Board,
@@ -14,6 +14,7 @@ from apps.projects.models import (
     WorkflowState,
     WorkflowTransition,
 )
+from apps.projects.workflow_graph import workflow_graph_get
 
 User = get_user_model()
 
@@ -69,8 +70,11 @@ def sprint_get_by_id(*, sprint_id: int) -> Sprint:
 
 
 def epic_list(*, project: Project) -> QuerySet:
-    """Get all epics for a project."""
-    return Epic.objects.filter(project=project)
+    """Get all epics for a project with their issue counts."""
+    # Meta.ordering does not apply to aggregate queries
+    return Epic.objects.filter(project=project).annotate(
+        issue_count=Count("issues")
+    ).order_by("created_at")
 
 
 def epic_get_by_id(*, epic_id: int) -> Epic:
@@ -94,7 +98,7 @@ def workflow_state_list(*, workflow: Workflow) -> QuerySet:
 
 def workflow_get_initial_state(*, workflow: Workflow) -> WorkflowState:
     """Get initial state of a workflow."""
-    return WorkflowState.objects.get(workflow=workflow, is_initial=True)
+    return workflow_graph_get(workflow_id=workflow.id).initial_state
 
 
 def workflow_get_allowed_transitions(*, from_state: WorkflowState) -> QuerySet:
@@ -106,7 +110,5 @@ def workflow_get_allowed_transitions(*, from_state: WorkflowState) -> QuerySet:
 
 def workflow_can_transition(*, from_state: WorkflowState, to_state: WorkflowState) -> bool:
     """Check if transition is allowed."""
-    return WorkflowTransition.objects.filter(
-        from_state=from_state,
-        to_state=to_state
-    ).exists()
+    graph = workflow_graph_get(workflow_id=from_state.workflow_id)
+    return graph.can_transition(from_state.id, to_state.id)
@@ -134,6 +134,9 @@ class EpicSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def get_issue_count(self, obj):
+        # Annotated by epic_list; epics just created are counted here
+        if hasattr(obj, "issue_count"):
+            return obj.issue_count
         return obj.issues.count()
 
     def create(self, validated_data):
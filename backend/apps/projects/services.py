@@ -4,6 +4,9 @@ Project services.
 from django.contrib.auth import get_user_model
 from django.db import transaction
 
+from apps.issues.services import project_issues_delete
+from apps.notifications.models import Notification
+from apps.notifications.services import notification_unread_release
 from apps.projects.models import (
     Board,
     Epic,
@@ -14,6 +17,7 @@ from apps.projects.models import (
     WorkflowState,
     WorkflowTransition,
 )
+from common.permissions import project_roles_invalidate
 
 User = get_user_model()
 
@@ -42,6 +46,7 @@ def project_create(
         user=owner,
         role=ProjectMembership.Role.OWNER,
     )
+    transaction.on_commit(lambda: project_roles_invalidate(user_id=owner.id))
     
     # Create default workflow
     workflow = Workflow.objects.create(
@@ -118,6 +123,9 @@ def project_update(*, project: Project, **data) -> Project:
 @transaction.atomic
 def project_delete(*, project: Project) -> None:
     """Delete a project."""
+    # Issues protect their workflow states, so they go before the workflow
+    project_issues_delete(project=project)
+    notification_unread_release(notifications=Notification.objects.filter(project=project))
     project.delete()
 
 
@@ -137,6 +145,9 @@ def project_add_member(
     if not created:
         membership.role = role
         membership.save()
+    
+    # Cached roles are only dropped once the change is visible to readers
+    transaction.on_commit(lambda: project_roles_invalidate(user_id=user.id))
     return membership
 
 
@@ -144,6 +155,7 @@ def project_add_member(
 def project_remove_member(*, project: Project, user: User) -> None:
     """Remove a member from project."""
     ProjectMembership.objects.filter(project=project, user=user).delete()
+    transaction.on_commit(lambda: project_roles_invalidate(user_id=user.id))
 
 
 @transaction.atomic
@@ -253,13 +265,14 @@ def workflow_state_create(
         # Ensure only one initial state
         WorkflowState.objects.filter(workflow=workflow, is_initial=True).update(is_initial=False)
     
-    return WorkflowState.objects.create(
+    state = WorkflowState.objects.create(
         workflow=workflow,
         name=name,
         category=category,
         order=order,
         is_initial=is_initial,
     )
+    return state
 
 
 @transaction.atomic
@@ -271,9 +284,10 @@ def workflow_transition_create(
     name: str = "",
 ) -> WorkflowTransition:
     """Create a new workflow transition."""
-    return WorkflowTransition.objects.create(
+    transition = WorkflowTransition.objects.create(
         workflow=workflow,
         from_state=from_state,
         to_state=to_state,
         name=name,
     )
+    return transition
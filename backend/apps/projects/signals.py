@@ -0,0 +1,25 @@
+"""
+Project signal receivers.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.projects.models import WorkflowState, WorkflowTransition
+from apps.projects.workflow_graph import workflow_graph_invalidate
+
+
+@receiver(post_save, sender=WorkflowState)
+@receiver(post_delete, sender=WorkflowState)
+@receiver(post_save, sender=WorkflowTransition)
+@receiver(post_delete, sender=WorkflowTransition)
+def workflow_changed(sender, instance, **kwargs):
+    """
+    Bump the workflow's cached graph on every state or transition change.
+
+    Receivers rather than service calls, so admin and inline edits are
+    covered too. The bump waits for commit so readers rebuild from the
+    new rows.
+    """
+    workflow_id = instance.workflow_id
+    transaction.on_commit(lambda: workflow_graph_invalidate(workflow_id=workflow_id))
@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+
+from apps.issues.services import issue_create
+from apps.projects.models import Board, ProjectMembership
+from apps.projects.services import board_create, epic_create, project_add_member
+
+# Query counts must not depend on how many rows a page shows
+SIZES = [1, 3]
+
+
+def _get(api_client, url, django_assert_num_queries, queries):
+    # The first request caches the user's project roles
+    api_client.get(url)
+    with django_assert_num_queries(queries):
+        response = api_client.get(url)
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_member_list_queries(api_client, project, django_user_model, size, django_assert_num_queries):
+    for n in range(size):
+        member = django_user_model.objects.create_user(
+            username=f"member{n}", email=f"member{n}@example.com", password="password"
+        )
+        project_add_member(project=project, user=member, role=ProjectMembership.Role.MEMBER)
+
+    # project, memberships with users
+    _get(api_client, reverse("project-member-list", kwargs={"project_id": project.id}), django_assert_num_queries, 2)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_board_list_queries(api_client, project, size, django_assert_num_queries):
+    for n in range(size):
+        board_create(project=project, name=f"Board {n}", board_type=Board.BoardType.KANBAN)
+
+    # project, count, boards
+    _get(api_client, reverse("board-list", kwargs={"project_id": project.id}), django_assert_num_queries, 3)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_epic_list_queries(api_client, user, project, size, django_assert_num_queries):
+    for n in range(size):
+        epic = epic_create(project=project, name=f"Epic {n}")
+        issue_create(project=project, title=f"Story {n}", reporter=user, epic=epic)
+
+    # project, count, epics with issue counts
+    response = _get(
+        api_client, reverse("epic-list", kwargs={"project_id": project.id}), django_assert_num_queries, 3
+    )
+    assert [epic["issue_count"] for epic in response.data["results"]] == [1] * size
+
+
+def test_epic_detail_queries(api_client, project, django_assert_num_queries):
+    epic = epic_create(project=project, name="Onboarding")
+    url = reverse("epic-detail", kwargs={"project_id": project.id, "pk": epic.id})
+
+    # project, epic with its issue count
+    _get(api_client, url, django_assert_num_queries, 2)
@@ -0,0 +1,47 @@
+from apps.projects.models import WorkflowTransition
+from apps.projects.workflow_graph import workflow_graph_get
+
+
+def _states(project):
+    states = {state.name: state for state in project.workflow.states.all()}
+    return states["To Do"], states["In Progress"], states["Done"]
+
+
+def test_model_edits_invalidate_the_graph(project, django_capture_on_commit_callbacks):
+    workflow = project.workflow
+    todo, in_progress, done = _states(project)
+    assert workflow_graph_get(workflow_id=workflow.id).can_transition(todo.id, in_progress.id)
+
+    # Admin and inline edits save models directly instead of using services
+    with django_capture_on_commit_callbacks(execute=True):
+        WorkflowTransition.objects.filter(workflow=workflow, from_state=todo, to_state=in_progress).delete()
+        transition = WorkflowTransition.objects.create(workflow=workflow, from_state=done, to_state=todo)
+    graph = workflow_graph_get(workflow_id=workflow.id)
+
+    assert not graph.can_transition(todo.id, in_progress.id)
+    assert graph.can_transition(done.id, todo.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        transition.delete()
+
+    assert not workflow_graph_get(workflow_id=workflow.id).can_transition(done.id, todo.id)
+
+
+def test_state_rename_reaches_the_graph(project, django_capture_on_commit_callbacks):
+    workflow = project.workflow
+    todo, _, _ = _states(project)
+    workflow_graph_get(workflow_id=workflow.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        todo.name = "Backlog"
+        todo.save()
+
+    assert workflow_graph_get(workflow_id=workflow.id).states[todo.id].name == "Backlog"
+
+
+def test_graph_is_reused_while_unchanged(project, django_assert_num_queries):
+    workflow_id = project.workflow.id
+    first = workflow_graph_get(workflow_id=workflow_id)
+
+    with django_assert_num_queries(0):
+        assert workflow_graph_get(workflow_id=workflow_id) is first
@@ -17,6 +17,7 @@ from apps.projects.serializers import (
     SprintSerializer,
     WorkflowSerializer,
 )
+from common.mixins import ProjectLookupMixin
 from common.permissions import IsProjectMember, IsProjectAdmin
 
 
@@ -44,7 +45,7 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
         return project_list(user=self.request.user)
 
 
-class ProjectMemberListView(generics.ListCreateAPIView):
+class ProjectMemberListView(ProjectLookupMixin, generics.ListCreateAPIView):
     """List and add project members."""
     serializer_class = ProjectMembershipSerializer
     permission_classes = [IsAuthenticated, IsProjectMember]
@@ -55,11 +56,10 @@ class ProjectMemberListView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         from apps.projects.services import project_add_member
-        from apps.projects.selectors import project_get_by_id
         from django.contrib.auth import get_user_model
         
         User = get_user_model()
-        project = project_get_by_id(project_id=self.kwargs["project_id"])
+        project = self.get_project()
         user = User.objects.get(id=serializer.validated_data["user_id"])
         role = serializer.validated_data.get("role", ProjectMembership.Role.MEMBER)
         
@@ -75,25 +75,29 @@ class ProjectMemberDetailView(generics.RetrieveUpdateDestroyAPIView):
         project_id = self.kwargs["project_id"]
         return ProjectMembership.objects.filter(project_id=project_id).select_related("user")
 
+    def perform_update(self, serializer):
+        from apps.projects.services import project_add_member
+        instance = serializer.instance
+        role = serializer.validated_data.get("role", instance.role)
+        serializer.instance = project_add_member(project=instance.project, user=instance.user, role=role)
+
     def perform_destroy(self, instance):
         from apps.projects.services import project_remove_member
         project_remove_member(project=instance.project, user=instance.user)
 
 
-class BoardListCreateView(generics.ListCreateAPIView):
+class BoardListCreateView(ProjectLookupMixin, generics.ListCreateAPIView):
     """List and create boards for a project."""
     serializer_class = BoardSerializer
     permission_classes = [IsAuthenticated, IsProjectMember]
 
     def get_queryset(self):
-        from apps.projects.selectors import board_list, project_get_by_id
-        project = project_get_by_id(project_id=self.kwargs["project_id"])
-        return board_list(project=project)
+        from apps.projects.selectors import board_list
+        return board_list(project=self.get_project())
 
     def get_serializer_context(self):
-        from apps.projects.selectors import project_get_by_id
         context = super().get_serializer_context()
-        context["project"] = project_get_by_id(project_id=self.kwargs["project_id"])
+        context["project"] = self.get_project()
         return context
 
 
@@ -152,32 +156,29 @@ def sprint_close_view(request, board_id, sprint_id):
     return Response(serializer.data)
 
 
-class EpicListCreateView(generics.ListCreateAPIView):
+class EpicListCreateView(ProjectLookupMixin, generics.ListCreateAPIView):
     """List and create epics."""
     serializer_class = EpicSerializer
     permission_classes = [IsAuthenticated, IsProjectMember]
 
     def get_queryset(self):
-        from apps.projects.selectors import epic_list, project_get_by_id
-        project = project_get_by_id(project_id=self.kwargs["project_id"])
-        return epic_list(project=project)
+        from apps.projects.selectors import epic_list
+        return epic_list(project=self.get_project())
 
     def get_serializer_context(self):
-        from apps.projects.selectors import project_get_by_id
         context = super().get_serializer_context()
-        context["project"] = project_get_by_id(project_id=self.kwargs["project_id"])
+        context["project"] = self.get_project()
         return context
 
 
-class EpicDetailView(generics.RetrieveUpdateDestroyAPIView):
+class EpicDetailView(ProjectLookupMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, or delete an epic."""
     serializer_class = EpicSerializer
     permission_classes = [IsAuthenticated, IsProjectMember]
 
     def get_queryset(self):
-        from apps.projects.selectors import epic_list, project_get_by_id
-        project = project_get_by_id(project_id=self.kwargs["project_id"])
-        return epic_list(project=project)
+        from apps.projects.selectors import epic_list
+        return epic_list(project=self.get_project())
 
 
 @api_view(["GET"])
@@ -0,0 +1,91 @@
+"""
+Compiled workflow transition graphs.
+
+A graph holds a workflow's states, its initial state and the allowed next
+states of each state. Graphs are cached in-process and in the Django cache
+under a per-workflow version that is bumped whenever a state or transition
+is saved or deleted (see apps.projects.signals), so transition checks never
+touch the database.
+"""
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+
+from apps.projects.models import WorkflowState, WorkflowTransition
+from common.cache import cache_version_bump, cache_version_get
+
+CACHE_TIMEOUT = 60 * 60
+VERSION_KEY = "workflow_graph:{workflow_id}:version"
+GRAPH_KEY = "workflow_graph:{workflow_id}:v{version}"
+
+_local_graphs = {}
+
+
+@dataclass
+class WorkflowGraph:
+    """Immutable snapshot of a workflow's states and transitions."""
+    workflow_id: int
+    version: int
+    states: dict = field(default_factory=dict)
+    adjacency: dict = field(default_factory=dict)
+    initial_state_id: int = None
+
+    @property
+    def initial_state(self) -> WorkflowState:
+        if self.initial_state_id is None:
+            raise WorkflowState.DoesNotExist(f"Workflow {self.workflow_id} has no initial state.")
+        return self.states[self.initial_state_id]
+
+    def can_transition(self, from_state_id: int, to_state_id: int) -> bool:
+        return to_state_id in self.adjacency.get(from_state_id, ())
+
+    def allowed_next_states(self, from_state_id: int) -> list:
+        """Allowed target states of a state, in workflow order."""
+        return sorted(
+            (self.states[state_id] for state_id in self.adjacency.get(from_state_id, ())),
+            key=lambda state: (state.order, state.id),
+        )
+
+
+def workflow_graph_get(*, workflow_id: int) -> WorkflowGraph:
+    """Get the current compiled graph of a workflow."""
+    version = cache_version_get(VERSION_KEY.format(workflow_id=workflow_id))
+    if version is None:
+        # No usable shared cache (e.g. DummyCache): never trust a stale copy
+        return _build_graph(workflow_id=workflow_id, version=0)
+
+    graph = _local_graphs.get(workflow_id)
+    if graph is not None and graph.version == version:
+        return graph
+
+    key = GRAPH_KEY.format(workflow_id=workflow_id, version=version)
+    graph = cache.get(key)
+    if graph is None:
+        graph = _build_graph(workflow_id=workflow_id, version=version)
+        cache.set(key, graph, CACHE_TIMEOUT)
+
+    _local_graphs[workflow_id] = graph
+    return graph
+
+
+def workflow_graph_invalidate(*, workflow_id: int) -> None:
+    """Bump a workflow's graph version so every process rebuilds it."""
+    cache_version_bump(VERSION_KEY.format(workflow_id=workflow_id))
+
+
+def _build_graph(*, workflow_id: int, version: int) -> WorkflowGraph:
+    states = {state.id: state for state in WorkflowState.objects.filter(workflow_id=workflow_id)}
+    adjacency = {}
+    for from_id, to_id in WorkflowTransition.objects.filter(
+        workflow_id=workflow_id
+    ).values_list("from_state_id", "to_state_id"):
+        adjacency.setdefault(from_id, set()).add(to_id)
+
+    initial = next((state.id for state in states.values() if state.is_initial), None)
+    return WorkflowGraph(
+        workflow_id=workflow_id,
+        version=version,
+        states=states,
+        adjacency={state_id: frozenset(targets) for state_id, targets in adjacency.items()},
+        initial_state_id=initial,
+    )
@@ -0,0 +1,66 @@
+"""
+Versioned cache keys and shared rate limits.
+
+Cached values are stored under a key that embeds a version number kept in
+the cache itself. Bumping the version makes every process miss on the old
+entries without having to know or delete them.
+
+Rate limits count in the cache too, so every process shares one budget.
+"""
+import math
+import time
+from typing import Optional
+
+from django.core.cache import cache
+
+
+def cache_version_get(key: str) -> Optional[int]:
+    """Get the current version stored at `key`, creating it if missing.
+
+    Returns None when the cache does not keep values (e.g. DummyCache), in
+    which case callers must not trust any cached copy.
+    """
+    version = cache.get(key)
+    if version is None:
+        # A fresh, time-based version so an evicted key can never resurrect
+        # values cached under an older version number
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def cache_version_bump(key: str) -> None:
+    """Move the version stored at `key` forward."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def _new_version() -> int:
+    return int(time.time() * 1000)
+
+
+def cache_rate_acquire(key: str, *, rate: float, now: Optional[float] = None) -> float:
+    """
+    Take one slot of a `rate` per second budget shared by every process.
+
+    Slots are counted per fixed window of max(1, 1 / rate) seconds with an
+    atomic increment. Returns 0.0 when a slot was taken, otherwise the
+    seconds until the next window opens. A cache that does not keep values
+    (e.g. DummyCache) cannot count, so it never limits.
+    """
+    now = time.time() if now is None else now
+    window = max(1.0, 1.0 / rate)
+    allowance = max(1, int(rate * window))
+    index = int(now // window)
+    counter_key = f"{key}:{index}"
+
+    cache.add(counter_key, 0, math.ceil(window) + 1)
+    try:
+        taken = cache.incr(counter_key)
+    except ValueError:
+        return 0.0
+    if taken <= allowance:
+        return 0.0
+    return (index + 1) * window - now
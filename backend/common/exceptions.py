@@ -24,6 +24,12 @@ class Forbidden(APIException):
     default_code = "forbidden"
 
 
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The request conflicts with the current state of the resource."
+    default_code = "conflict"
+
+
 def custom_exception_handler(exc, context):
     """Custom exception handler for DRF."""
     response = drf_exception_handler(exc, context)
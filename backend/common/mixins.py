@@ -0,0 +1,42 @@
+"""
+View mixins.
+"""
+from common.exceptions import NotFound
+
+
+class ProjectLookupMixin:
+    """Resolve the URL's project once per request and reuse the instance."""
+
+    def get_project(self):
+        if not hasattr(self, "_project"):
+            from apps.projects.models import Project
+            from apps.projects.selectors import project_get_by_id
+
+            try:
+                self._project = project_get_by_id(project_id=self.kwargs["project_id"])
+            except Project.DoesNotExist:
+                raise NotFound("Project not found.")
+        return self._project
+
+
+class IssueLookupMixin(ProjectLookupMixin):
+    """Resolve the URL's issue once per request, scoped to the URL's project."""
+    # Set to True when the view needs the issue's watchers, attachments and subtasks
+    issue_prefetch_related = False
+
+    def get_issue(self):
+        if not hasattr(self, "_issue"):
+            from apps.issues.models import Issue
+            from apps.issues.selectors import issue_get_by_key
+
+            try:
+                issue = issue_get_by_key(
+                    key=self.kwargs["issue_key"],
+                    prefetch=self.issue_prefetch_related,
+                )
+            except Issue.DoesNotExist:
+                raise NotFound("Issue not found.")
+            if issue.project_id != int(self.kwargs["project_id"]):
+                raise NotFound("Issue not found.")
+            self._issue = issue
+        return self._issue
@@ -1,7 +1,15 @@
 """
 Custom pagination classes.
 """
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -16,3 +24,143 @@ class LargeResultsSetPagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = "page_size"
     max_page_size = 200
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first cursor pagination keyed on (created_at, id).
+
+    Each page is a `(created_at, id) < cursor` range condition, so Postgres
+    serves it from a (..., -created_at, -id) index without COUNT(*) or
+    OFFSET. Only forward paging is supported and any other ordering on the
+    queryset is replaced.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = self.filter_after(queryset, position)
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def filter_after(self, queryset, position):
+        """Restrict `queryset` to rows after the cursor position."""
+        table = queryset.model._meta.db_table
+        # Row comparison keeps the predicate a single index range condition;
+        # the redundant bound on created_at lets Postgres prune newer
+        # partitions of time-partitioned tables
+        return queryset.extra(
+            where=[
+                f'("{table}"."created_at", "{table}"."id") < (%s, %s)',
+                f'"{table}"."created_at" <= %s',
+            ],
+            params=[*position, position[0]],
+        )
+
+    def get_cursor_values(self, obj) -> tuple:
+        """Cursor values identifying `obj`'s position."""
+        return (obj.created_at.isoformat(), obj.id)
+
+    def parse_cursor_values(self, values: list) -> tuple:
+        """Turn decoded cursor values back into a position; raise ValueError if invalid."""
+        created_at, pk = values
+        position = (parse_datetime(created_at), int(pk))
+        if position[0] is None:
+            raise ValueError(created_at)
+        return position
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(*self.get_cursor_values(self.page[-1])),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def encode_cursor(self, *values) -> str:
+        raw = "|".join(str(value) for value in values).encode()
+        return urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = urlsafe_b64decode(encoded.encode()).decode().split("|")
+            return self.parse_cursor_values(values)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class SearchRankPagination(KeysetPagination):
+    """Cursor pagination for ranked search results, keyed on (rank, id)."""
+    ordering = ("-rank", "-id")
+
+    def filter_after(self, queryset, position):
+        rank, pk = position
+        return queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk))
+
+    def get_cursor_values(self, obj) -> tuple:
+        # repr() round-trips the float exactly
+        return (repr(obj.rank), obj.id)
+
+    def parse_cursor_values(self, values: list) -> tuple:
+        rank, pk = values
+        return (float(rank), int(pk))
+
+
+class CursorOptInPagination(StandardResultsSetPagination):
+    """
+    Page-number pagination that switches to KeysetPagination when the client
+    sends a `cursor` query parameter (an empty value requests the first page).
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,17 @@
+"""
+Custom parsers.
+"""
+from rest_framework.parsers import BaseParser
+
+
+class OctetStreamParser(BaseParser):
+    """
+    Hand the raw request body to the view as a stream.
+
+    Nothing is read up front, so views can copy large bodies to storage
+    without holding them in memory.
+    """
+    media_type = "application/octet-stream"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
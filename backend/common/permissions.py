@@ -1,9 +1,82 @@
 """
 Custom permissions.
 """
+from typing import Optional
+
+from django.core.cache import cache
 from rest_framework import permissions
 
 from apps.projects.models import ProjectMembership
+from common.cache import cache_version_bump, cache_version_get
+
+MEMBERSHIP_CACHE_TIMEOUT = 5 * 60
+MEMBERSHIP_VERSION_KEY = "project_roles:{user_id}:version"
+MEMBERSHIP_ROLES_KEY = "project_roles:{user_id}:v{version}"
+
+ADMIN_ROLES = {ProjectMembership.Role.OWNER, ProjectMembership.Role.ADMIN}
+
+
+def get_project_role(request, project_id) -> Optional[str]:
+    """
+    Get the requesting user's role in a project, or None if not a member.
+
+    All of the user's roles are loaded in one query, memoized on the request
+    and shared across requests through the cache until their membership
+    version is bumped.
+    """
+    return _request_project_roles(request).get(int(project_id))
+
+
+def get_member_project_ids(request) -> list:
+    """Get the ids of every project the requesting user is a member of."""
+    return sorted(_request_project_roles(request))
+
+
+def project_roles_invalidate(*, user_id: int) -> None:
+    """Drop cached project roles for a user after their memberships change."""
+    cache_version_bump(MEMBERSHIP_VERSION_KEY.format(user_id=user_id))
+
+
+def _request_project_roles(request) -> dict:
+    user = request.user
+    if not user or not user.is_authenticated:
+        return {}
+
+    roles = getattr(request, "_project_roles", None)
+    if roles is None:
+        roles = _load_project_roles(user_id=user.id)
+        request._project_roles = roles
+    return roles
+
+
+def _load_project_roles(*, user_id: int) -> dict:
+    version = cache_version_get(MEMBERSHIP_VERSION_KEY.format(user_id=user_id))
+    if version is None:
+        return _query_project_roles(user_id=user_id)
+
+    key = MEMBERSHIP_ROLES_KEY.format(user_id=user_id, version=version)
+    roles = cache.get(key)
+    if roles is None:
+        roles = _query_project_roles(user_id=user_id)
+        cache.set(key, roles, MEMBERSHIP_CACHE_TIMEOUT)
+    return roles
+
+
+def _query_project_roles(*, user_id: int) -> dict:
+    return dict(
+        ProjectMembership.objects.filter(user_id=user_id).values_list("project_id", "role")
+    )
+
+
+def _object_project_id(obj) -> int:
+    """Resolve the project id an object belongs to."""
+    if hasattr(obj, "project_id"):
+        return obj.project_id
+    if hasattr(obj, "board"):
+        return obj.board.project_id
+    if hasattr(obj, "issue"):
+        return obj.issue.project_id
+    return obj.id
 
 
 class IsProjectMember(permissions.BasePermission):
@@ -13,27 +86,11 @@ class IsProjectMember(permissions.BasePermission):
         project_id = view.kwargs.get("project_id")
         if not project_id:
             return True
-        
-        return ProjectMembership.objects.filter(
-            project_id=project_id,
-            user=request.user
-        ).exists()
+
+        return get_project_role(request, project_id) is not None
 
     def has_object_permission(self, request, view, obj):
-        # Handle different object types
-        if hasattr(obj, "project"):
-            project = obj.project
-        elif hasattr(obj, "board"):
-            project = obj.board.project
-        elif hasattr(obj, "issue"):
-            project = obj.issue.project
-        else:
-            project = obj
-        
-        return ProjectMembership.objects.filter(
-            project=project,
-            user=request.user
-        ).exists()
+        return get_project_role(request, _object_project_id(obj)) is not None
 
 
 class IsProjectAdmin(permissions.BasePermission):
@@ -43,24 +100,12 @@ class IsProjectAdmin(permissions.BasePermission):
         project_id = view.kwargs.get("project_id")
         if not project_id:
             return True
-        
-        return ProjectMembership.objects.filter(
-            project_id=project_id,
-            user=request.user,
-            role__in=[ProjectMembership.Role.OWNER, ProjectMembership.Role.ADMIN]
-        ).exists()
+
+        return get_project_role(request, project_id) in ADMIN_ROLES
 
     def has_object_permission(self, request, view, obj):
-        if hasattr(obj, "project"):
-            project = obj.project
-        else:
-            project = obj
-        
-        return ProjectMembership.objects.filter(
-            project=project,
-            user=request.user,
-            role__in=[ProjectMembership.Role.OWNER, ProjectMembership.Role.ADMIN]
-        ).exists()
+        project_id = obj.project_id if hasattr(obj, "project_id") else obj.id
+        return get_project_role(request, project_id) in ADMIN_ROLES
 
 
 class IsProjectOwner(permissions.BasePermission):
@@ -71,5 +116,5 @@ class IsProjectOwner(permissions.BasePermission):
             project = obj.project
         else:
             project = obj
-        
+
         return project.owner == request.user
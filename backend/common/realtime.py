@@ -0,0 +1,220 @@
+"""
+Real-time change fan-out.
+
+Services publish compact change messages to named channels (``project:<id>``,
+``issue:<id>``) once their transaction commits; streaming views subscribe to
+those channels. Messages travel through Redis pub/sub so every web worker
+sees them. ``REALTIME_BROKER_URL = "memory://"`` swaps in an in-process
+broker for tests and single-process development.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BROKER_URL = "memory://"
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def project_channel(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+def issue_channel(issue_id: int) -> str:
+    return f"issue:{issue_id}"
+
+
+def get_broker():
+    """Get the process-wide broker configured by REALTIME_BROKER_URL."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                url = settings.REALTIME_BROKER_URL
+                _broker = InMemoryBroker() if url == MEMORY_BROKER_URL else RedisBroker(url)
+    return _broker
+
+
+def publish(channels: list, message: dict) -> None:
+    """
+    Publish `message` to `channels`.
+
+    Delivery is best effort: a broker outage is logged and never fails the
+    request that produced the change.
+    """
+    try:
+        get_broker().publish(channels, message)
+    except Exception:
+        logger.warning("Failed to publish %s to %s", message.get("type"), channels, exc_info=True)
+
+
+class RedisBroker:
+    """
+    Redis pub/sub broker; publishing is sync, subscribing is asyncio.
+
+    Subscribers share one pub/sub connection per process: it is subscribed
+    to the union of their channels and a reader task fans each message out
+    to the local subscriptions, so SSE clients do not cost a Redis
+    connection each.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+        self.local = InMemoryBroker()
+        self.listener = None
+
+    def publish(self, channels: list, message: dict) -> None:
+        payload = json.dumps(message)
+        pipe = self.client.pipeline(transaction=False)
+        for channel in channels:
+            pipe.publish(channel, payload)
+        pipe.execute()
+
+    async def subscribe(self, channels: list) -> "RedisSubscription":
+        listener = self._get_listener()
+        async with listener.lock:
+            new_channels = [channel for channel in channels if channel not in self.local.subscriptions]
+            subscription = await self.local.subscribe(channels)
+            if new_channels:
+                await listener.pubsub.subscribe(*new_channels)
+            listener.start()
+        return RedisSubscription(self, subscription)
+
+    async def unsubscribe(self, subscription: "InMemorySubscription") -> None:
+        listener = self._get_listener()
+        async with listener.lock:
+            idle_channels = self.local.unsubscribe(subscription)
+            if idle_channels:
+                await listener.pubsub.unsubscribe(*idle_channels)
+
+    def _get_listener(self) -> "_RedisListener":
+        # ASGI servers run one event loop per process; a new loop (tests,
+        # reloads) gets its own connection
+        loop = asyncio.get_running_loop()
+        if self.listener is None or self.listener.loop is not loop:
+            self.listener = _RedisListener(self.url, self.local, loop)
+        return self.listener
+
+
+class _RedisListener:
+    """The shared pub/sub connection of a RedisBroker and its reader task."""
+
+    READ_TIMEOUT_SECONDS = 1.0
+    RETRY_SECONDS = 1.0
+
+    def __init__(self, url: str, local: "InMemoryBroker", loop):
+        from redis import asyncio as aioredis
+
+        self.local = local
+        self.loop = loop
+        self.pubsub = aioredis.Redis.from_url(url).pubsub(ignore_subscribe_messages=True)
+        self.lock = asyncio.Lock()
+        self.task = None
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = self.loop.create_task(self.run())
+
+    async def run(self) -> None:
+        while True:
+            try:
+                raw = await self.pubsub.get_message(timeout=self.READ_TIMEOUT_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # redis-py reconnects and resubscribes on the next read
+                logger.warning("Realtime pub/sub read failed", exc_info=True)
+                await asyncio.sleep(self.RETRY_SECONDS)
+                continue
+            if raw is not None and raw["type"] == "message":
+                self.local.publish([raw["channel"].decode()], json.loads(raw["data"]))
+
+
+class RedisSubscription:
+
+    def __init__(self, broker: RedisBroker, subscription: "InMemorySubscription"):
+        self.broker = broker
+        self.subscription = subscription
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next message, or None if nothing arrives within `timeout` seconds."""
+        return await self.subscription.get(timeout)
+
+    async def close(self) -> None:
+        await self.broker.unsubscribe(self.subscription)
+
+
+class InMemoryBroker:
+    """In-process stand-in for Redis; publishers may run in any thread."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channels: list, message: dict) -> None:
+        # Round-trip through JSON so subscribers get what Redis would deliver
+        payload = json.dumps(message)
+        with self.lock:
+            targets = {
+                subscription
+                for channel in channels
+                for subscription in self.subscriptions.get(channel, ())
+            }
+        for subscription in targets:
+            subscription.deliver(json.loads(payload))
+
+    async def subscribe(self, channels: list) -> "InMemorySubscription":
+        subscription = InMemorySubscription(self, channels, asyncio.get_running_loop())
+        with self.lock:
+            for channel in channels:
+                self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: "InMemorySubscription") -> list:
+        """Remove `subscription`; return the channels left without subscribers."""
+        idle_channels = []
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscriptions.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[channel]
+                    idle_channels.append(channel)
+        return idle_channels
+
+
+class InMemorySubscription:
+
+    def __init__(self, broker: InMemoryBroker, channels: list, loop):
+        self.broker = broker
+        self.channels = list(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def deliver(self, message: dict) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        except RuntimeError:
+            # The subscriber's event loop is gone; it will never read again
+            self.broker.unsubscribe(self)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self.broker.unsubscribe(self)
@@ -5,6 +5,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
+
 # Build paths
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -112,6 +114,11 @@ STATICFILES_DIRS = []
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Chunked attachment uploads; parts must stay below nginx's client_max_body_size
+ATTACHMENT_MAX_SIZE = int(os.environ.get("ATTACHMENT_MAX_SIZE", str(1024 * 1024 * 1024)))
+ATTACHMENT_UPLOAD_CHUNK_SIZE = int(os.environ.get("ATTACHMENT_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+ATTACHMENT_UPLOAD_EXPIRY_HOURS = int(os.environ.get("ATTACHMENT_UPLOAD_EXPIRY_HOURS", "24"))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -177,6 +184,58 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
+CELERY_TASK_ROUTES = {
+    "apps.notifications.tasks.send_queued_emails": {"queue": "email"},
+}
+CELERY_BEAT_SCHEDULE = {
+    # Safety net only: producers wake the outbox processor on commit
+    "sweep-outbox-messages": {
+        "task": "apps.notifications.tasks.process_outbox_messages",
+        "schedule": crontab(minute="*/5"),
+    },
+    "sweep-queued-emails": {
+        "task": "apps.notifications.tasks.send_queued_emails",
+        "schedule": crontab(minute="*/5"),
+    },
+    "send-daily-digest": {
+        "task": "apps.notifications.tasks.send_daily_digest",
+        "schedule": crontab(hour=7, minute=0),
+    },
+    "expire-attachment-uploads": {
+        "task": "apps.issues.tasks.expire_attachment_uploads",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "collect-attachment-blobs": {
+        "task": "apps.issues.tasks.collect_attachment_blobs",
+        "schedule": crontab(hour=4, minute=30),
+    },
+    "maintain-event-partitions": {
+        "task": "apps.issues.tasks.maintain_event_partitions",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
+
+# Outbox processing
+OUTBOX_LEASE_SECONDS = int(os.environ.get("OUTBOX_LEASE_SECONDS", "300"))
+OUTBOX_MAX_RETRIES = int(os.environ.get("OUTBOX_MAX_RETRIES", "8"))
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get("OUTBOX_RETRY_BASE_SECONDS", "30"))
+OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get("OUTBOX_RETRY_MAX_SECONDS", "3600"))
+
+# Daily digest
+DIGEST_CHUNK_SIZE = int(os.environ.get("DIGEST_CHUNK_SIZE", "500"))
+DIGEST_DUE_SOON_DAYS = int(os.environ.get("DIGEST_DUE_SOON_DAYS", "3"))
+
+# Real-time updates (Redis pub/sub; "memory://" for a single process)
+REALTIME_BROKER_URL = os.environ.get(
+    "REALTIME_BROKER_URL",
+    os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+)
+
+# Event partitioning
+EVENT_PARTITION_MONTHS_AHEAD = int(os.environ.get("EVENT_PARTITION_MONTHS_AHEAD", "3"))
+EVENT_RETENTION_MONTHS = int(os.environ.get("EVENT_RETENTION_MONTHS", "0"))  # 0 keeps everything
+# Durable location for archives of expired partitions; required to drop any
+EVENT_ARCHIVE_DIR = os.environ.get("EVENT_ARCHIVE_DIR", "")
 
 # Email Configuration
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -186,6 +245,9 @@ EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "True") == "True"
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "noreply@issuepilot.dev")
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", "100"))
+EMAIL_RATE_LIMIT = float(os.environ.get("EMAIL_RATE_LIMIT", "10"))  # per second, all workers; 0 = unpaced
+EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "5"))
 
 # Logging
 LOGGING = {
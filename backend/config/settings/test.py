@@ -33,8 +33,19 @@ MIGRATION_MODULES = DisableMigrations()
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
+# Real-time - in-process broker instead of Redis
+REALTIME_BROKER_URL = "memory://"
+
+# Cache - in-process instead of Redis
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
 # Email - use memory backend
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+EMAIL_RATE_LIMIT = 0
 
 # Logging - reduce noise in tests
 LOGGING["root"]["level"] = "ERROR"  # noqa
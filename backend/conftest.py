@@ -0,0 +1,38 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.projects.services import project_create
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached roles and versions outlive each test's database."""
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username="alice", email="alice@example.com", password="password"
+    )
+
+
+@pytest.fixture
+def other_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username="bob", email="bob@example.com", password="password"
+    )
+
+
+@pytest.fixture
+def project(user):
+    return project_create(name="Pilot", key="PIL", owner=user)
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client